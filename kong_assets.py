@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+import numpy
+import pygame
+
+from kong_render import load_fonts
+
+# Front-end assets: the synthesized sound cues and the fonts. AssetLoader
+# builds them on a background thread so the window is up and pumping events
+# before any of them exist.
+#
+# Sounds are plain NumPy waveforms. The first launch synthesizes them and
+# keeps the PCM in a versioned on-disk cache, one raw int16 file per
+# (freq, duration, volume, shape); later launches memory-map those files
+# instead of synthesizing again.
+
+SAMPLE_RATE = 44100
+MIXER_BUFFER = 512 # Samples per mixer callback, ~11.6 ms of output latency
+PCM_CACHE_VERSION = 1 # Bump whenever generate_wave()'s output changes
+PCM_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                             'kong')
+
+# Cue name, as GameSim.step() emits it -> (freq Hz, duration ms, volume, shape)
+SOUND_SPECS = {
+    'jump': (660, 100, 0.25, 'sine'),
+    # DUH DUH DUH DUH
+    'duh0': (130, 150, 0.35, 'square'),
+    'duh1': (130, 150, 0.35, 'square'),
+    'duh2': (130, 150, 0.35, 'square'),
+    'duh3': (130, 150, 0.35, 'square'),
+    'duh4': (110, 250, 0.4, 'square'), # Final DHH lower and longer
+    'hit': (200, 250, 0.3, 'sawtooth'),
+    'level_win': (880, 500, 0.3, 'sine'), # A nice A5
+    'game_over': (100, 800, 0.4, 'sawtooth'),
+}
+
+
+# --- Sound Generation ---
+def generate_wave(freq, duration_ms, volume=0.3, shape='sine'):
+    """int16 PCM of one beep at SAMPLE_RATE."""
+    duration_sec = duration_ms / 1000.0
+    t = numpy.linspace(0, duration_sec, int(SAMPLE_RATE * duration_sec), False)
+    if shape == 'sine':
+        wave = numpy.sin(freq * t * 2 * numpy.pi)
+    elif shape == 'square':
+        wave = numpy.sign(numpy.sin(freq * t * 2 * numpy.pi))
+    elif shape == 'sawtooth':
+        # Simple sawtooth: t * freq * 2 creates a ramp from 0 to 2*duration_sec*freq
+        # % 2 maps it to 0-2 range, then -1 maps to -1 to 1 range.
+        wave = ((t * freq) % 1.0) * 2 - 1 # Corrected sawtooth
+    else: # Default to sine
+        wave = numpy.sin(freq * t * 2 * numpy.pi)
+
+    # Simple fade out to avoid clicking (last 5ms)
+    fade_out_samples = int(SAMPLE_RATE * 0.005)
+    if len(wave) > fade_out_samples * 2: # Ensure wave is long enough for fade
+        fade_curve = numpy.linspace(1, 0, fade_out_samples)
+        wave[-fade_out_samples:] *= fade_curve
+
+    return (wave * 32767 * volume).astype(numpy.int16)
+
+
+class PCMCache:
+    """generate_wave() output on disk, keyed by its parameters."""
+
+    def __init__(self, directory=PCM_CACHE_DIR):
+        self.directory = os.path.join(directory, f"pcm-v{PCM_CACHE_VERSION}-{SAMPLE_RATE}")
+        self.hits = self.misses = 0
+
+    def path(self, freq, duration_ms, volume, shape):
+        return os.path.join(self.directory, f"{shape}-{freq:g}-{duration_ms:g}-{volume:g}.pcm")
+
+    def get(self, freq, duration_ms, volume=0.3, shape='sine'):
+        """The PCM for these parameters: memory-mapped when cached, else synthesized and stored."""
+        path = self.path(freq, duration_ms, volume, shape)
+        samples = int(SAMPLE_RATE * (duration_ms / 1000.0))
+        try:
+            if samples and os.path.getsize(path) == samples * 2: # Anything else is a torn write
+                self.hits += 1
+                return numpy.memmap(path, dtype=numpy.int16, mode='r')
+        except OSError:
+            pass
+        self.misses += 1
+        pcm = generate_wave(freq, duration_ms, volume, shape)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            pcm.tofile(tmp)
+            os.replace(tmp, path)
+        except OSError:
+            pass # Read-only home and the like: play it uncached
+        return pcm
+
+
+def create_sounds(cache=None):
+    """{cue: pygame.mixer.Sound} for every SOUND_SPECS entry. Needs an initialized mixer."""
+    by_params = {} # Cues with identical parameters share one Sound
+    sounds = {}
+    for name, params in SOUND_SPECS.items():
+        sound = by_params.get(params)
+        if sound is None:
+            pcm = cache.get(*params) if cache is not None else generate_wave(*params)
+            # Pygame's Sound object will handle mono-to-stereo conversion if mixer is stereo
+            sound = by_params[params] = pygame.mixer.Sound(buffer=pcm)
+        sounds[name] = sound
+    return sounds
+
+
+# --- Background loading ---
+class AssetLoader:
+    """Starts the mixer and builds sounds and fonts on a background thread.
+
+    Poll ready() from the main loop and collect (fonts, sounds) with result()
+    once it is. timings has the seconds each step took.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.fonts = None
+        self.sounds = None
+        self.timings = {}
+        self._error = None
+        self._thread = threading.Thread(target=self._load, name="asset-loader", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        try:
+            last = time.perf_counter()
+            def mark(name):
+                nonlocal last
+                now = time.perf_counter()
+                self.timings[name] = now - last; last = now
+
+            pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=MIXER_BUFFER) # Stereo
+            mark('mixer')
+            self.sounds = create_sounds(self.cache)
+            mark('sounds')
+            pygame.font.init()
+            self.fonts = load_fonts()
+            mark('fonts')
+        except Exception as e: # Re-raised on the main thread by result()
+            self._error = e
+
+    def ready(self):
+        return not self._thread.is_alive()
+
+    def wait(self, timeout):
+        """ready(), after waiting up to timeout seconds for it."""
+        self._thread.join(timeout)
+        return self.ready()
+
+    def result(self):
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self.fonts, self.sounds
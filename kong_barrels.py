@@ -0,0 +1,355 @@
+import math
+
+import numpy
+
+# Structure-of-arrays barrel store. Every live barrel is one slot across a set
+# of parallel NumPy arrays and a whole frame of rolling, falling, landing,
+# culling and player collision is a handful of array ops instead of a Python
+# loop over dicts of pygame.Rects.
+#
+# Positions are kept as floats but snapped to whole pixels on every write,
+# rounding half away from zero exactly like pygame.Rect's setters, so barrels
+# follow the same pixel paths the old per-barrel Rect code produced.
+
+NO_GIRDER = -1
+# How far under a girder's surface a falling barrel may start a frame and still land on it
+BARREL_LAND_TOLERANCE = 15
+# Below this many live barrels NumPy's per-call overhead outweighs the batching,
+# so update() walks the same arrays with plain Python floats instead
+SCALAR_LIMIT = 24
+
+
+def snap(values):
+    return numpy.copysign(numpy.floor(numpy.abs(values) + 0.5), values)
+
+def snap1(value):
+    return math.copysign(math.floor(abs(value) + 0.5), value)
+
+
+class GirderArrays:
+    """A level's CompiledGirders as flat arrays, indexed like level.girders."""
+
+    def __init__(self, girders):
+        def column(name, dtype=numpy.float64):
+            return numpy.array([getattr(g, name) for g in girders], dtype=dtype)
+        self.left = column('left')
+        self.right = column('right')
+        self.top = column('top')
+        self.bottom = column('bottom')
+        self.slope = column('slope')
+        self.intercept = column('intercept')
+        # Roll direction a barrel picks up on landing: +1 downhill right, -1 left, 0 keep (flat)
+        self.land_dir = column('land_dir', numpy.int8)
+        # Same data as plain tuples for the scalar path
+        self.rows = [(g.left, g.right, g.top, g.bottom, g.slope, g.intercept, g.land_dir) for g in girders]
+
+    def __len__(self):
+        return len(self.left)
+
+    def surface_y(self, x_coord, idx):
+        """Vectorized CompiledGirder.surface_y() for x_coord[i] on girder idx[i] (arrays broadcast)."""
+        clamped_x = numpy.maximum(self.left[idx], numpy.minimum(x_coord, self.right[idx]))
+        return clamped_x * self.slope[idx] + self.intercept[idx]
+
+    def surface_y1(self, x_coord, idx):
+        left, right, _, _, slope, intercept, _ = self.rows[idx]
+        return max(left, min(x_coord, right)) * slope + intercept
+
+    # --- Swept landing ---
+    # A box falling this frame lands on a girder when its bottom edge went from
+    # above the girder's surface line (or no more than `tolerance` under it, so
+    # walking onto a slope or a slightly raised girder still lands) to on or
+    # below it. Testing the path rather than a window round the end position
+    # means no speed carries anything through a girder; when a fast box passes
+    # several surfaces in one frame it stops on the highest, the one it reached
+    # first (level order breaks ties).
+
+    def landing1(self, candidates, left, right, centerx, bottom_before, bottom, tolerance):
+        """The highest of `candidates` spanning [left, right] whose surface at
+        centerx the bottom edge passed going from bottom_before to bottom.
+        Returns (girder index, surface y), or (NO_GIRDER, 0.0)."""
+        rows = self.rows
+        found, found_y = NO_GIRDER, bottom
+        for idx in candidates:
+            g_left, g_right, _, _, slope, intercept, _ = rows[idx]
+            if left < g_right and right > g_left:
+                surface_y = max(g_left, min(centerx, g_right)) * slope + intercept
+                if bottom_before - tolerance <= surface_y <= bottom and (found == NO_GIRDER or surface_y < found_y):
+                    found, found_y = idx, surface_y
+        return (found, found_y) if found != NO_GIRDER else (NO_GIRDER, 0.0)
+
+    def landings(self, left, right, centerx, bottom_before, bottom, tolerance, candidates=None):
+        """landing1() for arrays of boxes; candidates is an (n, girders) bool
+        mask (default: every girder). Returns (boxes that landed, the girder
+        each landed on, its surface y), in box order."""
+        if candidates is None:
+            candidates = numpy.ones((len(left), len(self.left)), dtype=bool)
+        pair_box, pair_girder = numpy.nonzero(candidates)
+        surface = self.surface_y(centerx[pair_box], pair_girder)
+        lands = ((left[pair_box] < self.right[pair_girder]) & (right[pair_box] > self.left[pair_girder])
+                 & (surface >= bottom_before[pair_box] - tolerance) & (surface <= bottom[pair_box]))
+        pair_box, pair_girder, surface = pair_box[lands], pair_girder[lands], surface[lands]
+        # Highest surface per box; lexsort is stable, so level order breaks ties
+        order = numpy.lexsort((surface, pair_box))
+        boxes, first = numpy.unique(pair_box[order], return_index=True)
+        return boxes, pair_girder[order][first], surface[order][first]
+
+
+class BarrelStore:
+    """All barrels of one game. Slots [0:count) are in spawn order; dead ones are
+    masked out of `alive` and compacted away once they outnumber the living."""
+
+    def __init__(self, size, capacity=64):
+        self.size = size
+        self.count = 0
+        self.live = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.x = numpy.zeros(capacity, dtype=numpy.float64) # rect.left
+        self.y = numpy.zeros(capacity, dtype=numpy.float64) # rect.top
+        self.dir = numpy.zeros(capacity, dtype=numpy.int8)
+        self.y_vel = numpy.zeros(capacity, dtype=numpy.float64)
+        self.girder = numpy.full(capacity, NO_GIRDER, dtype=numpy.int16)
+        self.roll_angle = numpy.zeros(capacity, dtype=numpy.float64)
+        self.alive = numpy.zeros(capacity, dtype=bool)
+
+    _fields = ('x', 'y', 'dir', 'y_vel', 'girder', 'roll_angle', 'alive')
+    # One slot as a packed record, for snapshots (see to_rows)
+    ROW_DTYPE = numpy.dtype([('x', 'f8'), ('y', 'f8'), ('dir', 'i1'), ('y_vel', 'f8'), ('girder', 'i2'),
+                             ('roll_angle', 'f8'), ('alive', '?')])
+
+    def __len__(self):
+        return self.live
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.count = 0
+        self.live = 0
+
+    def _compact(self):
+        keep = self.alive[:self.count]
+        n = int(keep.sum())
+        for name in self._fields:
+            arr = getattr(self, name)
+            arr[:n] = arr[:self.count][keep]
+        self.alive[n:self.count] = False
+        self.count = n
+
+    def _grow(self):
+        old = {name: getattr(self, name)[:self.count] for name in self._fields}
+        self._alloc(max(64, len(self.x) * 2))
+        for name, values in old.items():
+            getattr(self, name)[:self.count] = values
+
+    def spawn(self, x, y, direction, girder_idx):
+        if self.count == len(self.x):
+            if self.count - self.live >= self.count // 2: self._compact()
+            else: self._grow()
+        i = self.count
+        self.x[i] = x; self.y[i] = y
+        self.dir[i] = direction; self.y_vel[i] = 0
+        self.girder[i] = girder_idx; self.roll_angle[i] = 0
+        self.alive[i] = True
+        self.count += 1
+        self.live += 1
+
+    def to_rows(self):
+        """Copy of slots [0:count) as a ROW_DTYPE array, dead slots included so
+        slot i keeps meaning the same barrel from one snapshot to the next."""
+        n = self.count
+        rows = numpy.empty(n, dtype=self.ROW_DTYPE)
+        for name in self._fields:
+            rows[name] = getattr(self, name)[:n]
+        return rows
+
+    def from_rows(self, rows):
+        n = len(rows)
+        if n > len(self.x):
+            self._alloc(max(64, n * 2))
+        else:
+            self.alive[n:self.count] = False
+        for name in self._fields:
+            getattr(self, name)[:n] = rows[name]
+        self.count = n
+        self.live = int(numpy.count_nonzero(rows['alive']))
+
+    def copy_from(self, other):
+        """Make this store a copy of `other`'s slots, reusing its arrays while they're big enough."""
+        n = other.count
+        if n > len(self.x):
+            self._alloc(max(64, n * 2))
+        else:
+            self.alive[n:self.count] = False
+        for name in self._fields:
+            getattr(self, name)[:n] = getattr(other, name)[:n]
+        self.count = n
+        self.live = other.live
+
+    def live_arrays(self):
+        """(centerx, centery, roll_angle) of every live barrel, in spawn order."""
+        alive = self.alive[:self.count]
+        half = self.size // 2
+        return self.x[:self.count][alive] + half, self.y[:self.count][alive] + half, self.roll_angle[:self.count][alive]
+
+    def update(self, girders, roll_speed, gravity, cull_y, player_rect=None, index=None):
+        """One frame for every barrel. Returns (culled, player_hit).
+
+        culled is how many barrels fell past cull_y; player_hit is True when a
+        barrel overlapped player_rect. As in dkv0's barrel loop, the frame
+        stops at the first such barrel: it is removed, and the barrels after it
+        in spawn order don't move (or get culled) until the next frame.
+        index is the level's kong_spatial.LevelIndex; without it landing tests
+        every falling barrel against every girder.
+        """
+        n = self.count
+        if self.live == 0 or len(girders) == 0:
+            return 0, False
+        if self.live <= SCALAR_LIMIT:
+            return self._update_scalar(girders, roll_speed, gravity, cull_y, player_rect, index)
+        size = self.size
+        alive = self.alive[:n]
+        x = self.x[:n]; y = self.y[:n]; direction = self.dir[:n]
+        y_vel = self.y_vel[:n]; girder = self.girder[:n]; roll_angle = self.roll_angle[:n]
+
+        if player_rect is not None:
+            before = [arr.copy() for arr in (x, y, direction, y_vel, girder, roll_angle)]
+        self._move(girders, roll_speed, gravity, index, x, y, direction, y_vel, girder, roll_angle, alive)
+        gone = alive & (y > cull_y)
+
+        # --- Player collision ---
+        player_hit = False
+        if player_rect is not None:
+            hits = alive & ~gone & (x < player_rect.right) & (x + size > player_rect.left) \
+                & (y < player_rect.bottom) & (y + size > player_rect.top)
+            if hits.any():
+                first = hits.argmax()
+                # Put back the barrels the scalar loop wouldn't have reached
+                for arr, saved in zip((x, y, direction, y_vel, girder, roll_angle), before):
+                    arr[first + 1:] = saved[first + 1:]
+                gone[first + 1:] = False
+                alive[first] = False
+                self.live -= 1
+                player_hit = True
+
+        # --- Culling ---
+        culled = int(gone.sum())
+        if culled:
+            alive &= ~gone
+            self.live -= culled
+
+        if self.count > 256 and self.live < self.count // 4:
+            self._compact()
+        return culled, player_hit
+
+    def _move(self, girders, roll_speed, gravity, index, x, y, direction, y_vel, girder, roll_angle, alive=None):
+        """One frame of rolling, falling and landing, in place, for the barrels
+        in these arrays (only those set in `alive`, if given)."""
+        size = self.size
+        half = size // 2
+        # Split before updating: a barrel rolling off an edge starts falling next frame
+        on_girder = girder != NO_GIRDER
+        if alive is None:
+            rolling = numpy.flatnonzero(on_girder)
+            falling = numpy.flatnonzero(~on_girder)
+        else:
+            rolling = numpy.flatnonzero(alive & on_girder)
+            falling = numpy.flatnonzero(alive & ~on_girder)
+
+        # --- Rolling along a girder ---
+        if len(rolling):
+            g_idx = girder[rolling]
+            d = direction[rolling]
+            new_x = snap(x[rolling] + roll_speed * d)
+            x[rolling] = new_x
+            roll_angle[rolling] = (roll_angle[rolling] + 6 * d) % 360
+            centerx = new_x + half
+            y[rolling] = snap(girders.surface_y(centerx, g_idx)) - size
+            off_edge = ~((girders.left[g_idx] < centerx) & (centerx < girders.right[g_idx]))
+            y_vel[rolling] = numpy.where(off_edge, 0.5, 0.0)
+            girder[rolling[off_edge]] = NO_GIRDER
+
+        # --- Falling, then landing on the highest girder whose surface the bottom passed ---
+        if len(falling):
+            v = y_vel[falling] + gravity * 0.6
+            y_vel[falling] = v
+            bottom_before = y[falling] + size
+            fy = snap(y[falling] + v)
+            y[falling] = fy
+            roll_angle[falling] = (roll_angle[falling] + 3 * direction[falling]) % 360
+            fx = x[falling]
+
+            if index is not None:
+                candidates = index.girder_candidates(fx, bottom_before - BARREL_LAND_TOLERANCE, size, fy + size)
+            else:
+                candidates = None
+            landed, first, surface = girders.landings(fx, fx + size, fx + half, bottom_before, fy + size,
+                                                      BARREL_LAND_TOLERANCE, candidates)
+            if len(landed):
+                slots = falling[landed]
+                y[slots] = snap(surface) - size
+                y_vel[slots] = 0
+                girder[slots] = first
+                land_dir = girders.land_dir[first]
+                direction[slots] = numpy.where(land_dir != 0, land_dir, direction[slots])
+
+    def _update_scalar(self, girders, roll_speed, gravity, cull_y, player_rect, index):
+        n = self.count
+        size = self.size
+        half = size // 2
+        rows = girders.rows
+        alive = self.alive[:n].tolist(); x = self.x[:n].tolist(); y = self.y[:n].tolist()
+        direction = self.dir[:n].tolist(); y_vel = self.y_vel[:n].tolist()
+        girder = self.girder[:n].tolist(); roll_angle = self.roll_angle[:n].tolist()
+        if player_rect is not None:
+            p_left, p_right, p_top, p_bottom = player_rect.left, player_rect.right, player_rect.top, player_rect.bottom
+        culled = 0
+        player_hit = False
+
+        for i in range(n):
+            if not alive[i]:
+                continue
+            d = direction[i]
+            g = girder[i]
+            if g != NO_GIRDER:
+                bx = snap1(x[i] + roll_speed * d)
+                roll_angle[i] = (roll_angle[i] + 6 * d) % 360
+                by = snap1(girders.surface_y1(bx + half, g)) - size
+                if rows[g][0] < bx + half < rows[g][1]:
+                    y_vel[i] = 0.0
+                else:
+                    girder[i] = NO_GIRDER; y_vel[i] = 0.5
+            else:
+                v = y_vel[i] + gravity * 0.6
+                y_vel[i] = v
+                bx = x[i]
+                bottom_before = y[i] + size
+                by = snap1(y[i] + v)
+                roll_angle[i] = (roll_angle[i] + 3 * d) % 360
+                if v >= 0:
+                    bottom = by + size
+                    candidates = (index.girders_in_rect(bx, bottom_before - BARREL_LAND_TOLERANCE, bx + size, bottom)
+                                  if index is not None else range(len(rows)))
+                    g_idx, surface_y = girders.landing1(candidates, bx, bx + size, bx + half, bottom_before, bottom,
+                                                        BARREL_LAND_TOLERANCE)
+                    if g_idx != NO_GIRDER:
+                        by = snap1(surface_y) - size
+                        y_vel[i] = 0.0
+                        girder[i] = g_idx
+                        land_dir = rows[g_idx][6]
+                        if land_dir: direction[i] = land_dir
+            x[i] = bx; y[i] = by
+
+            if by > cull_y:
+                alive[i] = False; culled += 1
+                continue
+            if player_rect is not None and bx < p_right and bx + size > p_left and by < p_bottom and by + size > p_top:
+                alive[i] = False
+                player_hit = True
+                break
+
+        self.alive[:n] = alive; self.x[:n] = x; self.y[:n] = y
+        self.dir[:n] = direction; self.y_vel[:n] = y_vel
+        self.girder[:n] = girder; self.roll_angle[:n] = roll_angle
+        self.live -= culled + player_hit
+        return culled, player_hit
@@ -0,0 +1,287 @@
+import argparse
+import math
+import os
+import random
+import time
+
+import pygame
+
+from kong_barrels import BarrelStore, GirderArrays
+from kong_levels import CompiledGirder, CompiledLadder, CompiledLevel, levels_data_generators, get_girder_surface_y
+from kong_rewind import RewindBuffer
+from kong_spatial import LevelIndex
+
+from kong_sim import (
+    GameSim,
+    WIDTH, HEIGHT, INITIAL_LIVES, GRAVITY, BARREL_SIZE,
+    STATE_PLAYING, STATE_GAME_OVER_LOST, STATE_VICTORY,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_JUMP,
+)
+
+# Headless benchmarks for the Kong simulation. Run: python kong_bench.py
+
+
+def wander_inputs(frames, seed=0):
+    # Cheap scripted "player": walks back and forth, climbs and jumps now and
+    # then, so ladders, landings and barrel hits all get exercised.
+    rng = random.Random(seed)
+    inputs = []
+    held = INPUT_RIGHT
+    for frame in range(frames):
+        if frame % 90 == 0:
+            held = rng.choice([INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_RIGHT | INPUT_UP])
+        bits = held
+        if rng.random() < 0.03: bits |= INPUT_JUMP
+        inputs.append(bits)
+    return inputs
+
+
+def bench_sim_steps(level_idx, frames=20000, seed=0):
+    """Steps/sec of GameSim.step() held on one level (game overs reload it)."""
+    sim = GameSim(seed=seed)
+    sim.load_level(level_idx)
+    inputs = wander_inputs(frames, seed)
+
+    start = time.perf_counter()
+    for bits in inputs:
+        sim.step(bits)
+        if sim.game_state in (STATE_GAME_OVER_LOST, STATE_VICTORY) or sim.is_level_won:
+            sim.player_lives = INITIAL_LIVES
+            sim.load_level(level_idx)
+    elapsed = time.perf_counter() - start
+    return frames / elapsed
+
+
+class DictBarrelSim(GameSim):
+    """GameSim with the original dict-of-Rect barrel loop, kept as the
+    reference the NumPy BarrelStore is benchmarked against."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.barrels = []
+
+    def load_level(self, level_idx):
+        super().load_level(level_idx)
+        # The old loop works on the generator's girder dicts, not CompiledGirders
+        if level_idx < len(levels_data_generators):
+            self.girder_dicts = levels_data_generators[level_idx](self.width, self.height)["girders_def"]
+
+    def spawn_barrel(self):
+        if self.g_kong_platform_idx_for_barrel_spawn >= len(self.g_level_girders):
+            return
+        kong_rect = self.g_kong_rect
+        kong_girder = self.girder_dicts[self.g_kong_platform_idx_for_barrel_spawn]
+        spawn_offset_x = kong_rect.width * 0.6
+        barrel_start_x = kong_rect.centerx + spawn_offset_x if self.rng.choice([True,False]) else kong_rect.centerx - spawn_offset_x
+        actual_start_y_surface = get_girder_surface_y(barrel_start_x, kong_girder)
+        if kong_girder['y_start'] == kong_girder['y_end']: barrel_initial_dir = 1 if barrel_start_x > kong_rect.centerx else -1
+        elif kong_girder['y_start'] < kong_girder['y_end']: barrel_initial_dir = 1
+        else: barrel_initial_dir = -1
+        self.barrels.append({
+            'rect': pygame.Rect(barrel_start_x - BARREL_SIZE//2, actual_start_y_surface - BARREL_SIZE, BARREL_SIZE, BARREL_SIZE),
+            'dir': barrel_initial_dir, 'y_vel': 0,
+            'on_girder_id': kong_girder['id'], 'roll_angle': 0
+        })
+
+    def _update_barrels(self):
+        player_rect = self.player_rect
+        girders = self.girder_dicts
+        for barrel_obj in self.barrels[:]:
+            barrel_rect = barrel_obj['rect']
+            current_girder_for_barrel = None
+            if barrel_obj.get('on_girder_id'):
+                for g in girders:
+                    if g['id'] == barrel_obj['on_girder_id']:
+                        current_girder_for_barrel = g; break
+
+            if current_girder_for_barrel:
+                barrel_rect.x += self.g_current_barrel_roll_speed * barrel_obj['dir']
+                barrel_obj['roll_angle'] = (barrel_obj['roll_angle'] + 6 * barrel_obj['dir']) % 360
+                barrel_rect.bottom = get_girder_surface_y(barrel_rect, current_girder_for_barrel); barrel_obj['y_vel'] = 0
+                g_span_rect = current_girder_for_barrel['rect']
+                if not (g_span_rect.left < barrel_rect.centerx < g_span_rect.right):
+                    barrel_obj['on_girder_id'] = None; barrel_obj['y_vel'] = 0.5
+            else:
+                barrel_obj['y_vel'] += GRAVITY * 0.6
+                barrel_rect.y += barrel_obj['y_vel']
+                barrel_obj['roll_angle'] = (barrel_obj['roll_angle'] + 3 * barrel_obj['dir']) % 360
+                for g_check in girders:
+                    if barrel_rect.colliderect(g_check['rect']):
+                        surface_y = get_girder_surface_y(barrel_rect, g_check)
+                        if barrel_rect.bottom >= surface_y and barrel_rect.bottom <= surface_y + max(15, abs(barrel_obj['y_vel']) +2) and barrel_obj['y_vel'] >= 0:
+                            barrel_rect.bottom = surface_y; barrel_obj['y_vel'] = 0
+                            barrel_obj['on_girder_id'] = g_check['id']
+                            if g_check['y_start'] == g_check['y_end']: pass
+                            elif g_check['y_start'] < g_check['y_end']: barrel_obj['dir'] = 1
+                            else: barrel_obj['dir'] = -1
+                            break
+            if barrel_rect.top > self.height: self.barrels.remove(barrel_obj); self.score += 5; continue
+            if player_rect.colliderect(barrel_rect):
+                self.barrels.remove(barrel_obj)
+                if not self.endless: self._lose_life()
+                break
+
+
+def bench_barrels(sim_class, level_idx, spawn_per_tick, frames=1200, seed=0):
+    """Steps/sec of an endless stress run and the mean live barrel count."""
+    sim = sim_class(seed=seed, endless=True, stress_spawn_per_tick=spawn_per_tick)
+    sim.load_level(level_idx)
+    while sim.game_state != STATE_PLAYING: sim.step(0)
+    # Warm up until the level holds a steady barrel population
+    for _ in range(frames): sim.step(INPUT_RIGHT)
+
+    live_total = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        sim.step(INPUT_RIGHT)
+        live_total += len(sim.barrels)
+    elapsed = time.perf_counter() - start
+    return frames / elapsed, live_total / frames
+
+
+def bench_draw_barrels(spawn_per_tick, frames=300, seed=0):
+    """Draw calls/sec for the barrel layer: per-barrel Surface+rotate vs the atlas."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    from kong_render import draw_barrels, make_barrel_surface
+
+    sim = GameSim(seed=seed, endless=True, stress_spawn_per_tick=spawn_per_tick)
+    while sim.game_state != STATE_PLAYING: sim.step(0)
+    for _ in range(600): sim.step(INPUT_RIGHT)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for centerx, centery, roll_angle in zip(*sim.barrels.live_arrays()):
+            rotated_barrel = pygame.transform.rotate(make_barrel_surface(BARREL_SIZE), roll_angle)
+            screen.blit(rotated_barrel, rotated_barrel.get_rect(center=(centerx, centery)))
+    per_barrel_rate = frames / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw_barrels(screen, sim.barrels)
+    atlas_rate = frames / (time.perf_counter() - start)
+    return per_barrel_rate, atlas_rate, len(sim.barrels)
+
+
+def synthetic_level(n_girders, width=WIDTH, height=HEIGHT):
+    """A CompiledLevel with n_girders short, alternately sloped platforms on a grid."""
+    cols = max(1, math.ceil(math.sqrt(n_girders / 2)))
+    rows = math.ceil(n_girders / cols)
+    span = width // cols
+    pitch = (height - 100) / rows
+    girders, ladders = [], []
+    for i in range(n_girders):
+        row, col = divmod(i, cols)
+        left = col * span + 10
+        y_start = height - 60 - row * pitch
+        y_end = y_start + (8 if (row + col) % 2 else -8)
+        top = min(y_start, y_end) - 15
+        girders.append(CompiledGirder(f'S{i}', (left, int(top), span - 20, int(abs(y_end - y_start)) + 15), y_start, y_end))
+        ladders.append(CompiledLadder((left + span // 2 - 9, int(y_start - pitch), 18, int(pitch))))
+    return CompiledLevel(f"synthetic {n_girders}", width, height, girders, ladders,
+                         (0, 0, 55, 45), (0, 0, 25, 35), (0, 0, 35, 35), 0, width / 10, 2500, n_girders - 1, 2.2)
+
+
+def bench_spatial(n_girders, queries=20000, barrels=2000, seed=0):
+    """(scan us/query, index us/query, dense ms/update, indexed ms/update) on a synthetic level."""
+    level = synthetic_level(n_girders)
+    index = LevelIndex(level)
+    rng = random.Random(seed)
+    rects = [(rng.uniform(0, WIDTH - 28), rng.uniform(0, HEIGHT - 28)) for _ in range(queries)]
+
+    # Player-style query: girders under a 28x28 rect, exact x/y-window test on the candidates
+    def hits(candidates, left, top):
+        found = 0
+        for g_idx in candidates:
+            g = level.girders[g_idx]
+            if left + 28 > g.left and left < g.right and g.top <= top + 28 and top <= g.bottom: found += 1
+        return found
+
+    all_girders = range(len(level.girders))
+    start = time.perf_counter()
+    for left, top in rects: hits(all_girders, left, top)
+    scan_us = (time.perf_counter() - start) / queries * 1e6
+    start = time.perf_counter()
+    for left, top in rects: hits(index.girders_in_rect(left, top, left + 28, top + 28), left, top)
+    index_us = (time.perf_counter() - start) / queries * 1e6
+
+    # Batched: a frame of falling barrels landing, dense (barrels x girders) vs index candidates
+    girder_arrays = GirderArrays(level.girders)
+    def falling_store():
+        store = BarrelStore(BARREL_SIZE)
+        for _ in range(barrels):
+            store.spawn(rng.uniform(0, WIDTH - BARREL_SIZE), rng.uniform(0, HEIGHT - BARREL_SIZE), 1, -1)
+        return store
+    timings = []
+    for use_index in (None, index):
+        store = falling_store()
+        start = time.perf_counter()
+        for _ in range(20):
+            store.y_vel[:store.count] = 1.0; store.girder[:store.count] = -1
+            store.update(girder_arrays, 2.2, GRAVITY, HEIGHT * 10, index=use_index)
+        timings.append((time.perf_counter() - start) / 20 * 1e3)
+    return scan_us, index_us, timings[0], timings[1]
+
+
+def bench_rewind(spawn_per_tick, seconds=60, seed=0):
+    """(MB held for `seconds` of history, us per push, worst us per restore) in an endless run."""
+    sim = GameSim(seed=seed, endless=spawn_per_tick > 0, stress_spawn_per_tick=spawn_per_tick)
+    buf = RewindBuffer(seconds)
+    inputs = wander_inputs(int(seconds * 60) + 600, seed)
+    push_time = 0.0
+    for bits in inputs:
+        sim.step(bits)
+        start = time.perf_counter()
+        buf.push(sim)
+        push_time += time.perf_counter() - start
+    worst = 0.0
+    for back in range(0, len(buf), 97):
+        start = time.perf_counter()
+        sim.restore(buf.peek(back))
+        worst = max(worst, time.perf_counter() - start)
+    return buf.nbytes() / 1e6, push_time / len(inputs) * 1e6, worst * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kong headless benchmarks")
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stress", type=float, nargs="*", default=[0.05, 2.0, 20.0],
+                        help="extra barrels spawned per tick for the barrel engine comparison")
+    parser.add_argument("--level-sizes", type=int, nargs="*", default=[6, 24, 96, 384],
+                        help="girder counts of the synthetic levels for the spatial index benchmark")
+    args = parser.parse_args()
+
+    for level_idx, level_func in enumerate(levels_data_generators):
+        rate = bench_sim_steps(level_idx, args.frames, args.seed)
+        print(f"sim  level {level_idx + 1} ({level_func.__name__}): {rate:,.0f} steps/sec ({rate / 60:,.0f}x real time)")
+
+    for spawn_per_tick in args.stress:
+        for level_idx in range(len(levels_data_generators)):
+            dict_rate, dict_live = bench_barrels(DictBarrelSim, level_idx, spawn_per_tick, seed=args.seed)
+            numpy_rate, numpy_live = bench_barrels(GameSim, level_idx, spawn_per_tick, seed=args.seed)
+            print(f"barrels level {level_idx + 1} stress {spawn_per_tick}/tick: "
+                  f"dict {dict_rate:,.0f} steps/sec ({dict_live:,.0f} live), "
+                  f"numpy {numpy_rate:,.0f} steps/sec ({numpy_live:,.0f} live), "
+                  f"{numpy_rate / dict_rate:.1f}x")
+
+    for spawn_per_tick in args.stress:
+        per_barrel_rate, atlas_rate, live = bench_draw_barrels(spawn_per_tick, seed=args.seed)
+        print(f"draw barrels stress {spawn_per_tick}/tick ({live:,} live): "
+              f"rotate-per-barrel {per_barrel_rate:,.0f} frames/sec, atlas {atlas_rate:,.0f} frames/sec, "
+              f"{atlas_rate / per_barrel_rate:.1f}x")
+
+    for n_girders in args.level_sizes:
+        scan_us, index_us, dense_ms, indexed_ms = bench_spatial(n_girders, seed=args.seed)
+        print(f"spatial {n_girders:4d} girders: rect query scan {scan_us:.2f} us, index {index_us:.2f} us; "
+              f"2000 falling barrels dense {dense_ms:.2f} ms, indexed {indexed_ms:.2f} ms")
+
+    for spawn_per_tick in [0.0] + args.stress[:2]:
+        megabytes, push_us, restore_us = bench_rewind(spawn_per_tick, seed=args.seed)
+        print(f"rewind stress {spawn_per_tick}/tick: 60 s of history {megabytes:.2f} MB, "
+              f"push {push_us:.0f} us/frame, worst restore {restore_us:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy
+import pygame
+
+# Frame observation and capture. Rendered frames are read straight out of the
+# surface's own pixel memory: pixel_view() is pygame.surfarray.pixels3d, and
+# the capture path takes the 32-bit rows via Surface.get_view('2'), so nothing
+# is copied until a caller wants to keep a frame.
+#
+# GrayDownsampler turns a frame into an (H/f, W/f) uint8 luma image in
+# preallocated buffers. It works on the pixels as packed integers: one uint64
+# holds two pixels, so masking with 0x00ff00ff00ff00ff spreads the red and
+# blue bytes of both into 16-bit lanes and a block's pixels can be summed
+# with plain integer adds before the luma weights go on once per output pixel.
+#
+# FrameCapture copies each frame's rows into a free buffer from a fixed pool
+# and hands it to a writer thread through a bounded queue; downsampling, if
+# any, happens on that thread too. When the pool is empty the frame is
+# dropped rather than waited for, so the game loop never blocks on the disk.
+#
+#   python kong_capture.py --frames 600            # overhead per frame, raw and downsampled
+#   ffmpeg -f rawvideo -pix_fmt bgr0 -s 600x800 -r 60 -i run.raw run.mp4
+
+# ITU-R BT.601 luma, in 1/1024ths
+LUMA_R, LUMA_G, LUMA_B = 306, 601, 117
+_LANES = numpy.uint64(0x00FF00FF00FF00FF)
+_LANE = numpy.uint64(0xFFFF)
+CAPTURE_QUEUE_FRAMES = 8
+
+
+@contextmanager
+def pixel_view(surface):
+    """pygame.surfarray.pixels3d(surface): a (width, height, 3) uint8 view of its
+    pixels, no copy. The surface stays locked (no blits onto it) until the block exits."""
+    view = pygame.surfarray.pixels3d(surface)
+    try:
+        yield view
+    finally:
+        del view
+
+
+def _packed_rows(surface):
+    # (height, width) uint32 view of a 32-bit surface's rows
+    return numpy.asarray(surface.get_view('2')).T
+
+
+def raw_pix_fmt(surface):
+    """ffmpeg rawvideo pix_fmt of a 32-bit surface's bytes."""
+    shifts = surface.get_shifts()[:3]
+    return {(16, 8, 0): 'bgr0', (0, 8, 16): 'rgb0'}.get(shifts, 'bgr0')
+
+
+class GrayDownsampler:
+    """Luma of each factor x factor block of a 32-bit surface, averaged, as an
+    (height / factor, width / factor) uint8 array written into self.out."""
+
+    def __init__(self, size, factor=2):
+        width, height = size
+        if factor < 2 or factor % 2 or factor > 16 or width % factor or height % factor:
+            raise ValueError(f"factor {factor} must be even, at most 16 and divide {width}x{height}")
+        self.factor = factor
+        shape = (height // factor, width // factor)
+        self.out = numpy.empty(shape, dtype=numpy.uint8)
+        self._rb = numpy.empty(shape, dtype=numpy.uint64) # Block sums: blue and red lanes (16-bit each)
+        self._g = numpy.empty(shape, dtype=numpy.uint64)  # Block sums: green lane
+        self._tmp = numpy.empty(shape, dtype=numpy.uint64)
+        self._red_lane = None # 16-bit lane red lands in (0 or 1), from the first surface's shifts
+
+    def set_format(self, surface):
+        """Take the pixel layout from surface; rows() input is assumed to share it."""
+        shifts = surface.get_shifts()
+        if surface.get_bitsize() != 32 or shifts[1] != 8 or {shifts[0], shifts[2]} != {0, 16}:
+            raise ValueError(f"need a 32-bit surface with green in bits 8-15, got shifts {shifts}")
+        self._red_lane = shifts[0] // 16
+
+    def __call__(self, surface, out=None):
+        """Downsample surface into out (default self.out) and return it."""
+        if self._red_lane is None: self.set_format(surface)
+        return self.rows(_packed_rows(surface), out)
+
+    def rows(self, rows, out=None):
+        """Same, from a (height, width) uint32 copy of a surface's rows."""
+        f = self.factor
+        out = self.out if out is None else out
+        rb, g, tmp = self._rb, self._g, self._tmp
+        height, width = rows.shape
+        pairs = rows.view(numpy.uint64).reshape(height // f, f, width // f, f // 2)
+        rb.fill(0); g.fill(0)
+        for i in range(f):
+            for j in range(f // 2):
+                block = pairs[:, i, :, j]
+                numpy.bitwise_and(block, _LANES, out=tmp); numpy.add(rb, tmp, out=rb)
+                numpy.right_shift(block, numpy.uint64(8), out=tmp); numpy.bitwise_and(tmp, _LANES, out=tmp)
+                numpy.add(g, tmp, out=g)
+        # Fold the two pixels of each uint64 together: lanes 0 / 1 of the low half
+        numpy.right_shift(rb, numpy.uint64(32), out=tmp); numpy.add(rb, tmp, out=rb)
+        numpy.right_shift(g, numpy.uint64(32), out=tmp); numpy.add(g, tmp, out=g)
+        numpy.bitwise_and(g, _LANE, out=g); numpy.multiply(g, numpy.uint64(LUMA_G), out=g)
+        red_weight, blue_weight = (LUMA_R, LUMA_B) if self._red_lane else (LUMA_B, LUMA_R)
+        numpy.bitwise_and(rb, _LANE, out=tmp); numpy.multiply(tmp, numpy.uint64(blue_weight), out=tmp)
+        numpy.add(g, tmp, out=g)
+        numpy.right_shift(rb, numpy.uint64(16), out=tmp); numpy.bitwise_and(tmp, _LANE, out=tmp)
+        numpy.multiply(tmp, numpy.uint64(red_weight), out=tmp); numpy.add(g, tmp, out=g)
+        numpy.floor_divide(g, numpy.uint64(1024 * f * f), out=g)
+        numpy.copyto(out, g, casting='unsafe')
+        return out
+
+
+class FrameCapture:
+    """Writes frames to a headerless raw video file from a background thread.
+
+    capture(surface) costs one copy of the rows into a pooled buffer; with
+    every buffer still queued or being written the frame is dropped instead.
+    gray_factor frames are downsampled on the writer thread. close() writes
+    PATH.json next to the video with its size, pix_fmt and frame counts.
+    """
+
+    def __init__(self, path, size, gray_factor=None, queue_frames=CAPTURE_QUEUE_FRAMES, fps=60):
+        self.path = path
+        self.fps = fps
+        width, height = size
+        self.downsampler = GrayDownsampler(size, gray_factor) if gray_factor else None
+        self.frame_shape = self.downsampler.out.shape if self.downsampler is not None else (height, width)
+        self.pix_fmt = None # From the first surface captured
+        self._free = deque(numpy.empty((height, width), dtype=numpy.uint32) for _ in range(queue_frames)) # Thread safe
+        self._queue = queue.Queue()
+        self._file = open(path, 'wb')
+        self.frames = 0
+        self.dropped = 0
+        self.capture_seconds = deque(maxlen=3600) # Per captured or dropped frame, on the caller's thread
+        self.write_seconds = deque(maxlen=3600)   # Per frame, on the writer thread
+        self._error = None
+        self._thread = threading.Thread(target=self._write, name="frame-capture", daemon=True)
+        self._thread.start()
+
+    def capture(self, surface):
+        """Queue a copy of surface for writing. Returns False if it was dropped."""
+        start = time.perf_counter()
+        try:
+            buffer = self._free.popleft()
+        except IndexError:
+            self.dropped += 1
+            self.capture_seconds.append(time.perf_counter() - start)
+            return False
+        if self.pix_fmt is None:
+            if self.downsampler is not None: self.downsampler.set_format(surface)
+            self.pix_fmt = 'gray' if self.downsampler is not None else raw_pix_fmt(surface)
+        numpy.copyto(buffer, _packed_rows(surface))
+        self._queue.put(buffer)
+        self.frames += 1
+        self.capture_seconds.append(time.perf_counter() - start)
+        return True
+
+    def _write(self):
+        while True:
+            buffer = self._queue.get()
+            if buffer is None:
+                return
+            start = time.perf_counter()
+            try:
+                frame = self.downsampler.rows(buffer) if self.downsampler is not None else buffer
+                if self._error is None: self._file.write(memoryview(frame).cast('B'))
+            except OSError as e: # Disk full and the like: keep draining, report at close()
+                self._error = e
+            self.write_seconds.append(time.perf_counter() - start)
+            self._free.append(buffer)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        height, width = self.frame_shape
+        with open(self.path + '.json', 'w') as f:
+            json.dump({'width': width, 'height': height, 'pix_fmt': self.pix_fmt or 'bgr0', 'fps': self.fps,
+                       'frames': self.frames, 'dropped': self.dropped}, f, indent=2)
+        if self._error is not None:
+            raise self._error
+
+    def stats(self):
+        ms = numpy.array(self.capture_seconds) * 1000.0 if self.capture_seconds else numpy.zeros(1)
+        write_ms = float(numpy.mean(self.write_seconds)) * 1000.0 if self.write_seconds else 0.0
+        total = self.frames + self.dropped
+        return (f"capture: {self.frames} frames, {self.dropped} dropped ({self.dropped / max(total, 1):.1%}); "
+                f"overhead mean {ms.mean():.3f} ms, p95 {numpy.percentile(ms, 95):.3f}, max {ms.max():.3f}; "
+                f"writer {write_ms:.3f} ms/frame")
+
+    def ffmpeg_hint(self):
+        height, width = self.frame_shape
+        return (f"ffmpeg -f rawvideo -pix_fmt {self.pix_fmt or 'bgr0'} -s {width}x{height} -r {self.fps} "
+                f"-i {self.path} {os.path.splitext(self.path)[0]}.mp4")
+
+
+# --- Benchmark ---
+def _naive_gray(surface, factor):
+    # The straightforward float version, for comparison and checking
+    with pixel_view(surface) as view:
+        rgb = view.astype(numpy.float32)
+    luma = rgb @ numpy.array([LUMA_R, LUMA_G, LUMA_B], dtype=numpy.float32) / 1024.0
+    width, height = luma.shape
+    return luma.reshape(width // factor, factor, height // factor, factor).mean(axis=(1, 3)).T
+
+
+def main():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import tempfile
+    from kong_bench import wander_inputs
+    from kong_render import Renderer, load_fonts
+    from kong_sim import GameSim, WIDTH, HEIGHT
+
+    parser = argparse.ArgumentParser(description="Measure frame observation and capture overhead (SDL dummy video)")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--stress", type=float, default=0.5, help="extra barrels per frame, for a busy scene")
+    parser.add_argument("--factors", type=int, nargs="*", default=[2, 4], help="grayscale downsample factors")
+    parser.add_argument("--fps", type=int, default=60, help="pace the frames like the game loop; 0 = flat out")
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="where to write the capture files")
+    args = parser.parse_args()
+    os.makedirs(args.dir, exist_ok=True)
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    fonts = load_fonts()
+
+    def run(capture):
+        sim = GameSim(seed=0, endless=True, stress_spawn_per_tick=args.stress)
+        renderer = Renderer(screen, fonts)
+        clock = pygame.time.Clock()
+        frame_ms = []
+        for bits in wander_inputs(args.frames):
+            start = time.perf_counter()
+            sim.step(bits)
+            renderer.draw(sim)
+            renderer.present()
+            if capture is not None: capture.capture(screen)
+            frame_ms.append((time.perf_counter() - start) * 1000.0)
+            clock.tick(args.fps)
+        return numpy.mean(frame_ms)
+
+    baseline = run(None)
+    print(f"{args.frames} frames at {args.fps or 'uncapped'} fps, stress {args.stress:g}: "
+          f"{baseline:.3f} ms/frame of work without capture")
+    for factor in [None] + args.factors:
+        label = "raw" if factor is None else f"gray/{factor}"
+        path = os.path.join(args.dir, f"kong_capture_{label.replace('/', '')}.raw")
+        capture = FrameCapture(path, (WIDTH, HEIGHT), factor)
+        mean_ms = run(capture)
+        capture.close()
+        size = os.path.getsize(path)
+        print(f"  {label:7s} {mean_ms:7.3f} ms/frame (+{mean_ms - baseline:.3f})  {size / 2**20:7.1f} MB   {capture.stats()}")
+        os.remove(path); os.remove(path + '.json')
+
+    for factor in args.factors:
+        sampler = GrayDownsampler((WIDTH, HEIGHT), factor)
+        sampler(screen)
+        for name, fn in (("packed", lambda: sampler(screen)), ("float", lambda: _naive_gray(screen, factor))):
+            start = time.perf_counter()
+            for _ in range(50): fn()
+            print(f"  gray/{factor} {name:6s} {(time.perf_counter() - start) / 50 * 1000:7.3f} ms")
+        error = numpy.abs(sampler(screen).astype(numpy.float32) - _naive_gray(screen, factor)).max()
+        print(f"  gray/{factor} max difference from float: {error:.2f} levels")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1") # Once per worker otherwise
+
+from kong_levels import GIRDER_VISUAL_HEIGHT, builtin_levels, load_level_pack
+from kong_nav import AutoplayBot
+from kong_replay import Recording
+from kong_sim import (
+    GameSim, GRAVITY, DEATH_BARREL, DEATH_FALL,
+    STATE_PLAYING, STATE_GAME_OVER_LOST,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_JUMP,
+)
+
+# Difficulty-tuning episode farm. Sweeps a grid of barrel spawn rate, barrel
+# roll speed and gravity for one level, plays seeded headless episodes of it
+# on every core and reports survival time, deaths by cause and score spread
+# per setting. An episode ends when the level is cleared, the game is lost,
+# or after --max-seconds.
+#
+#   python kong_farm.py --level 1 --spawn-rates 1500 2000 2500 --roll-speeds 2.2 3 --episodes 500
+#
+# Work goes out in chunks of episodes and comes back as fixed-size
+# EpisodeStats, merged as chunks finish with a bounded number in flight, so
+# memory stays flat however many episodes or frames are run.
+
+OUTCOME_CLEARED = 'cleared'
+OUTCOME_GAME_OVER = 'game_over'
+OUTCOME_TIMEOUT = 'timeout'
+
+SURVIVAL_BIN_S = 1.0 # Histogram bin widths
+SCORE_BIN = 25
+
+
+# --- Policies ---
+class ClimberBot:
+    """Scripted player: heads for the nearest ladder up from its girder and
+    climbs it, walks towards the goal on the top girder, and jumps barrels that
+    get close on its own level. `noise` is the chance per frame of a random jump."""
+
+    def __init__(self, seed, noise=0.01):
+        self.rng = random.Random(seed)
+        self.noise = noise
+        self._level = None
+        self._ladders = () # (centerx, top, bottom, width) of ladders that reach a girder
+
+    def _usable_ladders(self, level):
+        # Broken ladders stop short of the girder above; climbing those is a dead end
+        return tuple((l.centerx, l.top, l.bottom, l.width) for l in level.ladders
+                     if any(g.left <= l.centerx <= g.right and abs(g.surface_y(l.centerx) - l.top) < GIRDER_VISUAL_HEIGHT
+                            for g in level.girders))
+
+    def __call__(self, sim):
+        player = sim.player_rect
+        if sim.player_climbing:
+            return INPUT_UP
+        if sim.level is not self._level:
+            self._level = sim.level
+            self._ladders = self._usable_ladders(sim.level)
+        px, feet = player.centerx, player.bottom
+
+        target_x = None; best = None
+        for x, top, bottom, width in self._ladders:
+            if not top < feet - 8 < bottom + 16: # Feet on this ladder, below the girder it leads to
+                continue
+            if abs(px - x) < width * 0.75:
+                return INPUT_UP # GameSim lands the player on the girder once the feet clear the top
+            if abs(bottom - feet) < 24 and (best is None or abs(px - x) < best):
+                best = abs(px - x); target_x = x
+        if target_x is None:
+            target_x = sim.g_goal_rect.centerx
+
+        inputs = INPUT_RIGHT if target_x > px else INPUT_LEFT
+        if sim.player_on_ground:
+            if self.rng.random() < self.noise:
+                inputs |= INPUT_JUMP
+            elif len(sim.barrels):
+                centerx, centery, _ = sim.barrels.live_arrays()
+                near = (abs(centerx - px) < 48) & (abs(centery - player.centery) < 24)
+                if near.any(): inputs |= INPUT_JUMP
+        return inputs
+
+
+class RecordedInputs:
+    """Plays a kong_replay Recording's inputs open-loop, looping at the end."""
+
+    def __init__(self, recording):
+        self.inputs = list(recording.inputs()) or [0]
+        self.frame = 0
+
+    def __call__(self, sim):
+        bits = self.inputs[self.frame % len(self.inputs)]
+        self.frame += 1
+        return bits
+
+
+# --- Aggregation ---
+class EpisodeStats:
+    """Fixed-size summary of any number of episodes; merge() adds two together."""
+
+    def __init__(self):
+        self.episodes = 0
+        self.frames = 0
+        self.outcomes = Counter()
+        self.deaths = Counter()
+        self.survival_hist = Counter() # SURVIVAL_BIN_S bin -> episodes
+        self.score_hist = Counter()    # SCORE_BIN bin -> episodes
+        self.score_sum = 0.0
+        self.survival_sum = 0.0
+
+    def add(self, outcome, frames, survival_s, score, deaths):
+        self.episodes += 1
+        self.frames += frames
+        self.outcomes[outcome] += 1
+        self.deaths.update(cause for _, cause in deaths)
+        self.survival_hist[int(survival_s // SURVIVAL_BIN_S)] += 1
+        self.score_hist[int(score // SCORE_BIN)] += 1
+        self.score_sum += score
+        self.survival_sum += survival_s
+
+    def merge(self, other):
+        self.episodes += other.episodes
+        self.frames += other.frames
+        self.outcomes.update(other.outcomes)
+        self.deaths.update(other.deaths)
+        self.survival_hist.update(other.survival_hist)
+        self.score_hist.update(other.score_hist)
+        self.score_sum += other.score_sum
+        self.survival_sum += other.survival_sum
+
+    @staticmethod
+    def _percentile(hist, bin_width, q):
+        # Upper edge of the bin holding the q-th quantile
+        target = q * sum(hist.values())
+        seen = 0
+        for b in sorted(hist):
+            seen += hist[b]
+            if seen >= target:
+                return (b + 1) * bin_width
+        return 0.0
+
+    def summary(self):
+        n = max(1, self.episodes)
+        return {
+            'episodes': self.episodes,
+            'frames': self.frames,
+            'clear_rate': self.outcomes[OUTCOME_CLEARED] / n,
+            'game_over_rate': self.outcomes[OUTCOME_GAME_OVER] / n,
+            'timeout_rate': self.outcomes[OUTCOME_TIMEOUT] / n,
+            'survival_mean_s': self.survival_sum / n,
+            'survival_p10_s': self._percentile(self.survival_hist, SURVIVAL_BIN_S, 0.1),
+            'survival_p50_s': self._percentile(self.survival_hist, SURVIVAL_BIN_S, 0.5),
+            'survival_p90_s': self._percentile(self.survival_hist, SURVIVAL_BIN_S, 0.9),
+            'deaths_per_episode': {cause: self.deaths[cause] / n for cause in (DEATH_BARREL, DEATH_FALL)},
+            'score_mean': self.score_sum / n,
+            'score_p10': self._percentile(self.score_hist, SCORE_BIN, 0.1),
+            'score_p50': self._percentile(self.score_hist, SCORE_BIN, 0.5),
+            'score_p90': self._percentile(self.score_hist, SCORE_BIN, 0.9),
+        }
+
+
+# --- Episodes ---
+_worker_cache = {} # Per process: level set and recordings, loaded once
+
+def _load(levels_path, recording_paths):
+    key = (levels_path, tuple(recording_paths))
+    loaded = _worker_cache.get(key)
+    if loaded is None:
+        levels = load_level_pack(levels_path) if levels_path else builtin_levels()
+        recordings = [Recording.load(path) for path in recording_paths]
+        loaded = _worker_cache[key] = (levels, recordings)
+    return loaded
+
+
+def play_episode(levels, level_idx, gravity, seed, policy, max_frames):
+    """Play level_idx once. Returns (outcome, frames, survival seconds, score, deaths)."""
+    sim = GameSim(seed=seed, levels=levels, start_level=level_idx, gravity=gravity)
+    step = sim.step
+    while sim.game_state != STATE_PLAYING: step(0)
+    start_frame = sim.frame
+    outcome = OUTCOME_TIMEOUT
+    for _ in range(max_frames):
+        step(policy(sim))
+        if sim.is_level_won:
+            outcome = OUTCOME_CLEARED; break
+        if sim.game_state == STATE_GAME_OVER_LOST:
+            outcome = OUTCOME_GAME_OVER; break
+    frames = sim.frame - start_frame
+    # Survival = time until the first life was lost (or the whole episode)
+    first_death = sim.deaths[0][0] - start_frame if sim.deaths else frames
+    return outcome, frames, first_death / 60.0, sim.score, sim.deaths
+
+
+def run_chunk(task):
+    """Worker entry point: one setting, a run of seeds. Returns (config index, EpisodeStats)."""
+    config_idx, level_idx, spawn_rate, roll_speed, gravity, seeds, policy_name, levels_path, recording_paths, \
+        max_frames = task
+    levels, recordings = _load(levels_path, recording_paths)
+    tuned = list(levels)
+    tuned[level_idx] = levels[level_idx].replace(barrel_spawn_rate=spawn_rate, barrel_roll_speed=roll_speed)
+    stats = EpisodeStats()
+    for seed in seeds:
+        if policy_name == 'replay':
+            policy = RecordedInputs(recordings[seed % len(recordings)])
+        elif policy_name == 'nav':
+            policy = AutoplayBot(restart=False)
+        else:
+            policy = ClimberBot(seed)
+        stats.add(*play_episode(tuned, level_idx, gravity, seed, policy, max_frames))
+    return config_idx, stats
+
+
+def make_tasks(configs, args, recording_paths):
+    for config_idx, (spawn_rate, roll_speed, gravity) in enumerate(configs):
+        for first in range(0, args.episodes, args.chunk):
+            seeds = range(args.seed + first, args.seed + min(args.episodes, first + args.chunk))
+            yield (config_idx, args.level - 1, spawn_rate, roll_speed, gravity, seeds, args.policy,
+                   args.levels, recording_paths, int(args.max_seconds * 60))
+
+
+def run_farm(configs, tasks, workers, max_in_flight):
+    """Run tasks on a process pool, merging results as they arrive. Returns [EpisodeStats] per config."""
+    results = [EpisodeStats() for _ in configs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for task in tasks:
+            pending.add(pool.submit(run_chunk, task))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    config_idx, stats = future.result()
+                    results[config_idx].merge(stats)
+        for future in pending:
+            config_idx, stats = future.result()
+            results[config_idx].merge(stats)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep barrel spawn rate / roll speed / gravity over headless episodes")
+    parser.add_argument("--level", type=int, default=1, help="level to tune (1-based)")
+    parser.add_argument("--levels", metavar="PACK", help="level pack to load instead of the built-in levels")
+    parser.add_argument("--spawn-rates", type=float, nargs="+", help="ms between barrels (default: the level's)")
+    parser.add_argument("--roll-speeds", type=float, nargs="+", help="px per frame (default: the level's)")
+    parser.add_argument("--gravities", type=float, nargs="+", default=[GRAVITY])
+    parser.add_argument("--episodes", type=int, default=200, help="episodes per setting")
+    parser.add_argument("--seed", type=int, default=0, help="first episode seed")
+    parser.add_argument("--max-seconds", type=float, default=120.0, help="simulated time limit per episode")
+    parser.add_argument("--policy", choices=['bot', 'nav', 'replay'], default='bot',
+                        help="bot: scripted ladder climber, nav: kong_nav autoplay, replay: recorded inputs")
+    parser.add_argument("--recordings", nargs="*", default=[], metavar="FILE",
+                        help="kong_replay recordings for --policy replay, cycled across seeds")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=16, help="episodes per task")
+    parser.add_argument("--json", metavar="FILE", help="write per-setting summaries to FILE")
+    args = parser.parse_args()
+    if args.policy == 'replay' and not args.recordings:
+        parser.error("--policy replay needs --recordings")
+
+    level = (load_level_pack(args.levels) if args.levels else builtin_levels())[args.level - 1]
+    configs = list(itertools.product(args.spawn_rates or [level.barrel_spawn_rate],
+                                     args.roll_speeds or [level.barrel_roll_speed], args.gravities))
+    print(f"{level.name}: {len(configs)} settings x {args.episodes} episodes on {args.workers} workers")
+
+    start = time.perf_counter()
+    results = run_farm(configs, make_tasks(configs, args, args.recordings), args.workers, args.workers * 4)
+    elapsed = time.perf_counter() - start
+
+    summaries = []
+    for (spawn_rate, roll_speed, gravity), stats in zip(configs, results):
+        s = stats.summary()
+        summaries.append(dict(spawn_rate=spawn_rate, roll_speed=roll_speed, gravity=gravity, **s))
+        deaths = s['deaths_per_episode']
+        print(f"spawn {spawn_rate:6.0f} ms  roll {roll_speed:4.2f}  gravity {gravity:4.2f}: "
+              f"clear {s['clear_rate']:6.1%}  over {s['game_over_rate']:6.1%}  "
+              f"survive p10/p50/p90 {s['survival_p10_s']:.0f}/{s['survival_p50_s']:.0f}/{s['survival_p90_s']:.0f} s  "
+              f"deaths/ep barrel {deaths[DEATH_BARREL]:.2f} fall {deaths[DEATH_FALL]:.2f}  "
+              f"score p50 {s['score_p50']:.0f}")
+    frames = sum(stats.frames for stats in results)
+    episodes = sum(stats.episodes for stats in results)
+    print(f"{episodes:,} episodes, {frames:,} frames in {elapsed:.1f} s: "
+          f"{episodes / elapsed:,.1f} episodes/s, {frames / elapsed:,.0f} frames/s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'level': level.name, 'workers': args.workers, 'elapsed_s': elapsed, 'settings': summaries},
+                      f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
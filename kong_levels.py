@@ -0,0 +1,367 @@
+import argparse
+import struct
+
+import pygame
+
+# Level data for the Kong tribute. The define_level_*_elements generators are
+# the source of truth; compile_level() turns one of their dicts into an
+# immutable CompiledLevel with every girder's surface line precomputed, and
+# level packs store compiled levels on disk so they (and third-party levels)
+# load without running any generator code.
+
+WIDTH, HEIGHT = 600, 800
+GIRDER_VISUAL_HEIGHT = 15
+BARREL_ROLL_SPEED_BASE = 2.2
+
+# Helper function to get surface Y on a girder
+def get_girder_surface_y(entity_x_or_rect, girder_data):
+    if isinstance(entity_x_or_rect, pygame.Rect):
+        x_coord = entity_x_or_rect.centerx
+    else:
+        x_coord = entity_x_or_rect
+
+    g_rect_span = girder_data['rect'] # This rect is for horizontal span and visual top Y
+    clamped_x = max(g_rect_span.left, min(x_coord, g_rect_span.right))
+    relative_x = clamped_x - g_rect_span.left
+
+    if g_rect_span.width == 0:
+        return girder_data['y_start']
+
+    percentage_across = relative_x / g_rect_span.width
+    surface_y = girder_data['y_start'] + (girder_data['y_end'] - girder_data['y_start']) * percentage_across
+    return surface_y
+
+# --- Level Definitions ---
+def define_level_1_elements(width, height):
+    girders = []
+    gh = GIRDER_VISUAL_HEIGHT
+
+    y0_surf = height - 60
+    girders.append({'id': 'G0', 'rect': pygame.Rect(0, y0_surf - gh, width, gh), 'y_start': y0_surf, 'y_end': y0_surf})
+    y1_r_surf = height - 180; y1_l_surf = y1_r_surf - 35
+    girders.append({'id': 'G1', 'rect': pygame.Rect(50, y1_l_surf - gh, width - 100, gh), 'y_start': y1_l_surf, 'y_end': y1_r_surf})
+    y2_l_surf = height - 300; y2_r_surf = y2_l_surf - 35
+    girders.append({'id': 'G2', 'rect': pygame.Rect(50, y2_r_surf - gh, width - 100, gh), 'y_start': y2_l_surf, 'y_end': y2_r_surf})
+    y3_r_surf = height - 420; y3_l_surf = y3_r_surf - 35
+    girders.append({'id': 'G3', 'rect': pygame.Rect(50, y3_l_surf - gh, width - 100, gh), 'y_start': y3_l_surf, 'y_end': y3_r_surf})
+    y4_l_surf = height - 540; y4_r_surf = y4_l_surf - 35
+    girders.append({'id': 'G4_KONG', 'rect': pygame.Rect(50, y4_r_surf - gh, width - 100, gh), 'y_start': y4_l_surf, 'y_end': y4_r_surf})
+    KONG_PLATFORM_INDEX = 4
+
+    kong_size = (55, 45)
+    kong_x = 70
+    kong_stand_y = get_girder_surface_y(kong_x + kong_size[0]//2, girders[KONG_PLATFORM_INDEX])
+    kong_rect = pygame.Rect(kong_x, kong_stand_y - kong_size[1], kong_size[0], kong_size[1])
+
+    pauline_plat_y_surf = y4_l_surf - 100
+    girders.append({'id': 'TOP', 'rect': pygame.Rect(width // 2 - 70, pauline_plat_y_surf - gh, 140, gh), 'y_start': pauline_plat_y_surf, 'y_end': pauline_plat_y_surf})
+    GOAL_PLATFORM_INDEX = 5
+    pauline_size = (25,35)
+    goal_rect = pygame.Rect(width // 2 - pauline_size[0]//2, pauline_plat_y_surf - pauline_size[1], pauline_size[0], pauline_size[1])
+
+    ladders = []
+    lw = 18
+    lad_x = girders[1]['rect'].right - 30
+    lad_top_y = get_girder_surface_y(lad_x, girders[1])
+    lad_bottom_y = get_girder_surface_y(lad_x, girders[0])
+    ladders.append(pygame.Rect(lad_x - lw//2, lad_top_y, lw, lad_bottom_y - lad_top_y))
+
+    lad_x = girders[1]['rect'].centerx - 90
+    lad_bottom_y = get_girder_surface_y(lad_x, girders[1])
+    ladders.append(pygame.Rect(lad_x - lw//2, lad_bottom_y - 50, lw, 50)) # Broken ladder
+
+    lad_x = girders[2]['rect'].left + 30
+    lad_top_y = get_girder_surface_y(lad_x, girders[2])
+    lad_bottom_y = get_girder_surface_y(lad_x, girders[1])
+    ladders.append(pygame.Rect(lad_x - lw//2, lad_top_y, lw, lad_bottom_y - lad_top_y))
+
+    lad_x = girders[3]['rect'].right - 30
+    lad_top_y = get_girder_surface_y(lad_x, girders[3])
+    lad_bottom_y = get_girder_surface_y(lad_x, girders[2])
+    ladders.append(pygame.Rect(lad_x - lw//2, lad_top_y, lw, lad_bottom_y - lad_top_y))
+
+    lad_x = girders[KONG_PLATFORM_INDEX]['rect'].left + 30
+    lad_top_y = get_girder_surface_y(lad_x, girders[KONG_PLATFORM_INDEX])
+    lad_bottom_y = get_girder_surface_y(lad_x, girders[3])
+    ladders.append(pygame.Rect(lad_x - lw//2, lad_top_y, lw, lad_bottom_y - lad_top_y))
+
+    lad_x = girders[GOAL_PLATFORM_INDEX]['rect'].centerx
+    lad_top_y = get_girder_surface_y(lad_x, girders[GOAL_PLATFORM_INDEX])
+    lad_bottom_y = get_girder_surface_y(lad_x, girders[KONG_PLATFORM_INDEX])
+    ladders.append(pygame.Rect(lad_x - lw//2, lad_top_y, lw, lad_bottom_y - lad_top_y))
+
+    oil_drum_size = (35,35)
+    oil_drum_x = 40
+    oil_drum_rect = pygame.Rect(oil_drum_x, get_girder_surface_y(oil_drum_x + oil_drum_size[0]//2, girders[0]) - oil_drum_size[1], oil_drum_size[0], oil_drum_size[1])
+
+    # Adjust visual rects' top based on y_start/y_end for sloped girders
+    for g in girders:
+        g['rect'].top = min(g['y_start'], g['y_end']) - gh if g['y_start'] != g['y_end'] else g['y_start'] - gh
+        g['rect'].height = gh + abs(g['y_start'] - g['y_end']) if g['y_start'] != g['y_end'] else gh
+
+
+    return {
+        "name": "25m - Rampage",
+        "girders_def": girders, "ladders_def": ladders, "kong_rect_def": kong_rect,
+        "goal_rect_def": goal_rect, "oil_drum_rect_def": oil_drum_rect,
+        "player_start_x_offset": width / 10, "player_start_girder_idx": 0,
+        "barrel_spawn_rate": 2600, "kong_platform_idx_ref": KONG_PLATFORM_INDEX,
+        "barrel_roll_speed": BARREL_ROLL_SPEED_BASE,
+    }
+
+def define_level_2_elements(width, height):
+    girders = []
+    gh = GIRDER_VISUAL_HEIGHT
+
+    y0_surf = height - 60
+    girders.append({'id': 'L2G0', 'rect': pygame.Rect(0, y0_surf - gh, width, gh), 'y_start': y0_surf, 'y_end': y0_surf})
+    y1_surf = height - 200
+    girders.append({'id': 'L2G1', 'rect': pygame.Rect(width * 0.1, y1_surf - gh, width * 0.8, gh), 'y_start': y1_surf, 'y_end': y1_surf})
+    y2_surf = height - 360
+    girders.append({'id': 'L2G2_KONG', 'rect': pygame.Rect(width * 0.05, y2_surf - gh, width * 0.9, gh), 'y_start': y2_surf, 'y_end': y2_surf})
+    KONG_PLATFORM_INDEX = 2
+    y3_surf = height - 520
+    girders.append({'id': 'L2G3_PAULINE', 'rect': pygame.Rect(width // 2 - 80, y3_surf - gh, 160, gh), 'y_start': y3_surf, 'y_end': y3_surf})
+    GOAL_PLATFORM_INDEX = 3
+
+    kong_size = (55, 45)
+    kong_x = width * 0.12
+    kong_stand_y = get_girder_surface_y(kong_x + kong_size[0]//2, girders[KONG_PLATFORM_INDEX])
+    kong_rect = pygame.Rect(kong_x, kong_stand_y - kong_size[1], kong_size[0], kong_size[1])
+
+    pauline_size = (25,35)
+    goal_rect = pygame.Rect(girders[GOAL_PLATFORM_INDEX]['rect'].centerx - pauline_size[0]//2,
+                            y3_surf - pauline_size[1], pauline_size[0], pauline_size[1])
+
+    ladders = []
+    lw = 18
+    lad_x = girders[1]['rect'].left + 40
+    lad_top_y = get_girder_surface_y(lad_x, girders[1]); lad_bottom_y = get_girder_surface_y(lad_x, girders[0])
+    ladders.append(pygame.Rect(lad_x - lw//2, lad_top_y, lw, lad_bottom_y - lad_top_y))
+
+    lad_x = girders[1]['rect'].centerx - 50 # Left-center ladder G1-G2
+    lad_top_y = get_girder_surface_y(lad_x, girders[2]); lad_bottom_y = get_girder_surface_y(lad_x, girders[1])
+    ladders.append(pygame.Rect(lad_x - lw//2, lad_top_y, lw, lad_bottom_y - lad_top_y))
+
+    lad_x = girders[1]['rect'].centerx + 50 # Right-center ladder G1-G2
+    lad_top_y = get_girder_surface_y(lad_x, girders[2]); lad_bottom_y = get_girder_surface_y(lad_x, girders[1])
+    ladders.append(pygame.Rect(lad_x - lw//2, lad_top_y, lw, lad_bottom_y - lad_top_y))
+
+
+    lad_x = girders[GOAL_PLATFORM_INDEX]['rect'].centerx
+    lad_top_y = get_girder_surface_y(lad_x, girders[GOAL_PLATFORM_INDEX]); lad_bottom_y = get_girder_surface_y(lad_x, girders[KONG_PLATFORM_INDEX])
+    ladders.append(pygame.Rect(lad_x - lw//2, lad_top_y, lw, lad_bottom_y - lad_top_y))
+
+    oil_drum_size = (35,35)
+    oil_drum_x = width - 70
+    oil_drum_rect = pygame.Rect(oil_drum_x, get_girder_surface_y(oil_drum_x + oil_drum_size[0]//2, girders[0]) - oil_drum_size[1], oil_drum_size[0], oil_drum_size[1])
+
+    for g in girders: # Ensure visual rects are set correctly for flat girders too
+        g['rect'].top = g['y_start'] - gh
+        g['rect'].height = gh
+
+    return {
+        "name": "50m - Factory Floor",
+        "girders_def": girders, "ladders_def": ladders, "kong_rect_def": kong_rect,
+        "goal_rect_def": goal_rect, "oil_drum_rect_def": oil_drum_rect,
+        "player_start_x_offset": width * 0.85, "player_start_girder_idx": 0,
+        "barrel_spawn_rate": 2300, "kong_platform_idx_ref": KONG_PLATFORM_INDEX,
+        "barrel_roll_speed": BARREL_ROLL_SPEED_BASE * 1.15,
+    }
+
+levels_data_generators = [define_level_1_elements, define_level_2_elements]
+
+
+# --- Compiled levels ---
+class _Frozen:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _init(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+
+class CompiledGirder(_Frozen):
+    """One girder: its span rect plus the surface line y = slope * x + intercept,
+    valid for left <= x <= right (x outside the span is clamped)."""
+
+    __slots__ = ('id', 'rect', 'left', 'right', 'top', 'bottom', 'y_start', 'y_end', 'slope', 'intercept', 'land_dir')
+
+    def __init__(self, girder_id, rect, y_start, y_end):
+        left, top, width, height = rect
+        slope = (y_end - y_start) / width if width else 0.0
+        self._init(id=girder_id, rect=tuple(rect), left=left, right=left + width, top=top, bottom=top + height,
+                   y_start=y_start, y_end=y_end, slope=slope, intercept=y_start - slope * left,
+                   # Roll direction a barrel picks up here: +1 downhill right, -1 left, 0 flat
+                   land_dir=(y_end > y_start) - (y_end < y_start))
+
+    def surface_y(self, x_coord):
+        return max(self.left, min(x_coord, self.right)) * self.slope + self.intercept
+
+
+class CompiledLadder(_Frozen):
+    __slots__ = ('rect', 'left', 'right', 'top', 'bottom', 'centerx', 'width')
+
+    def __init__(self, rect):
+        left, top, width, height = rect
+        self._init(rect=tuple(rect), left=left, right=left + width, top=top, bottom=top + height,
+                   centerx=left + width // 2, width=width)
+
+
+class CompiledLevel(_Frozen):
+    """Everything GameSim.load_level needs, with all derived geometry computed once."""
+
+    __slots__ = ('name', 'width', 'height', 'girders', 'ladders', 'girder_index',
+                 'kong_rect', 'goal_rect', 'oil_drum_rect',
+                 'player_start_girder_idx', 'player_start_x', 'player_start',
+                 'barrel_spawn_rate', 'kong_platform_idx', 'barrel_roll_speed',
+                 'ladder_x', 'ladder_top', 'ladder_bottom')
+
+    def __init__(self, name, width, height, girders, ladders, kong_rect, goal_rect, oil_drum_rect,
+                 player_start_girder_idx, player_start_x, barrel_spawn_rate, kong_platform_idx, barrel_roll_speed):
+        girders = tuple(girders)
+        ladders = tuple(ladders)
+        start_girder = girders[player_start_girder_idx]
+        self._init(
+            name=name, width=width, height=height, girders=girders, ladders=ladders,
+            girder_index={g.id: i for i, g in enumerate(girders)},
+            kong_rect=tuple(kong_rect), goal_rect=tuple(goal_rect), oil_drum_rect=tuple(oil_drum_rect),
+            player_start_girder_idx=player_start_girder_idx, player_start_x=player_start_x,
+            player_start=(player_start_x, start_girder.surface_y(player_start_x)), # midbottom
+            barrel_spawn_rate=barrel_spawn_rate, kong_platform_idx=kong_platform_idx,
+            barrel_roll_speed=barrel_roll_speed,
+            # Ladder endpoints: centre column, top and bottom y
+            ladder_x=tuple(l.centerx for l in ladders),
+            ladder_top=tuple(l.top for l in ladders),
+            ladder_bottom=tuple(l.bottom for l in ladders),
+        )
+
+    def surface_y(self, x_coord, girder_idx):
+        return self.girders[girder_idx].surface_y(x_coord)
+
+    def replace(self, **changes):
+        """Copy of this level with some constructor arguments changed, e.g. barrel_spawn_rate=1800."""
+        fields = dict(name=self.name, width=self.width, height=self.height, girders=self.girders,
+                      ladders=self.ladders, kong_rect=self.kong_rect, goal_rect=self.goal_rect,
+                      oil_drum_rect=self.oil_drum_rect, player_start_girder_idx=self.player_start_girder_idx,
+                      player_start_x=self.player_start_x, barrel_spawn_rate=self.barrel_spawn_rate,
+                      kong_platform_idx=self.kong_platform_idx, barrel_roll_speed=self.barrel_roll_speed)
+        fields.update(changes)
+        return CompiledLevel(**fields)
+
+
+def compile_level(level_elements, width=WIDTH, height=HEIGHT):
+    """CompiledLevel from a define_level_*_elements() dict."""
+    return CompiledLevel(
+        level_elements["name"], width, height,
+        [CompiledGirder(g['id'], g['rect'], g['y_start'], g['y_end']) for g in level_elements["girders_def"]],
+        [CompiledLadder(l) for l in level_elements["ladders_def"]],
+        level_elements["kong_rect_def"], level_elements["goal_rect_def"], level_elements["oil_drum_rect_def"],
+        level_elements["player_start_girder_idx"], level_elements["player_start_x_offset"],
+        level_elements["barrel_spawn_rate"], level_elements["kong_platform_idx_ref"],
+        level_elements["barrel_roll_speed"],
+    )
+
+
+_builtin_levels = {}
+
+def builtin_levels(width=WIDTH, height=HEIGHT):
+    """The stock levels, compiled once per screen size."""
+    levels = _builtin_levels.get((width, height))
+    if levels is None:
+        levels = _builtin_levels[(width, height)] = tuple(
+            compile_level(level_func(width, height), width, height) for level_func in levels_data_generators)
+    return levels
+
+
+# --- Level packs ---
+# Little-endian binary: header, then per level its scalars, girders and ladders.
+# Slopes, intercepts, endpoints and the id map are rebuilt by CompiledLevel.
+PACK_MAGIC = b'KLVP'
+PACK_VERSION = 1
+_HEADER = struct.Struct('<4sHH')                    # magic, version, level count
+_LEVEL = struct.Struct('<HHddHHd4i4i4iHH')          # width, height, spawn rate, roll speed, start girder, kong girder,
+                                                    # start x, kong/goal/oil rects, n girders, n ladders
+_GIRDER = struct.Struct('<4idd')                    # rect, y_start, y_end
+_LADDER = struct.Struct('<4i')
+
+
+class LevelPackError(ValueError):
+    pass
+
+
+def _pack_str(text):
+    data = text.encode('utf-8')
+    return struct.pack('<H', len(data)) + data
+
+
+def save_level_pack(path, levels):
+    chunks = [_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(levels))]
+    for level in levels:
+        chunks.append(_pack_str(level.name))
+        chunks.append(_LEVEL.pack(level.width, level.height, level.barrel_spawn_rate, level.barrel_roll_speed,
+                                  level.player_start_girder_idx, level.kong_platform_idx, level.player_start_x,
+                                  *level.kong_rect, *level.goal_rect, *level.oil_drum_rect,
+                                  len(level.girders), len(level.ladders)))
+        for g in level.girders:
+            chunks.append(_pack_str(g.id))
+            chunks.append(_GIRDER.pack(*g.rect, g.y_start, g.y_end))
+        for ladder in level.ladders:
+            chunks.append(_LADDER.pack(*ladder.rect))
+    with open(path, 'wb') as f:
+        f.write(b''.join(chunks))
+
+
+def load_level_pack(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        magic, version, count = _HEADER.unpack_from(data, 0)
+        if magic != PACK_MAGIC:
+            raise LevelPackError(f"{path}: not a level pack")
+        if version != PACK_VERSION:
+            raise LevelPackError(f"{path}: unsupported level pack version {version}")
+        offset = _HEADER.size
+
+        def read_str():
+            nonlocal offset
+            (length,) = struct.unpack_from('<H', data, offset)
+            offset += 2 + length
+            return data[offset - length:offset].decode('utf-8')
+
+        levels = []
+        for _ in range(count):
+            name = read_str()
+            fields = _LEVEL.unpack_from(data, offset); offset += _LEVEL.size
+            width, height, spawn_rate, roll_speed, start_girder, kong_girder, start_x = fields[:7]
+            kong_rect, goal_rect, oil_drum_rect = fields[7:11], fields[11:15], fields[15:19]
+            n_girders, n_ladders = fields[19:21]
+            girders = []
+            for _ in range(n_girders):
+                girder_id = read_str()
+                values = _GIRDER.unpack_from(data, offset); offset += _GIRDER.size
+                girders.append(CompiledGirder(girder_id, values[:4], values[4], values[5]))
+            ladders = []
+            for _ in range(n_ladders):
+                ladders.append(CompiledLadder(_LADDER.unpack_from(data, offset))); offset += _LADDER.size
+            levels.append(CompiledLevel(name, width, height, girders, ladders, kong_rect, goal_rect, oil_drum_rect,
+                                        start_girder, start_x, spawn_rate, kong_girder, roll_speed))
+    except (struct.error, UnicodeDecodeError, IndexError) as e:
+        raise LevelPackError(f"{path}: corrupt level pack ({e})") from e
+    return tuple(levels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the built-in Kong levels into a level pack")
+    parser.add_argument("output", help="level pack file to write, e.g. levels.klp")
+    args = parser.parse_args()
+    levels = builtin_levels()
+    save_level_pack(args.output, levels)
+    print(f"wrote {len(levels)} levels to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
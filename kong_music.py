@@ -0,0 +1,300 @@
+import argparse
+import os
+import threading
+import time
+from collections import deque
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy
+import pygame
+
+from kong_assets import MIXER_BUFFER, SAMPLE_RATE
+
+# Streaming background music. Synth composes a bar at a time from a seeded
+# RNG (bass on the chord root, a lead line walking the minor pentatonic,
+# offbeat hats) and renders it to PCM in CHUNK_FRAMES pieces; nothing longer
+# than the current bar and a few chunks ever exists, however long it plays.
+#
+# MusicSequencer runs Synth on a worker thread and keeps one reserved mixer
+# channel double-buffered: one chunk playing, the next waiting in
+# Channel.queue(). The worker refills the queue as soon as it empties, so
+# the game loop only ever sets the tempo. Tempo changes land on the next
+# sixteenth after the chunk being rendered, i.e. at most two chunks plus the
+# mixer's buffer after follow() is called.
+#
+#   python kong_music.py --bench 60     # synthesis speed against real time
+#   python kong_music.py --check 20     # underruns and latency alongside a running game
+
+CHUNK_FRAMES = 2048 # Samples per queued chunk, ~46 ms at 44.1 kHz
+MUSIC_VOLUME = 0.12 # Under the sound cues
+BASE_BPM = 112.0
+MAX_BPM = 168.0
+BPM_PER_BARREL = 4.0 # follow(): each live barrel pushes the tempo up this much
+STEPS_PER_BAR = 16 # Sixteenth notes
+ATTACK_SAMPLES = 64 # Linear fade-in on every note, against clicks
+
+# Chord roots per bar, semitones above A: i, VI, VII, v
+PROGRESSION = (0, 8, 10, 7)
+PENTATONIC = (0, 3, 5, 7, 10)
+BASS_ROOT = 33 # A1, MIDI
+LEAD_ROOT = 69 # A4
+
+
+def midi_freq(note):
+    return 440.0 * 2.0 ** ((note - 69) / 12.0)
+
+
+class _Voice:
+    """One monophonic oscillator with a decaying envelope; a new note cuts the last."""
+    __slots__ = ('shape', 'gain', 'decay', 'phase', 'step', 'age', 'rng')
+
+    def __init__(self, shape, gain, decay_s, sample_rate, rng=None):
+        self.shape = shape
+        self.gain = gain
+        self.decay = decay_s * sample_rate # Samples to fall to 1/e
+        self.phase = 0.0
+        self.step = 0.0 # Cycles per sample; 0 = silent
+        self.age = 0
+        self.rng = rng
+
+    def note_on(self, freq, sample_rate):
+        self.step = freq / sample_rate
+        self.age = 0
+
+    def render(self, out, t, env, wave):
+        """Add this voice to out; t is arange(len(out)), env and wave are scratch of the same length."""
+        if not self.step:
+            return
+        n = len(out)
+        numpy.add(t, self.age, out=env)
+        numpy.minimum(env, ATTACK_SAMPLES, out=wave)
+        wave *= self.gain / ATTACK_SAMPLES
+        env *= -1.0 / self.decay
+        numpy.exp(env, out=env)
+        env *= wave
+        if self.shape == 'noise':
+            wave[:] = self.rng.random(n)
+            wave -= 0.5
+        else:
+            numpy.multiply(t, self.step, out=wave)
+            wave += self.phase
+            wave %= 1.0
+            if self.shape == 'square':
+                numpy.greater_equal(wave, 0.5, out=wave, casting='unsafe')
+            else: # Triangle
+                wave -= 0.5
+                numpy.abs(wave, out=wave)
+            wave -= 0.5 # Both now span [-0.5, 0.5]
+        env *= wave
+        out += env
+        self.phase = (self.phase + n * self.step) % 1.0
+        self.age += n
+        if self.age > self.decay * 8: # Inaudible: stop spending time on it
+            self.step = 0.0
+
+
+class Synth:
+    """The music as PCM: render(bpm) returns the next CHUNK_FRAMES as int16 (frames, channels).
+
+    Returned arrays come from a ring of three and are overwritten three calls later.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, channels=2, chunk_frames=CHUNK_FRAMES, seed=0, volume=MUSIC_VOLUME):
+        self.sample_rate = sample_rate
+        self.chunk_frames = chunk_frames
+        self.volume = volume
+        self.rng = numpy.random.default_rng(seed)
+        self.bass = _Voice('square', 0.6, 0.25, sample_rate)
+        self.lead = _Voice('triangle', 0.9, 0.18, sample_rate)
+        self.hat = _Voice('noise', 0.35, 0.012, sample_rate, self.rng)
+        self.voices = (self.bass, self.lead, self.hat)
+        self._t = numpy.arange(chunk_frames, dtype=numpy.float64)
+        self._mix = numpy.zeros(chunk_frames)
+        self._env = numpy.empty(chunk_frames)
+        self._wave = numpy.empty(chunk_frames)
+        self._out = [numpy.zeros((chunk_frames, channels), dtype=numpy.int16) for _ in range(3)]
+        self._next_out = 0
+        self.bar = -1
+        self.step = STEPS_PER_BAR - 1
+        self._step_left = 0 # Samples left in the current sixteenth
+        self._pattern = None
+
+    def compose_bar(self):
+        """(bass, lead, hat) for the next bar: per-step MIDI notes (None = rest) and hat hits."""
+        rng = self.rng
+        self.bar += 1
+        root = PROGRESSION[self.bar % len(PROGRESSION)]
+        bass = [None] * STEPS_PER_BAR
+        for step in (0, 3, 8, 11):
+            bass[step] = BASS_ROOT + root
+        bass[14] = BASS_ROOT + root + 12
+        lead = [None] * STEPS_PER_BAR
+        degree = int(rng.integers(0, len(PENTATONIC)))
+        for step in range(0, STEPS_PER_BAR, 2):
+            if rng.random() < 0.3:
+                continue
+            degree = min(max(degree + int(rng.integers(-2, 3)), 0), 2 * len(PENTATONIC) - 1)
+            octave, index = divmod(degree, len(PENTATONIC))
+            lead[step] = LEAD_ROOT + 12 * octave + PENTATONIC[index]
+        hat = [step % 4 == 2 or rng.random() < 0.2 for step in range(STEPS_PER_BAR)]
+        return bass, lead, hat
+
+    def _next_step(self, bpm):
+        self.step += 1
+        if self.step == STEPS_PER_BAR:
+            self.step = 0
+            self._pattern = self.compose_bar()
+        bass, lead, hat = self._pattern
+        if bass[self.step] is not None: self.bass.note_on(midi_freq(bass[self.step]), self.sample_rate)
+        if lead[self.step] is not None: self.lead.note_on(midi_freq(lead[self.step]), self.sample_rate)
+        if hat[self.step]: self.hat.note_on(1.0, self.sample_rate)
+        self._step_left = max(1, round(self.sample_rate * 60.0 / (bpm * 4)))
+
+    def render(self, bpm):
+        mix = self._mix
+        mix[:] = 0.0
+        pos = 0
+        n = self.chunk_frames
+        while pos < n:
+            if self._step_left == 0:
+                self._next_step(bpm)
+            k = min(n - pos, self._step_left)
+            for voice in self.voices:
+                voice.render(mix[pos:pos + k], self._t[:k], self._env[:k], self._wave[:k])
+            pos += k
+            self._step_left -= k
+        mix *= 32767 * self.volume
+        numpy.clip(mix, -32767, 32767, out=mix)
+        out = self._out[self._next_out]
+        self._next_out = (self._next_out + 1) % len(self._out)
+        out[:] = mix[:, None] # Same on every output channel
+        return out
+
+
+# --- Streaming ---
+class MusicSequencer:
+    """Streams Synth into a reserved mixer channel from a worker thread. Needs an initialized mixer."""
+
+    def __init__(self, seed=0, chunk_frames=CHUNK_FRAMES, volume=MUSIC_VOLUME):
+        sample_rate, _, channels = pygame.mixer.get_init()
+        pygame.mixer.set_reserved(1) # Sound.play() never picks channel 0 now
+        self.channel = pygame.mixer.Channel(0)
+        self.synth = Synth(sample_rate, channels, chunk_frames, seed, volume)
+        self.chunk_s = chunk_frames / sample_rate
+        self.device_s = MIXER_BUFFER / sample_rate # What the mixer holds before it reaches the device
+        self.bpm = BASE_BPM
+        self.chunks = 0
+        self.underruns = 0 # Times the queue ran dry and the channel went silent
+        self.synth_ms = deque(maxlen=1000)
+        self.latency_ms = deque(maxlen=1000) # Tempo read -> chunk start at the device
+        self.max_poll_gap_ms = 0.0 # Longest the worker went without looking at the channel
+        self._queued_at = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="music", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def follow(self, barrels):
+        """Set the tempo from the number of live barrels (called every frame; just an attribute write)."""
+        self.bpm = min(MAX_BPM, BASE_BPM + BPM_PER_BARREL * barrels)
+
+    def _render(self):
+        start = time.perf_counter()
+        sound = pygame.mixer.Sound(buffer=self.synth.render(self.bpm))
+        now = time.perf_counter()
+        self.synth_ms.append((now - start) * 1000.0)
+        self.chunks += 1
+        return sound, start
+
+    def _run(self):
+        sound, _ = self._render()
+        self.channel.play(sound)
+        sound, self._queued_at = self._render()
+        self.channel.queue(sound)
+        poll = self.chunk_s / 4
+        last = time.perf_counter()
+        while not self._stop.wait(poll):
+            now = time.perf_counter()
+            self.max_poll_gap_ms = max(self.max_poll_gap_ms, (now - last) * 1000.0)
+            last = now
+            if self.channel.get_queue() is not None:
+                continue
+            # The queued chunk is playing now
+            self.latency_ms.append((now - self._queued_at + self.device_s) * 1000.0)
+            sound, self._queued_at = self._render()
+            if self.channel.get_busy():
+                self.channel.queue(sound)
+            else:
+                self.underruns += 1
+                self.channel.play(sound)
+
+    def close(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.channel.stop()
+
+    def stats(self):
+        synth = numpy.array(self.synth_ms or [0.0])
+        latency = numpy.array(self.latency_ms or [0.0])
+        return (f"music: {self.chunks} chunks of {self.chunk_s * 1000:.1f} ms, {self.underruns} underruns, "
+                f"synth {synth.mean():.2f} ms mean / {synth.max():.2f} max, "
+                f"tempo-to-device {latency.mean():.1f} ms mean / {latency.max():.1f} max "
+                f"(mixer buffer {self.device_s * 1000:.1f} ms), worker poll gap {self.max_poll_gap_ms:.1f} ms max")
+
+
+def main():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    parser = argparse.ArgumentParser(description="Music synthesis benchmark and streaming check")
+    parser.add_argument("--bench", type=float, metavar="SECONDS", help="synthesize SECONDS of music flat out")
+    parser.add_argument("--check", type=float, metavar="SECONDS",
+                        help="stream music for SECONDS while a game runs at 60 fps; report underruns and latency")
+    parser.add_argument("--stress", type=float, default=0.5, help="with --check: extra barrels per frame")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.bench:
+        synth = Synth(seed=args.seed)
+        chunks = int(args.bench * SAMPLE_RATE / synth.chunk_frames)
+        for bpm in (BASE_BPM, MAX_BPM):
+            start = time.perf_counter()
+            for _ in range(chunks):
+                synth.render(bpm)
+            elapsed = time.perf_counter() - start
+            audio = chunks * synth.chunk_frames / SAMPLE_RATE
+            print(f"{bpm:5.0f} bpm: {audio:.1f} s of audio in {elapsed * 1000:.1f} ms "
+                  f"({audio / elapsed:,.0f}x real time, {elapsed / chunks * 1e6:.0f} us per {synth.chunk_frames}-frame chunk)")
+
+    if args.check:
+        from kong_bench import wander_inputs
+        from kong_render import Renderer, load_fonts
+        from kong_sim import GameSim, WIDTH, HEIGHT
+        pygame.init()
+        pygame.mixer.quit()
+        pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=MIXER_BUFFER)
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        renderer = Renderer(screen, load_fonts())
+        sim = GameSim(seed=args.seed, endless=True, stress_spawn_per_tick=args.stress)
+        clock = pygame.time.Clock()
+        music = MusicSequencer(args.seed).start()
+        bpm = set()
+        for bits in wander_inputs(int(args.check * 60)):
+            pygame.event.pump()
+            sim.step(bits)
+            music.follow(len(sim.barrels))
+            bpm.add(music.bpm)
+            renderer.draw(sim)
+            renderer.present()
+            clock.tick(60)
+        music.close()
+        print(f"{args.check:g} s at 60 fps, stress {args.stress:g}, tempo {min(bpm):.0f}-{max(bpm):.0f} bpm")
+        print(music.stats())
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy
+
+from kong_barrels import NO_GIRDER, snap1
+from kong_levels import GIRDER_VISUAL_HEIGHT, builtin_levels, load_level_pack
+from kong_sim import (
+    GameSim, GRAVITY, PLAYER_JUMP_STRENGTH, PLAYER_SPEED, PLAYER_CLIMB_SPEED,
+    STATE_PLAYING, STATE_GAME_OVER_LOST, STATE_VICTORY, SOUND_HIT,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_JUMP, INPUT_RESTART,
+)
+
+# Navigation graph over a CompiledLevel and an autoplay player that uses it.
+#
+# Nodes are stops on girders: both ends of every ladder, jump and drop-off,
+# plus the player start and the goal. Walking links the stops of a girder in x
+# order; ladders link the girder a ladder stands on to the one its top meets;
+# jumps link a girder to one above it within a standing jump's reach (GameSim
+# only lands a falling player, so jumps pass up through girders); drop-offs
+# link a girder's end to whatever girder is below it. Edge costs are frames.
+# Levels have a few dozen stops, so all-pairs shortest paths (Floyd-Warshall)
+# are solved once per level and the autoplay player only ever looks up the
+# best exit from the girder it is standing on.
+#
+#   python kong_nav.py                      # check the built-in levels for broken layouts
+#   python kong_nav.py --soak 100000        # autoplay headless and report frames/s
+
+PLAYER_SIZE = 28 # GameSim.player_rect
+LADDER_REACH = GIRDER_VISUAL_HEIGHT # How far a ladder end may be from a girder surface and still meet it
+JUMP_MARGIN = 2 # px kept clear of a jump's exact reach
+
+EDGE_WALK = 'walk'
+EDGE_LADDER = 'ladder'
+EDGE_JUMP = 'jump'
+EDGE_DROP = 'drop'
+
+
+# --- Player kinematics ---
+# Same per-frame integration and Rect rounding as GameSim._update_playing
+
+def jump_landings(gravity=GRAVITY):
+    """(frame, rise, landing window) for every frame of a standing jump from the
+    top of the arc until it is back at take-off height: a girder `d` px above the
+    take-off surface catches the player on the first frame with rise <= d <= rise + window,
+    the window being that frame's drop plus the landing tolerance (GirderArrays.landing1)."""
+    y = 0; vy = PLAYER_JUMP_STRENGTH; frame = 0; landings = []
+    while True:
+        frame += 1
+        previous_y = y
+        vy += gravity; y = snap1(y + vy)
+        if vy >= -0.1:
+            if y > 0: return landings
+            landings.append((frame, -y, (y - previous_y) + GIRDER_VISUAL_HEIGHT / 2))
+
+
+def jump_reach(gravity=GRAVITY):
+    """Highest girder, in px above the take-off surface, a standing jump lands on."""
+    return max(rise + window for _, rise, window in jump_landings(gravity))
+
+
+def fall_frames(height, gravity=GRAVITY):
+    """Frames to fall `height` px from standing."""
+    y = 0; vy = 0.0; frame = 0
+    while y < height:
+        frame += 1
+        vy += gravity; y = snap1(y + vy)
+    return frame
+
+
+# --- Graph ---
+class NavEdge:
+    __slots__ = ('kind', 'src', 'dst', 'cost', 'ladder')
+
+    def __init__(self, kind, src, dst, cost, ladder=-1):
+        self.kind = kind
+        self.src = src # Stop indices
+        self.dst = dst
+        self.cost = cost # Frames
+        self.ladder = ladder # Level ladder index for EDGE_LADDER
+
+    def __repr__(self):
+        return f"NavEdge({self.kind}, {self.src} -> {self.dst}, {self.cost:.0f})"
+
+
+class NavGraph:
+    """Stops, edges and all-pairs shortest paths for one CompiledLevel.
+
+    problems lists what is wrong with the layout (ladders that don't meet a
+    girder, a goal that can't be reached, ...) as human-readable strings.
+    """
+
+    def __init__(self, level, gravity=GRAVITY):
+        self.level = level
+        self.gravity = gravity
+        self.stop_girder = [] # Stop index -> girder index
+        self.stop_x = [] # Stop index -> player centerx
+        self.edges = []
+        self.problems = []
+        self.reach = jump_reach(gravity) - JUMP_MARGIN
+        self._landings = jump_landings(gravity)
+
+        self.start = self._stop(level.player_start_girder_idx, level.player_start_x)
+        goal_left, goal_top, goal_width, goal_height = level.goal_rect
+        goal_x = goal_left + goal_width / 2
+        goal_girder = self.girder_at(goal_x, goal_top + goal_height)
+        if goal_girder is None:
+            self.problems.append(f"goal at x={goal_x:.0f} isn't standing on a girder")
+            self.goal = None
+        else:
+            self.goal = self._stop(goal_girder, goal_x)
+
+        self._add_ladders()
+        self._add_jumps()
+        self._add_drops()
+        self._add_walks()
+        self._solve()
+        self._check_reachable()
+
+    def girder_at(self, x, surface_y, tolerance=LADDER_REACH):
+        """Index of the first girder under x whose surface is within tolerance of surface_y, or None."""
+        for i, g in enumerate(self.level.girders):
+            if g.left <= x <= g.right and abs(g.surface_y(x) - surface_y) < tolerance:
+                return i
+        return None
+
+    def on_ladder(self, girder, x):
+        """Whether a player standing on girder at centerx x counts as on a ladder
+        (GameSim._ladder_at), where they can't jump."""
+        feet = self.level.girders[girder].surface_y(x)
+        return any(l.left < x + PLAYER_SIZE / 2 and x - PLAYER_SIZE / 2 < l.right
+                   and l.top < feet and feet - PLAYER_SIZE < l.bottom and abs(x - l.centerx) < l.width * 0.75
+                   for l in self.level.ladders)
+
+    def _stop(self, girder, x):
+        self.stop_girder.append(girder); self.stop_x.append(x)
+        return len(self.stop_x) - 1
+
+    def _edge(self, kind, src_girder, src_x, dst_girder, dst_x, cost, ladder=-1):
+        self.edges.append(NavEdge(kind, self._stop(src_girder, src_x), self._stop(dst_girder, dst_x), cost, ladder))
+
+    def _add_ladders(self):
+        girders = self.level.girders
+        for i, ladder in enumerate(self.level.ladders):
+            x = ladder.centerx
+            bottom = self.girder_at(x, ladder.bottom)
+            top = self.girder_at(x, ladder.top)
+            if bottom is not None and top is not None and bottom != top:
+                self._edge(EDGE_LADDER, bottom, x, top, x, (ladder.bottom - ladder.top) / PLAYER_CLIMB_SPEED, i)
+                continue
+            for end, y, found in (('bottom', ladder.bottom, bottom), ('top', ladder.top, top)):
+                if found is not None: continue
+                # Name the girder the end was presumably meant to reach
+                side = 1 if end == 'bottom' else -1
+                gaps = [(abs(g.surface_y(x) - y), g.id) for g in girders
+                        if g.left <= x <= g.right and (g.surface_y(x) - y) * side > 0]
+                near = f", {min(gaps)[0]:.0f} px from {min(gaps)[1]}" if gaps else ""
+                self.problems.append(f"ladder {i} at x={x}: {end} (y={y}) doesn't meet a girder{near}")
+
+    def _add_jumps(self):
+        girders = self.level.girders
+        half = PLAYER_SIZE // 2
+        for a, low in enumerate(girders):
+            for b, high in enumerate(girders):
+                lo = max(low.left, high.left) + half; hi = min(low.right, high.right) - half
+                if a == b or lo > hi:
+                    continue
+                # Rise is linear in x, so the takeoff spots form one interval; sample it
+                spots = [x for x in numpy.linspace(lo, hi, 16).tolist()
+                         if 0 < low.surface_y(x) - high.surface_y(x) <= self.reach and not self.on_ladder(a, round(x))]
+                if not spots:
+                    continue
+                x = round(spots[len(spots) // 2])
+                rise = low.surface_y(x) - high.surface_y(x)
+                frames = next(f for f, r, window in self._landings if r <= rise <= r + window)
+                self._edge(EDGE_JUMP, a, x, b, x, frames)
+
+    def _add_drops(self):
+        girders = self.level.girders
+        half = PLAYER_SIZE // 2
+        for a, g in enumerate(girders):
+            for edge_x, off_x in ((g.left, g.left - half - 1), (g.right, g.right + half + 1)):
+                if not half <= off_x <= self.level.width - half:
+                    continue # Against the side of the screen: can't walk off
+                top = g.surface_y(edge_x)
+                below = [(h.surface_y(off_x), b) for b, h in enumerate(girders)
+                         if h.left < off_x + half and off_x - half < h.right and h.surface_y(off_x) > top]
+                if not below:
+                    continue # Falls off the level
+                landing_y, b = min(below)
+                self._edge(EDGE_DROP, a, off_x, b, off_x,
+                           PLAYER_SIZE / PLAYER_SPEED + fall_frames(landing_y - top, self.gravity))
+
+    def _add_walks(self):
+        by_girder = {}
+        for stop, girder in enumerate(self.stop_girder):
+            by_girder.setdefault(girder, []).append(stop)
+        for stops in by_girder.values():
+            stops.sort(key=self.stop_x.__getitem__)
+            for s, t in zip(stops, stops[1:]):
+                cost = abs(self.stop_x[t] - self.stop_x[s]) / PLAYER_SPEED
+                self.edges.append(NavEdge(EDGE_WALK, s, t, cost))
+                self.edges.append(NavEdge(EDGE_WALK, t, s, cost))
+        self.girder_stops = by_girder
+
+    def _solve(self):
+        n = len(self.stop_x)
+        dist = numpy.full((n, n), numpy.inf)
+        next_edge = numpy.full((n, n), -1, dtype=numpy.int32)
+        numpy.fill_diagonal(dist, 0.0)
+        for i, edge in enumerate(self.edges):
+            if edge.cost < dist[edge.src, edge.dst]:
+                dist[edge.src, edge.dst] = edge.cost; next_edge[edge.src, edge.dst] = i
+        for k in range(n):
+            via = dist[:, k, None] + dist[None, k, :]
+            better = via < dist
+            dist = numpy.where(better, via, dist)
+            next_edge = numpy.where(better, next_edge[:, k, None], next_edge)
+        self.dist = dist # Frames from stop to stop, inf where unreachable
+        self.next_edge = next_edge # Index into edges of the first hop, -1 where none
+
+    def path(self, src, dst):
+        """Edges of the shortest route from stop src to stop dst, [] if there is none."""
+        edges = []
+        while src != dst:
+            i = self.next_edge[src, dst]
+            if i < 0: return []
+            edges.append(self.edges[i]); src = self.edges[i].dst
+        return edges
+
+    def _check_reachable(self):
+        girders = self.level.girders
+        if self.goal is not None and not numpy.isfinite(self.dist[self.start, self.goal]):
+            self.problems.append("the goal can't be reached from the player start")
+        reachable = {self.stop_girder[s] for s in numpy.flatnonzero(numpy.isfinite(self.dist[self.start])).tolist()}
+        for i, g in enumerate(girders):
+            if i not in reachable:
+                self.problems.append(f"girder {g.id} can't be reached from the player start")
+
+    def exits(self, goal):
+        """{girder: [(x, edge or None, frames from x's stop to goal)]}: the ways off each
+        girder towards stop `goal`, None meaning the goal is on this girder at x."""
+        exits = {}
+        for girder, stops in self.girder_stops.items():
+            options = exits[girder] = []
+            for edge in self.edges:
+                if edge.kind != EDGE_WALK and self.stop_girder[edge.src] == girder:
+                    rest = self.dist[edge.dst, goal]
+                    if numpy.isfinite(rest): options.append((self.stop_x[edge.src], edge, edge.cost + float(rest)))
+            if self.stop_girder[goal] == girder:
+                options.append((self.stop_x[goal], None, 0.0))
+        return exits
+
+
+def check_layout(level, gravity=GRAVITY):
+    """Problems NavGraph finds with level's layout, [] for a sound one."""
+    return NavGraph(level, gravity).problems
+
+
+# --- Autoplay ---
+class AutoplayBot:
+    """Attract-mode player. Walks the NavGraph's shortest route to the goal and
+    jumps rolling barrels whose predicted path reaches it within `lookahead`
+    frames. Each call is a lookup of the best exit off the current girder plus a
+    fixed number of array ops over the barrels, whatever the level or barrel
+    count. Restarts the game on the game over / victory screen when `restart`."""
+
+    def __init__(self, lookahead=10, restart=True):
+        self.lookahead = lookahead
+        self.restart = restart
+        self._graphs = {} # id(level) -> (level, NavGraph, exits)
+        self._level = None
+        self._graph = None
+        self._exits = None
+        self._air_x = None # x to steer for while airborne on a route jump
+
+    def graph(self, sim):
+        """NavGraph for sim's current level, built the first time the level is seen."""
+        level = sim.level
+        if level is not self._level:
+            entry = self._graphs.get(id(level))
+            if entry is None or entry[0] is not level or entry[1].gravity != sim.gravity:
+                graph = NavGraph(level, sim.gravity)
+                entry = self._graphs[id(level)] = (level, graph, graph.exits(graph.goal) if graph.goal is not None else {})
+            self._level, self._graph, self._exits = entry
+        return self._graph
+
+    def _barrel_ahead(self, sim, walking):
+        # Rolling barrels at the player's height, closing in within the lookahead
+        barrels = sim.barrels
+        n = barrels.count
+        if not barrels.live:
+            return False
+        player = sim.player_rect
+        half = barrels.size / 2
+        dx = barrels.x[:n] + half - player.centerx
+        closing = sim.g_current_barrel_roll_speed + numpy.where(dx * walking > 0, PLAYER_SPEED, 0.0)
+        gap = numpy.abs(dx) - (half + PLAYER_SIZE / 2)
+        threat = (barrels.alive[:n] & (barrels.girder[:n] != NO_GIRDER) & (dx * barrels.dir[:n] < 0)
+                  & (numpy.abs(barrels.y[:n] + barrels.size - player.bottom) < 24)
+                  & (gap > -half) & (gap < closing * self.lookahead))
+        return bool(threat.any())
+
+    def _landing_blocked(self, sim, x, surface_y, frames):
+        # Rolling barrels on the landing girder that pass x during a jump of `frames` frames
+        barrels = sim.barrels
+        n = barrels.count
+        if not barrels.live:
+            return False
+        half = barrels.size / 2
+        start = barrels.x[:n] + half
+        end = start + barrels.dir[:n] * sim.g_current_barrel_roll_speed * frames
+        clear = half + PLAYER_SIZE / 2
+        crossing = (barrels.alive[:n] & (barrels.girder[:n] != NO_GIRDER)
+                    & (numpy.abs(barrels.y[:n] + barrels.size - surface_y) < 24)
+                    & (numpy.minimum(start, end) - clear < x) & (x < numpy.maximum(start, end) + clear))
+        return bool(crossing.any())
+
+    def __call__(self, sim):
+        if sim.game_state != STATE_PLAYING:
+            return INPUT_RESTART if self.restart and sim.game_state in (STATE_GAME_OVER_LOST, STATE_VICTORY) else 0
+        graph = self.graph(sim)
+        player = sim.player_rect
+        px = player.centerx
+        if sim.player_climbing:
+            return INPUT_UP
+        if not sim.player_on_ground:
+            if self._air_x is None or abs(self._air_x - px) <= PLAYER_SPEED: return 0
+            return INPUT_RIGHT if self._air_x > px else INPUT_LEFT
+        self._air_x = None
+
+        girder = graph.girder_at(px, player.bottom, 2)
+        options = self._exits.get(girder)
+        if not options:
+            return 0 # Nowhere to go from here (or a broken level)
+        x, edge, cost = min(options, key=lambda o: abs(o[0] - px) / PLAYER_SPEED + o[2])
+
+        walking = 0 if abs(x - px) <= PLAYER_SPEED / 2 else (1 if x > px else -1)
+        if walking == 0 and edge is not None and edge.kind == EDGE_DROP:
+            walking = 1 if x > graph.level.girders[girder].left else -1 # Keep going off the end
+        inputs = INPUT_RIGHT if walking > 0 else INPUT_LEFT if walking < 0 else 0
+        if not sim.player_on_ladder and self._barrel_ahead(sim, walking):
+            return INPUT_JUMP # Straight up: the barrel rolls under
+        if walking == 0 and edge is not None:
+            if edge.kind == EDGE_LADDER: return INPUT_UP
+            if edge.kind == EDGE_JUMP and not sim.player_on_ladder:
+                if self._landing_blocked(sim, x, graph.level.girders[graph.stop_girder[edge.dst]].surface_y(x), edge.cost):
+                    return 0 # Let it roll past first
+                self._air_x = x
+                return INPUT_JUMP
+        return inputs
+
+
+# --- Soak ---
+def soak(levels, frames, seed=0, lookahead=10):
+    """Autoplay `frames` frames headless. Returns (levels cleared, games lost, lives lost, seconds)."""
+    sim = GameSim(seed=seed, levels=levels)
+    bot = AutoplayBot(lookahead)
+    step = sim.step
+    cleared = lost = hits = 0
+    level_idx = sim.current_level_index
+    start = time.perf_counter()
+    for _ in range(frames):
+        state = sim.game_state
+        hits += SOUND_HIT in step(bot(sim))
+        if sim.current_level_index != level_idx or (sim.game_state == STATE_VICTORY and state != STATE_VICTORY):
+            if sim.game_state == STATE_VICTORY or sim.current_level_index > level_idx: cleared += 1
+            level_idx = sim.current_level_index
+        if sim.game_state == STATE_GAME_OVER_LOST and state != STATE_GAME_OVER_LOST:
+            lost += 1
+    return cleared, lost, hits, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check Kong level layouts and soak-test the autoplay player")
+    parser.add_argument("--levels", metavar="PACK", help="level pack to check instead of the built-in levels")
+    parser.add_argument("--gravity", type=float, default=GRAVITY)
+    parser.add_argument("--soak", type=int, default=0, metavar="FRAMES", help="then autoplay this many frames headless")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-v", "--verbose", action="store_true", help="print each level's route")
+    args = parser.parse_args()
+
+    levels = load_level_pack(args.levels) if args.levels else builtin_levels()
+    broken = 0
+    for i, level in enumerate(levels):
+        start = time.perf_counter()
+        graph = NavGraph(level, args.gravity)
+        elapsed = time.perf_counter() - start
+        print(f"level {i + 1} ({level.name}): {len(graph.stop_x)} stops, {len(graph.edges)} edges, "
+              f"solved in {elapsed * 1000:.1f} ms")
+        if args.verbose and graph.goal is not None:
+            route = graph.path(graph.start, graph.goal)
+            print("  route: " + " -> ".join(f"{e.kind} {level.girders[graph.stop_girder[e.dst]].id}"
+                                            for e in route if e.kind != EDGE_WALK)
+                  + (f" ({graph.dist[graph.start, graph.goal] / 60:.1f} s)" if route else "none"))
+        for problem in graph.problems:
+            print("  " + problem)
+        broken += bool(graph.problems)
+
+    if args.soak:
+        cleared, lost, hits, elapsed = soak(levels, args.soak, args.seed)
+        print(f"soak: {args.soak} frames in {elapsed:.2f} s ({args.soak / elapsed:.0f} frames/s), "
+              f"{cleared} levels cleared, {hits} lives and {lost} games lost")
+    sys.exit(1 if broken else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,592 @@
+import argparse
+import asyncio
+import os
+import socket
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy
+
+from kong_barrels import BarrelStore, NO_GIRDER
+from kong_replay import Recording
+from kong_sim import SimSnapshot, FRAME_MS, TICK_RATE, STATE_PLAYING, INPUT_JUMP, INPUT_RESTART
+
+# Netplay over TCP. NetServer owns the only authoritative GameSim and steps it
+# at TICK_RATE with whatever inputs the player client has sent; every other
+# client spectates. After each tick the state goes out as a KEYFRAME (all
+# scalars and barrel slots, zlib'd) or a DELTA (scalars XORed and barrel
+# columns subtracted against the previous broadcast, zlib'd). TCP delivers
+# in order, so a delta is encoded once per tick and the same bytes go to
+# every client: fan-out is one write per client, not one encode. A client
+# whose socket buffer backs up is skipped and gets a keyframe once it drains.
+#
+# Clients mirror the game in a local GameSim. The player's client runs
+# GameSim.move_player() on each input as it sends it; when a snapshot arrives
+# it restores the authoritative state and re-applies the inputs the server
+# hasn't acknowledged yet. Barrels are shown as the server last sent them.
+#
+#   python kong_net.py --serve --port 7777 --seed 1
+#   python kong_net.py --connect localhost:7777 [--spectate]
+#   python kong_net.py --load-test 1 50 100 200 --seconds 5   # loopback fan-out
+
+DEFAULT_PORT = 7777
+
+# --- Wire format ---
+# Every message: u32 payload length, u8 type, payload (little endian)
+_FRAME = struct.Struct('<IB')
+MSG_HELLO = 1    # client -> server: u8 role wanted
+MSG_WELCOME = 2  # server -> client: u8 role given, u64 seed, u16 start level, f64 stress, u32 tick, utf-8 level pack path
+MSG_INPUT = 3    # client -> server: u32 seq (from 1), u8 INPUT_* bits
+MSG_KEYFRAME = 4 # server -> client: _STATE header, zlib(scalars, barrel columns)
+MSG_DELTA = 5    # server -> client: _STATE header, zlib(scalars XOR previous, barrel columns - previous)
+
+ROLE_PLAYER = 0
+ROLE_SPECTATOR = 1
+
+_HELLO = struct.Struct('<B')
+_WELCOME = struct.Struct('<BQHdI')
+_INPUT = struct.Struct('<IB')
+_STATE = struct.Struct('<IIdI') # tick, last input seq applied, server time.monotonic() at encode, barrel slots
+# GameSim.snapshot() scalars without the deaths log
+_SCALARS = struct.Struct('<4hd3?bdB?dB?HdIddd')
+
+# Barrel slots travel as int16 columns: x, y, roll angle, flags
+ANGLE_STEPS = 16 # Roll angle in 1/16 degree
+FLAG_ALIVE = 1
+FLAG_ROLLING = 2 # On a girder (BarrelStore.girder != NO_GIRDER)
+DIR_SHIFT = 2 # dir + 1 in bits 2-3
+
+EDGE_INPUTS = INPUT_JUMP | INPUT_RESTART # Presses: applied once, never repeated
+MAX_INPUT_BACKLOG = 6 # Inputs queued past this are merged so the player never lags further behind
+MAX_WRITE_BUFFER = 256 * 1024 # Unsent bytes before a client is skipped until it drains
+MAX_STEPS_PER_TICK = 5 # As dkv0: past this far behind, drop the backlog rather than fast-forward
+STATS_TICKS = 60 * TICK_RATE # Per-tick stats kept for the last minute
+
+
+class NetProtocolError(ValueError):
+    pass
+
+
+def _message(msg_type, payload):
+    return _FRAME.pack(len(payload), msg_type) + payload
+
+
+async def read_message(reader):
+    """(type, payload) of the next message; raises asyncio.IncompleteReadError at EOF."""
+    length, msg_type = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+    return msg_type, await reader.readexactly(length)
+
+
+def _no_delay(writer):
+    sock = writer.get_extra_info('socket')
+    if sock is not None:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # One small message per tick: don't batch
+
+
+# --- State encoding ---
+def pack_scalars(scalars):
+    return _SCALARS.pack(*scalars[0], *scalars[1:7], *scalars[8:])
+
+def unpack_scalars(data):
+    values = _SCALARS.unpack(data)
+    return (values[0:4],) + values[4:10] + ((),) + values[10:]
+
+
+def barrel_columns(barrels):
+    """int16 (4, slots) array of a BarrelStore's slots [0:count), dead ones included
+    so a slot keeps meaning the same barrel from one tick to the next."""
+    n = barrels.count
+    columns = numpy.empty((4, n), dtype=numpy.int16)
+    columns[0] = barrels.x[:n]; columns[1] = barrels.y[:n]
+    columns[2] = numpy.round(barrels.roll_angle[:n] % 360.0 * ANGLE_STEPS)
+    columns[3] = (barrels.alive[:n] * FLAG_ALIVE | (barrels.girder[:n] != NO_GIRDER) * FLAG_ROLLING
+                  | (barrels.dir[:n] + 1) << DIR_SHIFT)
+    return columns
+
+def barrel_rows(columns):
+    """BarrelStore.ROW_DTYPE rows for barrel_columns() output. Girder indices
+    aren't sent: rolling barrels get girder 0, falling ones NO_GIRDER."""
+    flags = columns[3]
+    rows = numpy.zeros(columns.shape[1], dtype=BarrelStore.ROW_DTYPE)
+    rows['x'] = columns[0]; rows['y'] = columns[1]
+    rows['roll_angle'] = columns[2] / ANGLE_STEPS
+    rows['dir'] = (flags >> DIR_SHIFT) - 1
+    rows['girder'] = numpy.where(flags & FLAG_ROLLING, 0, NO_GIRDER)
+    rows['alive'] = flags & FLAG_ALIVE != 0
+    return rows
+
+
+def _resized(columns, slots):
+    # columns cut or zero-padded to `slots`
+    if columns.shape[1] == slots:
+        return columns
+    out = numpy.zeros((4, slots), dtype=numpy.int16)
+    n = min(slots, columns.shape[1])
+    out[:, :n] = columns[:, :n]
+    return out
+
+
+class StateEncoder:
+    """A GameSim's state as KEYFRAME / DELTA messages, each delta against the
+    state the previous update() saw."""
+
+    def __init__(self, level=1):
+        self.level = level # zlib level
+        self._header = None
+        self._scalars = None
+        self._columns = None
+        self._keyframe = None
+
+    def update(self, sim, tick, ack):
+        """Take the current state. Returns the DELTA message, or None on the first call."""
+        scalars = pack_scalars(sim.snapshot().scalars)
+        columns = barrel_columns(sim.barrels)
+        header = _STATE.pack(tick, ack, time.monotonic(), columns.shape[1])
+        delta = None
+        if self._scalars is not None:
+            xored = (numpy.frombuffer(scalars, dtype=numpy.uint8) ^ numpy.frombuffer(self._scalars, dtype=numpy.uint8))
+            diff = columns - _resized(self._columns, columns.shape[1]) # int16 wraps, and so does the decoder's add
+            delta = _message(MSG_DELTA, header + zlib.compress(xored.tobytes() + diff.tobytes(), self.level))
+        self._header, self._scalars, self._columns = header, scalars, columns
+        self._keyframe = None
+        return delta
+
+    def keyframe(self):
+        """KEYFRAME message for the state the last update() took, built on first request."""
+        if self._keyframe is None:
+            self._keyframe = _message(MSG_KEYFRAME, self._header + zlib.compress(self._scalars + self._columns.tobytes(),
+                                                                                 self.level))
+        return self._keyframe
+
+
+class StateDecoder:
+    """Inverse of StateEncoder for one client's message stream."""
+
+    def __init__(self):
+        self._scalars = None
+        self._columns = None
+
+    def decode(self, msg_type, payload):
+        """(tick, ack, sent_at, scalars, barrel columns) of a KEYFRAME or DELTA payload."""
+        tick, ack, sent_at, slots = _STATE.unpack_from(payload)
+        body = zlib.decompress(payload[_STATE.size:])
+        scalars = body[:_SCALARS.size]
+        columns = numpy.frombuffer(body, dtype=numpy.int16, offset=_SCALARS.size).reshape(4, slots)
+        if msg_type == MSG_DELTA:
+            if self._scalars is None:
+                raise NetProtocolError(f"tick {tick}: delta before any keyframe")
+            scalars = (numpy.frombuffer(scalars, dtype=numpy.uint8)
+                       ^ numpy.frombuffer(self._scalars, dtype=numpy.uint8)).tobytes()
+            columns = _resized(self._columns, slots) + columns
+        elif msg_type != MSG_KEYFRAME:
+            raise NetProtocolError(f"unexpected message type {msg_type}")
+        self._scalars, self._columns = scalars, columns
+        return tick, ack, sent_at, unpack_scalars(scalars), columns
+
+
+# --- Server ---
+class _Peer:
+    __slots__ = ('writer', 'role', 'needs_keyframe', 'skipped')
+
+    def __init__(self, writer, role):
+        self.writer = writer
+        self.role = role
+        self.needs_keyframe = True
+        self.skipped = 0
+
+
+class NetServer:
+    """Authoritative game for one player and any number of spectators.
+
+    The game is recording.make_sim(); every tick's inputs are logged to the
+    recording, so a served game can be saved and checked with kong_replay.py.
+    """
+
+    def __init__(self, recording, host='127.0.0.1', port=DEFAULT_PORT):
+        self.recording = recording
+        self.sim = recording.make_sim()
+        self.host = host
+        self.port = port
+        self.tick = 0
+        self.peers = []
+        self.player = None
+        self.encoder = StateEncoder()
+        self._inputs = deque() # (seq, bits) from the player, oldest first
+        self._held = 0
+        self.input_ack = 0 # Last player seq applied
+        self._server = None
+        self._stopping = False
+        # Stats, one entry per broadcast
+        self.tick_seconds = deque(maxlen=STATS_TICKS) # Stepping, encoding and writing
+        self.bytes_out = deque(maxlen=STATS_TICKS)    # Written to all peers
+        self.delta_bytes = deque(maxlen=STATS_TICKS)
+        self.keyframe_bytes = deque(maxlen=STATS_TICKS)
+        self.late_ticks = 0    # Stepped late, behind the tick clock
+        self.dropped_ticks = 0 # Never stepped: more than MAX_STEPS_PER_TICK behind
+        self.skipped = 0       # Messages not sent to backed-up peers
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve_peer, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1] # Port 0 picks a free one
+        return self
+
+    def stop(self):
+        self._stopping = True
+
+    async def close(self):
+        self._server.close()
+        for peer in self.peers:
+            peer.writer.close()
+        await self._server.wait_closed()
+
+    async def _serve_peer(self, reader, writer):
+        _no_delay(writer)
+        peer = None
+        try:
+            msg_type, payload = await read_message(reader)
+            if msg_type != MSG_HELLO:
+                raise NetProtocolError(f"expected hello, got message type {msg_type}")
+            role, = _HELLO.unpack(payload)
+            if role == ROLE_PLAYER and self.player is not None:
+                role = ROLE_SPECTATOR # Seat taken
+            rec = self.recording
+            writer.write(_message(MSG_WELCOME, _WELCOME.pack(role, rec.seed, rec.start_level, rec.stress, self.tick)
+                                  + rec.levels_path.encode('utf-8')))
+            peer = _Peer(writer, role)
+            self.peers.append(peer)
+            if role == ROLE_PLAYER:
+                self.player = peer
+                self._inputs.clear(); self._held = 0; self.input_ack = 0
+            while True:
+                msg_type, payload = await read_message(reader)
+                if msg_type == MSG_INPUT and peer is self.player:
+                    self._inputs.append(_INPUT.unpack(payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except NetProtocolError as e:
+            print(f"dropping client: {e}", file=sys.stderr)
+        finally:
+            if peer is not None:
+                self.peers.remove(peer)
+                if peer is self.player:
+                    self.player = None; self._inputs.clear(); self._held = 0
+            writer.close()
+
+    def _next_input(self):
+        # One player input per tick. With none waiting the held keys repeat (never
+        # presses); a backlog past MAX_INPUT_BACKLOG is merged, keeping its presses
+        inputs = self._inputs
+        if not inputs:
+            return self._held & ~EDGE_INPUTS
+        pressed = 0
+        while len(inputs) > MAX_INPUT_BACKLOG:
+            pressed |= inputs.popleft()[1] & EDGE_INPUTS
+        self.input_ack, bits = inputs.popleft()
+        self._held = bits
+        return bits | pressed
+
+    def step(self):
+        bits = self._next_input()
+        self.sim.step(bits)
+        self.recording.add_frame(bits, self.sim)
+        self.tick += 1
+
+    def broadcast(self):
+        encoder = self.encoder
+        delta = encoder.update(self.sim, self.tick, self.input_ack)
+        keyframe = None
+        sent = 0
+        for peer in self.peers:
+            transport = peer.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                peer.needs_keyframe = True; peer.skipped += 1; self.skipped += 1
+                continue
+            if peer.needs_keyframe or delta is None:
+                if keyframe is None: keyframe = encoder.keyframe()
+                message = keyframe; peer.needs_keyframe = False
+            else:
+                message = delta
+            peer.writer.write(message)
+            sent += len(message)
+        self.bytes_out.append(sent)
+        if delta is not None: self.delta_bytes.append(len(delta))
+        if keyframe is not None: self.keyframe_bytes.append(len(keyframe))
+
+    async def run(self, ticks=None):
+        """Step and broadcast at TICK_RATE until stop() or `ticks` ticks."""
+        loop = asyncio.get_running_loop()
+        tick_s = FRAME_MS / 1000.0
+        next_at = loop.time()
+        while not self._stopping and (ticks is None or self.tick < ticks):
+            delay = next_at - loop.time()
+            await asyncio.sleep(max(delay, 0)) # Even when late: let the peers' readers run
+            started = time.perf_counter()
+            steps = 0
+            while loop.time() >= next_at and steps < MAX_STEPS_PER_TICK:
+                self.step(); next_at += tick_s; steps += 1
+            if steps > 1: self.late_ticks += steps - 1
+            behind = loop.time() - next_at
+            if behind >= tick_s:
+                self.dropped_ticks += int(behind / tick_s); next_at = loop.time() + tick_s
+            if steps:
+                self.broadcast()
+                self.tick_seconds.append(time.perf_counter() - started)
+
+
+# --- Client ---
+class NetClient:
+    """One connection's view of the game: sim mirrors the server's, with the
+    player's own inputs applied ahead of it when this client holds the seat.
+
+    input_source(sim) -> INPUT_* bits is asked once a tick when playing.
+    """
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, role=ROLE_SPECTATOR, input_source=None):
+        self.host = host
+        self.port = port
+        self.wanted_role = role
+        self.role = None
+        self.input_source = input_source
+        self.sim = None
+        self.tick = 0 # Last server tick received
+        self.decoder = StateDecoder()
+        self._reader = self._writer = None
+        self._seq = 0
+        self._pending = deque() # (seq, bits) sent but not yet acknowledged
+        self._sent_at = {}      # seq -> time.monotonic() it was sent
+        self._predicted = {}    # seq -> predicted player (x, y) after it
+        self.closed = False
+        # Stats
+        self.latencies = deque(maxlen=STATS_TICKS) # Seconds from server encode to decoded here
+        self.input_rtts = deque(maxlen=STATS_TICKS) # Seconds from sending an input to the state it produced
+        self.mispredictions = deque(maxlen=STATS_TICKS) # px between predicted and authoritative player
+        self.bytes_in = 0
+        self.messages = 0
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        _no_delay(self._writer)
+        self._writer.write(_message(MSG_HELLO, _HELLO.pack(self.wanted_role)))
+        msg_type, payload = await read_message(self._reader)
+        if msg_type != MSG_WELCOME:
+            raise NetProtocolError(f"expected welcome, got message type {msg_type}")
+        self.role, seed, start_level, stress, self.tick = _WELCOME.unpack_from(payload)
+        levels_path = payload[_WELCOME.size:].decode('utf-8')
+        self.sim = Recording(seed, start_level, stress, levels_path).make_sim()
+        return self
+
+    def close(self):
+        self.closed = True
+        if self._writer is not None:
+            self._writer.close()
+
+    def _apply(self, msg_type, payload):
+        tick, ack, sent_at, scalars, columns = self.decoder.decode(msg_type, payload)
+        now = time.monotonic()
+        self.latencies.append(now - sent_at)
+        self.tick = tick
+        sim = self.sim
+        sim.restore(SimSnapshot(scalars, barrel_rows(columns), sim.rng.getstate()))
+        if self.role != ROLE_PLAYER:
+            return
+        pending = self._pending
+        while pending and pending[0][0] <= ack:
+            pending.popleft()
+        sent = self._sent_at.pop(ack, None)
+        if sent is not None:
+            self.input_rtts.append(now - sent)
+            predicted = self._predicted.pop(ack, None)
+            if predicted is not None:
+                self.mispredictions.append(abs(predicted[0] - sim.player_rect.x) + abs(predicted[1] - sim.player_rect.y))
+            for seq in [seq for seq in self._sent_at if seq < ack]: # Merged away by the server
+                del self._sent_at[seq]; self._predicted.pop(seq, None)
+        if sim.game_state == STATE_PLAYING:
+            for _, bits in pending:
+                sim.move_player(bits)
+
+    async def receive(self):
+        """Apply state messages as they come, until the server hangs up."""
+        try:
+            while True:
+                msg_type, payload = await read_message(self._reader)
+                self.bytes_in += _FRAME.size + len(payload); self.messages += 1
+                self._apply(msg_type, payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.closed = True
+
+    def send_input(self):
+        """Ask input_source for this tick's bits, send them and predict their effect."""
+        sim = self.sim
+        bits = self.input_source(sim) if self.input_source is not None else 0
+        self._seq += 1
+        self._writer.write(_message(MSG_INPUT, _INPUT.pack(self._seq, bits)))
+        self._pending.append((self._seq, bits))
+        self._sent_at[self._seq] = time.monotonic()
+        if sim.game_state == STATE_PLAYING:
+            sim.move_player(bits)
+            self._predicted[self._seq] = (sim.player_rect.x, sim.player_rect.y)
+
+    async def run(self, on_tick=None):
+        """Receive until disconnected; once a tick send input (when playing) and
+        call on_tick(self), stopping early if it returns False."""
+        receiver = asyncio.ensure_future(self.receive())
+        loop = asyncio.get_running_loop()
+        tick_s = FRAME_MS / 1000.0
+        next_at = loop.time()
+        try:
+            while not self.closed:
+                if self.role == ROLE_PLAYER: self.send_input()
+                if on_tick is not None and on_tick(self) is False:
+                    break
+                next_at = max(next_at + tick_s, loop.time())
+                await asyncio.sleep(next_at - loop.time())
+        finally:
+            self.close()
+            await receiver
+
+
+# --- Loopback load test ---
+def _ms_percentiles(values):
+    if not values:
+        return (float('nan'),) * 3
+    ms = numpy.array(values) * 1000.0
+    return tuple(float(v) for v in numpy.percentile(ms, [50, 95, 99]))
+
+
+async def load_test(spectators, seconds, seed=0, levels_path=''):
+    """Serve a game on loopback with an autoplay player and `spectators` spectator
+    clients in this process for `seconds`. Returns a dict of stats."""
+    from kong_nav import AutoplayBot
+    server = await NetServer(Recording(seed, levels_path=levels_path), port=0).start()
+    player = await NetClient(port=server.port, role=ROLE_PLAYER, input_source=AutoplayBot()).connect()
+    watchers = [await NetClient(port=server.port).connect() for _ in range(spectators)]
+    clients = [asyncio.ensure_future(client.run()) for client in [player] + watchers]
+    await server.run(ticks=int(seconds * TICK_RATE))
+    for client in [player] + watchers:
+        client.close()
+    await asyncio.gather(*clients)
+    await server.close()
+
+    latencies = [value for client in watchers for value in client.latencies]
+    ticks = len(server.bytes_out)
+    return {
+        'spectators': spectators,
+        'ticks': server.tick,
+        'score': int(server.sim.score),
+        'tick_ms': float(numpy.mean(server.tick_seconds)) * 1000.0,
+        'tick_p99_ms': float(numpy.percentile(server.tick_seconds, 99)) * 1000.0,
+        'late_ticks': server.late_ticks,
+        'dropped_ticks': server.dropped_ticks,
+        'out_bytes_per_tick': sum(server.bytes_out) / ticks,
+        'delta_bytes': float(numpy.mean(server.delta_bytes)) if server.delta_bytes else 0.0,
+        'keyframe_bytes': float(numpy.mean(server.keyframe_bytes)) if server.keyframe_bytes else 0.0,
+        'skipped': server.skipped,
+        'latency_ms': _ms_percentiles(latencies) if watchers else _ms_percentiles(player.latencies),
+        'input_rtt_ms': _ms_percentiles(player.input_rtts),
+        'mispredict_px': float(numpy.mean(player.mispredictions)) if player.mispredictions else 0.0,
+    }
+
+
+def _print_load_row(r):
+    p50, p95, p99 = r['latency_ms']
+    rtt50, rtt95, _ = r['input_rtt_ms']
+    print(f"{r['spectators']:6d} {r['tick_ms']:8.3f} {r['tick_p99_ms']:8.3f} {r['late_ticks']:5d} {r['dropped_ticks']:5d} "
+          f"{r['out_bytes_per_tick'] / 1024:9.1f} {r['delta_bytes']:7.0f} {r['keyframe_bytes']:7.0f} "
+          f"{p50:7.2f} {p95:7.2f} {p99:7.2f} {rtt50:7.2f} {rtt95:7.2f} {r['mispredict_px']:6.2f}")
+
+
+# --- Windowed client ---
+def play_windowed(host, port, role):
+    import pygame
+    from dkv0 import poll_events, read_held_inputs
+    from kong_render import Renderer, load_fonts
+    from kong_sim import WIDTH, HEIGHT
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Cat-san's Kong Tribute! (netplay)")
+    renderer = Renderer(screen, load_fonts())
+    presses = 0
+
+    def keyboard(sim):
+        nonlocal presses
+        bits = presses | read_held_inputs(pygame.key.get_pressed())
+        presses = 0
+        return bits
+
+    def frame(client):
+        nonlocal presses
+        quit_requested, inputs, _ = poll_events()
+        presses |= inputs
+        renderer.draw(client.sim)
+        renderer.present()
+        return not quit_requested
+
+    async def session():
+        client = await NetClient(host, port, role, input_source=keyboard).connect()
+        print(f"connected to {host}:{port} as {'player' if client.role == ROLE_PLAYER else 'spectator'}")
+        await client.run(frame)
+        return client
+
+    client = asyncio.run(session())
+    if client.input_rtts:
+        print("input round trip p50/p95/p99 ms: %.1f / %.1f / %.1f" % _ms_percentiles(client.input_rtts))
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kong netplay: authoritative server, clients and a loopback load test")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--serve", action="store_true", help="run a server until interrupted")
+    mode.add_argument("--connect", metavar="HOST:PORT", help="open a window on a server's game")
+    mode.add_argument("--load-test", type=int, nargs="+", metavar="N",
+                      help="loopback run with an autoplay player and N spectators, once per N")
+    parser.add_argument("--host", default="127.0.0.1", help="address to serve on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--spectate", action="store_true", help="with --connect: watch even if the player seat is free")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--level", type=int, default=1, help="level to start on (1-based)")
+    parser.add_argument("--levels", metavar="PACK", help="level pack file; clients must have it at the same path")
+    parser.add_argument("--record", metavar="FILE", help="with --serve: save the game's recording to FILE on exit")
+    parser.add_argument("--seconds", type=float, default=5.0, help="length of each load test run")
+    args = parser.parse_args()
+
+    if args.connect:
+        host, _, port = args.connect.rpartition(':')
+        play_windowed(host or args.host, int(port), ROLE_SPECTATOR if args.spectate else ROLE_PLAYER)
+    elif args.serve:
+        server = NetServer(Recording(args.seed, args.level - 1, levels_path=args.levels or ''), args.host, args.port)
+
+        async def serve():
+            await server.start()
+            print(f"serving seed {args.seed} on {server.host}:{server.port}")
+            try:
+                await server.run()
+            finally:
+                await server.close()
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        if args.record:
+            server.recording.save(args.record)
+            print(f"recorded {server.recording.frames} frames to {args.record}")
+    else:
+        print(f"{args.seconds:g} s per run, 1 autoplay player + N spectators on loopback")
+        print("specs  tick ms   p99 ms  late  drop  out KB/t  delta B  key B   lat p50     p95     p99 "
+              " rtt p50     p95  mispx")
+        for n in args.load_test:
+            _print_load_row(asyncio.run(load_test(n, args.seconds, args.seed, args.levels or '')))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import platform
+import sys
+
+# Must be set before pygame opens a display or the mixer
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy
+import pygame
+
+from dkv0 import poll_events
+from kong_assets import create_sounds
+from kong_bench import wander_inputs
+from kong_profile import FrameProfiler, PHASES, WORK_PHASES, PHASE_EVENTS, PHASE_DRAW, PHASE_FLIP
+from kong_render import RENDER_SCALES, Renderer, load_fonts
+from kong_sim import GameSim, WIDTH, HEIGHT, STATE_INTRO, STATE_PLAYING, STATE_GAME_OVER_LOST
+import kong_telemetry
+import kong_ticks
+
+# Frame-cost benchmark suite. Runs the real dkv0 frame (event queue, sim step,
+# sound cues, Renderer.draw, Renderer.present) under SDL's dummy video and
+# audio drivers through scripted scenarios and reports per-phase timings.
+# The correctness checks in CHECKS run first and fail the run (exit 1) on
+# any mismatch, so a faster frame can't hide a change in outcomes.
+#
+#   python kong_perf.py --json results.json
+#   python kong_perf.py --baseline results.json --threshold 0.15   # exit 1 on regression
+#   python kong_perf.py --render-scales 1 0.75 0.5                  # every scenario at each scale
+#   python kong_perf.py --no-checks --scenarios barrels_1000          # timings only
+
+# Only flag changes bigger than this too, so sub-microsecond phases don't trip on noise
+MIN_REGRESSION_MS = 0.05
+
+
+# --- Scenarios ---
+# Each returns (sim, before_frame) where before_frame(sim) runs untimed ahead
+# of every frame to hold the scenario's condition (barrel count, overlay, ...).
+
+def _playing_sim(seed, level_idx=0, **kwargs):
+    sim = GameSim(seed=seed, start_level=level_idx, **kwargs)
+    while sim.game_state != STATE_PLAYING: sim.step(0)
+    return sim
+
+
+def scenario_idle_level1(seed):
+    # Endless so barrel hits don't end the run on the game over screen
+    return _playing_sim(seed, 0, endless=True), None
+
+
+def scenario_level2_storm(seed):
+    return _playing_sim(seed, 1, endless=True, stress_spawn_per_tick=0.25), None
+
+
+def forced_barrels(count):
+    def scenario(seed):
+        sim = _playing_sim(seed, 0, endless=True)
+        def top_up(sim):
+            while len(sim.barrels) < count: sim.spawn_barrel()
+        return sim, top_up
+    scenario.__doc__ = f"{count} barrels kept alive"
+    return scenario
+
+
+def scenario_intro_overlay(seed):
+    def stay_in_intro(sim):
+        if sim.game_state != STATE_INTRO: sim.load_level(0)
+    return GameSim(seed=seed), stay_in_intro
+
+
+def scenario_game_over_overlay(seed):
+    # Standing still at level 1's start, barrels take every life in about 12 s of play
+    sim = GameSim(seed=seed)
+    while sim.game_state != STATE_GAME_OVER_LOST: sim.step(0)
+    return sim, None
+
+
+SCENARIOS = {
+    'idle_level1': scenario_idle_level1,
+    'level2_storm': scenario_level2_storm,
+    'barrels_100': forced_barrels(100),
+    'barrels_1000': forced_barrels(1000),
+    'barrels_10000': forced_barrels(10000),
+    'intro_overlay': scenario_intro_overlay,
+    'game_over_overlay': scenario_game_over_overlay,
+}
+
+
+# --- Correctness checks ---
+# Each raises AssertionError describing the first mismatch
+CHECKS = {
+    'step sizes': kong_ticks.quick_check,
+    'telemetry across rewinds': kong_telemetry.check,
+}
+
+
+def run_checks():
+    """Runs CHECKS; returns the failure messages."""
+    failures = []
+    for name, check in CHECKS.items():
+        try:
+            check()
+        except AssertionError as e:
+            failures.append(f"{name}: {e}")
+    return failures
+
+
+# --- Running ---
+def run_frame(sim, renderer, sounds, inputs, profiler):
+    """One dkv0 main-loop iteration, minus clock.tick(), lapped into profiler."""
+    profiler.begin_frame()
+    poll_events()
+    profiler.lap(PHASE_EVENTS)
+    for sound_name in sim.step(inputs): # Laps physics and collision itself
+        sounds[sound_name].play()
+    profiler.lap(PHASE_EVENTS)
+    renderer.draw(sim)
+    profiler.lap(PHASE_DRAW)
+    renderer.present()
+    profiler.lap(PHASE_FLIP)
+    profiler.end_frame(len(sim.barrels))
+
+
+def run_scenario(name, screen, fonts, sounds, frames, warmup, seed, scale=1.0):
+    sim, before_frame = SCENARIOS[name](seed)
+    renderer = Renderer(screen, fonts, scale=scale)
+    profiler = FrameProfiler(capacity=frames)
+    sim.profiler = profiler
+    inputs = wander_inputs(warmup + frames, seed) if name == 'level2_storm' else [0] * (warmup + frames)
+    for i, bits in enumerate(inputs):
+        if i == warmup: profiler.reset()
+        if before_frame is not None: before_frame(sim)
+        run_frame(sim, renderer, sounds, bits, profiler)
+    result = profiler.summary()
+    result['barrels'] = len(sim.barrels)
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Lines describing every metric that got more than threshold slower than baseline."""
+    regressions = []
+    for name, phases in results.items():
+        base_phases = baseline.get(name)
+        if base_phases is None:
+            continue
+        checks = [('frame', 'mean'), ('frame', 'p95')] + [(phase, 'mean') for phase in PHASES[WORK_PHASES]]
+        for phase, stat in checks:
+            if phase not in base_phases: continue
+            base = base_phases[phase][stat]
+            current = phases[phase][stat]
+            if current > base * (1 + threshold) and current - base > MIN_REGRESSION_MS:
+                regressions.append(f"{name} {phase} {stat}: {base:.3f} ms -> {current:.3f} ms "
+                                   f"(+{(current / base - 1) if base else float('inf'):.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kong frame-cost benchmark suite (SDL dummy drivers)")
+    parser.add_argument("--frames", type=int, default=600, help="timed frames per scenario")
+    parser.add_argument("--warmup", type=int, default=120, help="untimed frames run first")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenarios", nargs="*", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--render-scales", nargs="*", type=float, choices=RENDER_SCALES, default=[1.0],
+                        help="run every scenario at each of these render scales (results named scenario@scale below 1)")
+    parser.add_argument("--json", metavar="FILE", help="write results to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a previous --json file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="fail when a metric is this fraction slower than the baseline (default 0.10)")
+    parser.add_argument("--no-checks", action="store_true", help="skip the correctness checks run before timing")
+    args = parser.parse_args()
+
+    if not args.no_checks:
+        failures = run_checks()
+        if failures:
+            print(f"{len(failures)} check(s) failed:")
+            for line in failures: print("  " + line)
+            sys.exit(1)
+
+    pygame.init()
+    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    fonts = load_fonts()
+    sounds = create_sounds()
+
+    results = {}
+    runs = [(name, scale) for scale in args.render_scales for name in args.scenarios]
+    for name, scale in runs:
+        label = name if scale == 1.0 else f"{name}@{scale:g}"
+        result = results[label] = run_scenario(name, screen, fonts, sounds, args.frames, args.warmup, args.seed, scale)
+        frame = result['frame']
+        print(f"{label:22s} ({result['barrels']:5d} barrels) frame mean {frame['mean']:7.3f} ms  "
+              f"p50 {frame['p50']:7.3f}  p95 {frame['p95']:7.3f}  p99 {frame['p99']:7.3f}")
+        print(" " * 24 + "  ".join(f"{phase} {result[phase]['mean']:.3f}/{result[phase]['p95']:.3f}"
+                                   for phase in PHASES[WORK_PHASES]) + "  (mean/p95 ms)")
+    pygame.quit()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'meta': {'python': platform.python_version(), 'pygame': pygame.version.ver,
+                                'numpy': numpy.__version__, 'machine': platform.machine(),
+                                'video_driver': os.environ["SDL_VIDEODRIVER"],
+                                'frames': args.frames, 'warmup': args.warmup, 'seed': args.seed},
+                       'scenarios': results}, f, indent=2)
+        print(f"wrote {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['scenarios']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for line in regressions: print("  " + line)
+            sys.exit(1)
+        print(f"no regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
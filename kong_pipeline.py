@@ -0,0 +1,406 @@
+import argparse
+import os
+import random
+import threading
+import time
+from collections import deque
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy
+import pygame
+
+from kong_barrels import BarrelStore
+from kong_render import Renderer, load_fonts, previous_positions
+from kong_sim import (GameSim, WIDTH, HEIGHT, BARREL_SIZE, FRAME_MS, STATE_INTRO,
+                      INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_DOWN)
+
+# Pipelined game loop: the sim steps on its own thread at a fixed 60 Hz and
+# the main thread renders whatever it last finished, so a slow draw or flip
+# no longer holds up physics (dkv0 --pipeline).
+#
+# The main thread still owns the window and the event queue (SDL wants both
+# on the thread that made the window), so it posts the keyboard into an
+# InputLatch every frame and the sim thread takes it on each step. After a
+# step the sim thread copies what Renderer reads into a FrameState and
+# publishes it through a TripleBuffer: three preallocated FrameStates, one
+# being written, one ready and one being drawn, so neither side ever waits
+# for the other or sees a half-written state. The sim thread only holds the
+# GIL while it runs Python; pygame lets go of it inside blits, scaling and
+# flips, which is where a frame's time goes.
+#
+# LoopStats measures both loops the same way: present-to-present intervals
+# (frame-time jitter), how late each step ran against its 60 Hz slot, and
+# input-to-photon latency, from an input change to the end of the present()
+# of the first frame drawn from a step that had seen it.
+#
+#   python kong_pipeline.py --seconds 10                # single-threaded vs pipelined, headless
+#   python kong_pipeline.py --flip-ms 12 --stress 0.5   # a slow flip (slept, GIL released) over a busy sim
+
+FRAME_S = FRAME_MS / 1000.0
+
+
+# --- Snapshots ---
+class FrameState:
+    """The part of a GameSim that Renderer reads, copied out after a step.
+
+    draw(state, alpha, state.previous) interpolates it from `previous` (the
+    positions before the step, see kong_render.previous_positions) like a live
+    sim; `due` is when the step's 60 Hz slot began and `input_serial` the
+    newest LoopStats input the step had seen.
+    """
+
+    def __init__(self):
+        self.level = None
+        self.level_name = ""
+        self.g_level_girders = ()
+        self.g_level_ladders = ()
+        self.g_kong_rect = pygame.Rect(0, 0, 1, 1)
+        self.g_goal_rect = pygame.Rect(0, 0, 1, 1)
+        self.g_oil_drum_rect = pygame.Rect(0, 0, 1, 1)
+        self.player_rect = pygame.Rect(0, 0, 1, 1)
+        self.barrels = BarrelStore(BARREL_SIZE)
+        self.game_state = STATE_INTRO
+        self.score = 0
+        self.player_lives = 0
+        self.intro_stage = 0
+        self.current_level_index = 0
+        self.frame = 0
+        self.previous = None
+        self.due = 0.0
+        self.input_serial = 0
+
+    def capture(self, sim, previous, due, input_serial):
+        # Level geometry is shared, not copied: CompiledLevels never change
+        self.level = sim.level
+        self.level_name = sim.level_name
+        self.g_level_girders = sim.g_level_girders
+        self.g_level_ladders = sim.g_level_ladders
+        self.g_kong_rect.update(sim.g_kong_rect)
+        self.g_goal_rect.update(sim.g_goal_rect)
+        self.g_oil_drum_rect.update(sim.g_oil_drum_rect)
+        self.player_rect.update(sim.player_rect)
+        self.barrels.copy_from(sim.barrels)
+        self.game_state = sim.game_state
+        self.score = sim.score
+        self.player_lives = sim.player_lives
+        self.intro_stage = sim.intro_stage
+        self.current_level_index = sim.current_level_index
+        self.frame = sim.frame
+        self.previous = previous
+        self.due = due
+        self.input_serial = input_serial
+
+
+class TripleBuffer:
+    """Three preallocated slots passed between one writer and one reader.
+
+    The writer fills back() and publish()es it; the reader's latest() returns
+    the newest published slot, which stays untouched until its next latest().
+    Only the slot indices are swapped, under a lock held for a few bytecodes.
+    """
+
+    def __init__(self, make):
+        self._slots = [make(), make(), make()]
+        self._back, self._ready, self._front = 0, 1, 2
+        self._fresh = False # _ready holds a slot the reader hasn't taken yet
+        self._lock = threading.Lock()
+        self.published = 0
+        self.skipped = 0 # Published but replaced before the reader got to them
+
+    def back(self):
+        return self._slots[self._back]
+
+    def publish(self):
+        with self._lock:
+            if self._fresh: self.skipped += 1
+            self._back, self._ready = self._ready, self._back
+            self._fresh = True
+            self.published += 1
+
+    def latest(self):
+        with self._lock:
+            if self._fresh:
+                self._front, self._ready = self._ready, self._front
+                self._fresh = False
+            return self._slots[self._front]
+
+
+# --- Input ---
+class InputLatch:
+    """Keyboard state handed from the main thread to the sim thread.
+
+    post() every frame with that frame's presses (INPUT_JUMP / INPUT_RESTART),
+    the held bits, whether rewind is held and LoopStats.serial. Presses pile up
+    until a step that is not rewinding take()s them, so none is lost or seen twice.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pressed = 0
+        self._held = 0
+        self._rewinding = False
+        self._serial = 0
+
+    def post(self, pressed, held, rewinding, serial):
+        with self._lock:
+            self._pressed |= pressed
+            self._held = held; self._rewinding = rewinding; self._serial = serial
+
+    def take(self):
+        """(pressed, held, rewinding, serial) for one step; clears the presses
+        unless rewinding, which keeps them for the first step played after it."""
+        with self._lock:
+            pressed = self._pressed
+            if not self._rewinding: self._pressed = 0
+            return pressed, self._held, self._rewinding, self._serial
+
+
+# --- Measurement ---
+class LoopStats:
+    """Frame intervals, step lateness and input-to-photon latency of a game loop.
+
+    input(stamp) when an input change is seen (stamp: perf_counter() time it
+    happened) and pass the newest serial a step has seen to presented(). Each
+    is a deque append, so the sim thread can call stepped() while the main
+    thread records the rest.
+    """
+
+    def __init__(self, capacity=36000):
+        self.serial = 0 # Inputs seen so far
+        self._pending = deque() # (serial, stamp) not yet on screen
+        self.present_times = deque(maxlen=capacity)
+        self.lateness_s = deque(maxlen=capacity) # Step start minus the start of its slot
+        self.latency_s = deque(maxlen=capacity)
+
+    def input(self, stamp):
+        self.serial += 1
+        self._pending.append((self.serial, stamp))
+
+    def stepped(self, lateness):
+        self.lateness_s.append(lateness)
+
+    def presented(self, now, shown_serial):
+        self.present_times.append(now)
+        pending = self._pending
+        while pending and pending[0][0] <= shown_serial:
+            self.latency_s.append(now - pending.popleft()[1])
+
+    def summary(self):
+        """{'frame', 'lateness', 'latency'}: {'n', 'mean', 'std', 'p50', 'p99', 'max'} in milliseconds."""
+        def describe(values):
+            ms = numpy.array(values or [0.0]) * 1000.0
+            return {'n': len(values), 'mean': float(ms.mean()), 'std': float(ms.std()),
+                    'p50': float(numpy.percentile(ms, 50)), 'p99': float(numpy.percentile(ms, 99)),
+                    'max': float(ms.max())}
+        return {'frame': describe(list(numpy.diff(numpy.array(self.present_times)))),
+                'lateness': describe(list(self.lateness_s)), 'latency': describe(list(self.latency_s))}
+
+    def stats(self):
+        s = self.summary()
+        frame, lateness, latency = s['frame'], s['lateness'], s['latency']
+        return (f"frames: {frame['mean']:.2f} ms mean, jitter {frame['std']:.2f} ms std, {frame['p99']:.2f} p99; "
+                f"steps {lateness['mean']:.2f} ms late mean, {lateness['p99']:.2f} p99; "
+                f"input-to-photon {latency['mean']:.1f} ms mean, {latency['p99']:.1f} p99 ({latency['n']} inputs)")
+
+
+# --- Sim thread ---
+class SimThread:
+    """Runs advance(pressed, held, rewinding) at 60 Hz on a worker thread and
+    publishes a FrameState after every step.
+
+    advance() does one step of `sim` (and whatever goes with it: sounds,
+    recording, rewind) and returns False to stop, e.g. at the end of a replay.
+    More than `max_behind` steps late, the backlog is dropped rather than
+    fast-forwarded, as the single-threaded loop does.
+    """
+
+    def __init__(self, sim, advance, inputs, frames, stats, max_behind=5, clock=time.perf_counter):
+        self.sim = sim
+        self.advance = advance
+        self.inputs = inputs
+        self.frames = frames
+        self.stats = stats
+        self.max_behind = max_behind
+        self.clock = clock
+        self.steps = 0
+        self.dropped = 0 # Steps skipped to catch up
+        self.step_s = deque(maxlen=3600)
+        self.finished = False
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sim", daemon=True)
+
+    def start(self):
+        """Publish the sim as it stands (so frames.latest() always has something) and start stepping."""
+        self._due = self.clock()
+        self.frames.back().capture(self.sim, None, self._due, 0)
+        self.frames.publish()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        sim = self.sim; clock = self.clock; frames = self.frames
+        due = self._due
+        try:
+            while True:
+                wait = due - clock()
+                if wait > 0 and self._stop.wait(wait) or self._stop.is_set():
+                    break
+                now = clock()
+                behind = int((now - due) / FRAME_S)
+                if behind > self.max_behind:
+                    self.dropped += behind; due += behind * FRAME_S
+                self.stats.stepped(now - due)
+                pressed, held, rewinding, serial = self.inputs.take()
+                previous = previous_positions(sim)
+                keep_going = self.advance(pressed, held, rewinding)
+                self.step_s.append(clock() - now)
+                frames.back().capture(sim, previous, due, serial)
+                frames.publish()
+                self.steps += 1
+                due += FRAME_S
+                if not keep_going:
+                    break
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.finished = True
+
+    def close(self):
+        """Stop stepping; re-raises anything advance() raised."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def stats_line(self):
+        step_ms = numpy.array(self.step_s or [0.0]) * 1000.0
+        return (f"sim thread: {self.steps} steps, {step_ms.mean():.2f} ms mean / {step_ms.max():.2f} max, "
+                f"{self.dropped} dropped; {self.frames.skipped} of {self.frames.published} states never drawn")
+
+
+# --- Benchmark ---
+SCRIPT_HELD = (0, INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_DOWN, INPUT_LEFT | INPUT_UP, INPUT_RIGHT | INPUT_DOWN)
+
+
+class ScriptedKeys:
+    """Held directions that change at random moments, for measuring latency without a person.
+
+    poll(now) is what the loop's keyboard read sees at `now`: (held bits, the
+    time of the first change since the last poll, or None)."""
+
+    def __init__(self, seed, start, seconds, min_gap=0.08, max_gap=0.4):
+        rng = random.Random(seed)
+        self.changes = []
+        t = start; held = 0
+        while t < start + seconds:
+            t += rng.uniform(min_gap, max_gap)
+            held = rng.choice([bits for bits in SCRIPT_HELD if bits != held])
+            self.changes.append((t, held))
+        self._next = 0
+        self.held = 0
+
+    def poll(self, now):
+        changes = self.changes
+        stamp = None
+        while self._next < len(changes) and changes[self._next][0] <= now:
+            if stamp is None: stamp = changes[self._next][0]
+            self.held = changes[self._next][1]
+            self._next += 1
+        return self.held, stamp
+
+
+def run_single(sim, renderer, keys, stats, seconds, fps, flip_s, max_steps=5):
+    """dkv0's single-threaded loop: poll, catch the sim up on a fixed timestep, draw, present."""
+    clock = pygame.time.Clock()
+    accumulator_ms = 0.0
+    shown = 0
+    last = time.perf_counter(); end = last + seconds
+    while last < end:
+        now = time.perf_counter()
+        accumulator_ms += min((now - last) * 1000.0, 250.0)
+        last = now
+        pygame.event.pump()
+        held, stamp = keys.poll(now)
+        if stamp is not None: stats.input(stamp)
+        steps = 0
+        while accumulator_ms >= FRAME_MS:
+            if steps == max_steps:
+                accumulator_ms %= FRAME_MS
+                break
+            accumulator_ms -= FRAME_MS; steps += 1
+            stats.stepped(accumulator_ms / 1000.0) # What's left over is how far past its slot this step is
+            renderer.remember_previous(sim)
+            sim.step(held)
+            shown = stats.serial
+        renderer.draw(sim, accumulator_ms / FRAME_MS)
+        renderer.present()
+        if flip_s: time.sleep(flip_s)
+        stats.presented(time.perf_counter(), shown)
+        clock.tick(fps)
+
+
+def run_pipelined(sim, renderer, keys, stats, seconds, fps, flip_s):
+    """The same with the sim on a SimThread: poll, post, draw the latest FrameState, present."""
+    latch = InputLatch()
+    frames = TripleBuffer(FrameState)
+    def advance(pressed, held, rewinding):
+        sim.step(pressed | held)
+        return True
+    sim_thread = SimThread(sim, advance, latch, frames, stats).start()
+    clock = pygame.time.Clock()
+    end = time.perf_counter() + seconds
+    while True:
+        now = time.perf_counter()
+        if now >= end: break
+        pygame.event.pump()
+        held, stamp = keys.poll(now)
+        if stamp is not None: stats.input(stamp)
+        latch.post(0, held, False, stats.serial)
+        state = frames.latest()
+        renderer.draw(state, min(1.0, (now - state.due) / FRAME_S), state.previous)
+        renderer.present()
+        if flip_s: time.sleep(flip_s)
+        stats.presented(time.perf_counter(), state.input_serial)
+        clock.tick(fps)
+    sim_thread.close()
+    return sim_thread
+
+
+def main():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    parser = argparse.ArgumentParser(description="Compare input-to-photon latency and frame jitter, "
+                                                 "single-threaded vs pipelined loop (SDL dummy video)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="per loop")
+    parser.add_argument("--fps", type=int, default=60, help="display frame rate cap; 0 = uncapped")
+    parser.add_argument("--flip-ms", type=float, default=0.0,
+                        help="extra time each present() blocks for, slept with the GIL released like a vsync wait")
+    parser.add_argument("--stress", type=float, default=0.3, help="extra barrels per frame, for a busy sim")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    fonts = load_fonts()
+    print(f"{args.seconds:g} s per loop at {args.fps or 'uncapped'} fps, flip +{args.flip_ms:g} ms, "
+          f"stress {args.stress:g}")
+    for name, run in (("single", run_single), ("pipelined", run_pipelined)):
+        sim = GameSim(seed=args.seed, endless=True, stress_spawn_per_tick=args.stress)
+        while sim.game_state == STATE_INTRO:
+            sim.step(0)
+        renderer = Renderer(screen, fonts)
+        stats = LoopStats()
+        keys = ScriptedKeys(args.seed, time.perf_counter(), args.seconds)
+        result = run(sim, renderer, keys, stats, args.seconds, args.fps, args.flip_ms / 1000.0)
+        print(f"  {name:9s} {stats.stats()}")
+        if result is not None:
+            print(f"            {result.stats_line()}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import json
+import time
+
+import numpy
+
+# Per-frame phase timings. A FrameProfiler is a stopwatch that gets lapped at
+# phase boundaries: everything since the previous lap is charged to the phase
+# named by the new one, so instrumenting a loop costs one perf_counter() call
+# per boundary and nothing at all when no profiler is attached.
+#
+# Both the per-frame totals and the individual laps go into fixed-size ring
+# buffers allocated up front, so a profiler can stay attached for a whole
+# session: the overlay reads the recent frames and save_chrome_trace() dumps
+# the recent laps as Chrome trace_event JSON (chrome://tracing, Perfetto).
+
+PHASE_EVENTS = 0    # pygame event queue, input mapping, sound cues
+PHASE_PHYSICS = 1   # GameSim.step() minus the barrel update: timers, spawns, player movement
+PHASE_COLLISION = 2 # BarrelStore.update(): rolling, landing, culling and player hit tests
+PHASE_DRAW = 3      # Renderer.draw()
+PHASE_FLIP = 4      # Renderer.present()
+PHASE_WAIT = 5      # clock.tick() sleeping, level-transition pauses
+PHASES = ('events', 'physics', 'collision', 'draw', 'flip', 'wait')
+WORK_PHASES = slice(0, PHASE_WAIT) # Everything but waiting: what the frame actually cost
+
+_FRAME_MARK = -1 # Lap ring entry written by begin_frame()
+# Lap ring sizing: begin_frame() and dkv0's own laps (events x2, draw, flip,
+# wait), plus GameSim.step()'s physics / collision / physics for every step
+# the frame runs. A catch-up frame runs up to dkv0.MAX_STEPS_PER_FRAME.
+LAPS_PER_FRAME = 6
+LAPS_PER_STEP = 3
+
+
+class FrameProfiler:
+    """Seconds-per-phase for the last `capacity` frames between begin_frame() and end_frame().
+
+    The lap ring holds `capacity` frames of up to `steps_per_frame` sim steps
+    each, so the laps of every frame still in the totals are kept for the trace.
+    """
+
+    def __init__(self, capacity=600, clock=time.perf_counter, steps_per_frame=1):
+        self.clock = clock
+        self.capacity = capacity
+        self.phase_times = numpy.zeros((capacity, len(PHASES)))
+        self.frame_start = numpy.zeros(capacity)
+        self.frame_end = numpy.zeros(capacity)
+        self.frame_barrels = numpy.zeros(capacity, dtype=numpy.int64)
+        self.frames_written = 0
+        self.lap_capacity = capacity * (LAPS_PER_FRAME + LAPS_PER_STEP * steps_per_frame)
+        self.lap_time = numpy.zeros(self.lap_capacity)
+        self.lap_phase = numpy.zeros(self.lap_capacity, dtype=numpy.int8)
+        self.laps_written = 0
+        self._current = [0.0] * len(PHASES) # Reused every frame
+        self._zero = (0.0,) * len(PHASES)
+        self._start = self._last = 0.0
+
+    def _record_lap(self, now, phase):
+        i = self.laps_written % self.lap_capacity
+        self.lap_time[i] = now; self.lap_phase[i] = phase
+        self.laps_written += 1
+
+    def begin_frame(self):
+        self._current[:] = self._zero
+        self._start = self._last = now = self.clock()
+        self._record_lap(now, _FRAME_MARK)
+
+    def lap(self, phase):
+        now = self.clock()
+        self._current[phase] += now - self._last
+        self._last = now
+        self._record_lap(now, phase)
+
+    def end_frame(self, live_barrels=0):
+        i = self.frames_written % self.capacity
+        self.phase_times[i] = self._current
+        self.frame_start[i] = self._start; self.frame_end[i] = self._last
+        self.frame_barrels[i] = live_barrels
+        self.frames_written += 1
+
+    def reset(self):
+        self.frames_written = 0
+        self.laps_written = 0
+
+    def _ring_order(self, written, capacity, last=None):
+        # Indices of the kept entries, oldest first (optionally only the newest `last`)
+        n = min(written, capacity)
+        if last is not None: n = min(n, last)
+        return numpy.arange(written - n, written) % capacity
+
+    def recent(self, frames=None):
+        """(seconds per phase, live barrels) arrays for the newest `frames` frames, oldest first."""
+        order = self._ring_order(self.frames_written, self.capacity, frames)
+        return self.phase_times[order], self.frame_barrels[order]
+
+    def summary(self):
+        """{phase: {'mean', 'p50', 'p95', 'p99'}} in milliseconds, plus 'frame' for the
+        per-frame total without waiting."""
+        if not self.frames_written:
+            return {}
+        ms = self.recent()[0] * 1000.0
+        columns = {name: ms[:, i] for i, name in enumerate(PHASES)}
+        columns['frame'] = ms[:, WORK_PHASES].sum(axis=1)
+        return {name: {'mean': float(values.mean()),
+                       'p50': float(numpy.percentile(values, 50)),
+                       'p95': float(numpy.percentile(values, 95)),
+                       'p99': float(numpy.percentile(values, 99))}
+                for name, values in columns.items()}
+
+    # --- Chrome trace export ---
+    def trace_events(self, pid=1, tid=1):
+        """The lap ring as Chrome trace_event dicts: one 'X' span per frame and per
+        phase lap inside it, plus a 'barrels' counter at the end of every frame."""
+        order = self._ring_order(self.laps_written, self.lap_capacity)
+        times = self.lap_time[order].tolist(); phases = self.lap_phase[order].tolist()
+        if not times:
+            return []
+        t0 = times[0]
+        def us(t): return (t - t0) * 1e6
+
+        events = []
+        frame_order = self._ring_order(self.frames_written, self.capacity)
+        for start, end, barrels in zip(self.frame_start[frame_order].tolist(), self.frame_end[frame_order].tolist(),
+                                       self.frame_barrels[frame_order].tolist()):
+            if start < t0: continue # Its laps have already been overwritten
+            events.append({'name': 'frame', 'cat': 'frame', 'ph': 'X', 'ts': us(start), 'dur': (end - start) * 1e6,
+                           'pid': pid, 'tid': tid})
+            events.append({'name': 'barrels', 'ph': 'C', 'ts': us(end), 'pid': pid, 'args': {'live': barrels}})
+
+        previous = None # The oldest kept lap's start has been overwritten
+        for t, phase in zip(times, phases):
+            if phase != _FRAME_MARK and previous is not None:
+                events.append({'name': PHASES[phase], 'cat': 'phase', 'ph': 'X', 'ts': us(previous),
+                               'dur': (t - previous) * 1e6, 'pid': pid, 'tid': tid})
+            previous = t
+        return events
+
+    def save_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
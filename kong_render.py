@@ -0,0 +1,508 @@
+from collections import OrderedDict
+
+import numpy
+import pygame
+
+from kong_profile import PHASE_PHYSICS, PHASE_COLLISION, PHASE_DRAW, PHASE_FLIP, PHASE_WAIT, WORK_PHASES
+from kong_sim import (WIDTH, HEIGHT, BARREL_SIZE, FRAME_MS, STATE_INTRO, STATE_PLAYING, STATE_GAME_OVER_LOST, STATE_VICTORY,
+                      STATE_LEVEL_CLEAR)
+
+# Everything that turns a GameSim into pixels. Needs an initialized display
+# (or SDL's dummy driver) but no mixer and no event loop.
+
+# Colors
+BLACK = (0,0,0)
+WHITE = (255,255,255)
+DK_RED = (200,0,0)
+PLAYER_BLUE = (100, 100, 255)
+PAULINE_PINK = (255, 150, 200)
+GIRDER_BROWN = (139, 69, 19)
+LADDER_CYAN = (0, 180, 180)
+BARREL_ORANGE = (200, 100, 20) # Slightly adjusted
+OIL_DRUM_BLUE = (50, 50, 150)
+TEXT_YELLOW = (255,255,0)
+TEXT_GREEN = (0,200,0) # Darker green
+TEXT_RED = (255,50,50)
+
+intro_texts = ["LEVEL X", "READY!", "GO!!", ""] # Last one is for the pause
+# States drawn as the bare playfield; the rest put a full-screen overlay on top
+SCENE_STATES = (STATE_PLAYING, STATE_LEVEL_CLEAR)
+# Moves bigger than this between two steps (respawns, level loads) aren't interpolated
+MAX_LERP_PX = 48
+# Render target sizes, as fractions of the 600x800 window: 600x800, 450x600, 300x400
+RENDER_SCALES = (1.0, 0.75, 0.5)
+
+
+# Fonts
+default_font_name = "Arial" # Fallback
+title_font_size = 36
+score_font_size = 20
+message_font_size = 28
+small_message_font_size = 16
+profiler_font_size = 13
+
+def load_fonts(scale=1.0):
+    def size(points): return max(1, round(points * scale))
+    try:
+        title_font = pygame.font.Font("PressStart2P.ttf", size(title_font_size))
+        score_font = pygame.font.Font("PressStart2P.ttf", size(score_font_size))
+        message_font = pygame.font.Font("PressStart2P.ttf", size(message_font_size))
+        small_message_font = pygame.font.Font("PressStart2P.ttf", size(small_message_font_size))
+        if scale == 1.0: print("'PressStart2P.ttf' font loaded successfully!")
+    except FileNotFoundError:
+        if scale == 1.0: print(f"INFO: 'PressStart2P.ttf' not found. Using '{default_font_name}' as fallback.")
+        title_font = pygame.font.SysFont(default_font_name, size(title_font_size + 8), bold=True) # Arial needs to be bigger
+        score_font = pygame.font.SysFont(default_font_name, size(score_font_size + 4))
+        message_font = pygame.font.SysFont(default_font_name, size(message_font_size + 6))
+        small_message_font = pygame.font.SysFont(default_font_name, size(small_message_font_size + 4))
+    return title_font, score_font, message_font, small_message_font
+
+
+# --- Barrel sprites ---
+def make_barrel_surface(size):
+    barrel_surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.ellipse(barrel_surf, BARREL_ORANGE, (0,0,size,size))
+    # Add some detail to barrel (like lines)
+    pygame.draw.line(barrel_surf, BLACK, (size*0.1, size//2), (size*0.9, size//2), 2)
+    pygame.draw.line(barrel_surf, BLACK, (size//2, size*0.1), (size//2, size*0.9), 2)
+    return barrel_surf
+
+
+class BarrelAtlas:
+    """Pre-rotated barrel sprites. roll_angle only ever moves in 3 or 6 degree
+    steps, so every angle the sim produces is one of 360 / ANGLE_STEP frames."""
+
+    ANGLE_STEP = 3
+
+    def __init__(self, size):
+        self.size = size
+        base = make_barrel_surface(size)
+        self.frames = []
+        for step in range(360 // self.ANGLE_STEP):
+            rotated = pygame.transform.rotate(base, step * self.ANGLE_STEP)
+            # Stored with the offset from the barrel centre to the blit position
+            self.frames.append((rotated, rotated.get_width() // 2, rotated.get_height() // 2))
+
+
+_barrel_atlases = {} # size -> BarrelAtlas, built on first draw
+
+def get_barrel_atlas(size=BARREL_SIZE):
+    atlas = _barrel_atlases.get(size)
+    if atlas is None:
+        atlas = _barrel_atlases[size] = BarrelAtlas(size)
+    return atlas
+
+
+def draw_barrels(screen, barrels, doreturn=False, centers=None, scale=1.0):
+    """Blit every live barrel; centers optionally overrides live_arrays()' (centerx, centery).
+    With scale, positions and sprites are scaled for a smaller render target."""
+    if not len(barrels):
+        return []
+    atlas = get_barrel_atlas(barrels.size if scale == 1.0 else max(1, round(barrels.size * scale)))
+    centerx, centery, roll_angle = barrels.live_arrays()
+    if centers is not None: centerx, centery = centers
+    if scale != 1.0: centerx = centerx * scale; centery = centery * scale
+    steps = numpy.rint(roll_angle / atlas.ANGLE_STEP).astype(numpy.int64) % len(atlas.frames)
+    frames = atlas.frames
+    return screen.blits([(frames[step][0], (cx - frames[step][1], cy - frames[step][2]))
+                         for step, cx, cy in zip(steps.tolist(), centerx.astype(numpy.int64).tolist(), centery.astype(numpy.int64).tolist())],
+                        doreturn=doreturn)
+
+
+# --- Text ---
+class TextCache:
+    """font.render() results keyed by (font, text, color), least recently used evicted first."""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self._surfaces[key] = font.render(text, True, color)
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surf
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return f"text cache: {self.hits} hits / {self.misses} misses ({self.hit_rate:.1%}), {len(self._surfaces)} entries"
+
+
+def make_overlay(alpha, size=(WIDTH, HEIGHT)):
+    overlay = pygame.Surface(size, pygame.SRCALPHA)
+    overlay.fill((0,0,0,alpha))
+    return overlay
+
+
+class ProfilerOverlay:
+    """F3 panel: recent frame / sim / draw / flip times, live barrels, FPS and a
+    frame-time graph, read from a kong_profile.FrameProfiler's ring buffer.
+
+    The panel is re-rendered a few times a second into a cached surface and
+    just blitted in between, so it stays readable and costs one blit a frame.
+    """
+
+    PANEL_RECT = pygame.Rect(WIDTH - 230, 44, 220, 172)
+    GRAPH_FRAMES = 200 # One pixel column per frame
+    REFRESH_FRAMES = 15
+    AVERAGE_FRAMES = 60
+
+    def __init__(self, profiler, clock, font=None):
+        self.profiler = profiler
+        self.clock = clock
+        self.font = font or pygame.font.SysFont("Courier New, monospace", profiler_font_size)
+        self.text_cache = TextCache(64) # Own cache: these lines would churn the HUD's entries out
+        self.visible = False
+        self.panel = pygame.Surface(self.PANEL_RECT.size, pygame.SRCALPHA)
+        self._refreshed_at = None
+        self._scaled = None # (scale, panel scaled for a smaller render target, its rect)
+
+    def _refresh(self):
+        panel = self.panel
+        panel.fill((0, 0, 0, 200))
+        times, barrels = self.profiler.recent(self.GRAPH_FRAMES)
+        if not len(times):
+            return
+        ms = times * 1000.0
+        work = ms[:, WORK_PHASES].sum(axis=1)
+        recent = ms[-self.AVERAGE_FRAMES:]
+        lines = [
+            f"FPS   {self.clock.get_fps():5.1f}",
+            f"frame {work[-self.AVERAGE_FRAMES:].mean():5.2f} ms  max {work[-self.AVERAGE_FRAMES:].max():5.2f}",
+            f"sim   {(recent[:, PHASE_PHYSICS] + recent[:, PHASE_COLLISION]).mean():5.2f} ms",
+            f"draw  {recent[:, PHASE_DRAW].mean():5.2f} ms",
+            f"flip  {recent[:, PHASE_FLIP].mean():5.2f} ms",
+            f"wait  {recent[:, PHASE_WAIT].max():5.0f} ms max",
+            f"barrels {int(barrels[-1])}",
+        ]
+        for i, line in enumerate(lines):
+            panel.blit(self.text_cache.render(self.font, line, WHITE), (6, 4 + i * 14))
+
+        # Frame-time graph, 1 px per ms, with the 60 Hz budget line
+        graph_bottom = self.PANEL_RECT.height - 4
+        graph_height = 56
+        for x, value in enumerate(work.tolist()):
+            height = min(graph_height, int(value))
+            color = TEXT_GREEN if value < FRAME_MS else TEXT_RED
+            pygame.draw.line(panel, color, (10 + x, graph_bottom), (10 + x, graph_bottom - height))
+        budget_y = graph_bottom - int(FRAME_MS)
+        pygame.draw.line(panel, TEXT_YELLOW, (10, budget_y), (10 + self.GRAPH_FRAMES, budget_y))
+
+    def draw(self, screen, scale=1.0):
+        written = self.profiler.frames_written
+        if self._refreshed_at is None or written - self._refreshed_at >= self.REFRESH_FRAMES or written < self._refreshed_at:
+            self._refresh()
+            self._refreshed_at = written
+            self._scaled = None
+        if scale == 1.0:
+            return screen.blit(self.panel, self.PANEL_RECT)
+        if self._scaled is None or self._scaled[0] != scale:
+            rect = scale_rect(self.PANEL_RECT, scale)
+            self._scaled = (scale, pygame.transform.smoothscale(self.panel, rect.size), rect)
+        return screen.blit(self._scaled[1], self._scaled[2])
+
+
+# --- Drawing ---
+def scale_rect(rect, scale):
+    left, top, width, height = rect
+    return pygame.Rect(round(left * scale), round(top * scale), round(width * scale), round(height * scale))
+
+
+def draw_level_background(surface, sim):
+    """Everything that stays put for the whole level: girders, ladders, Kong, oil drum."""
+    surface.fill(BLACK)
+    for girder_data in sim.g_level_girders:
+        # Draw the girder based on its actual span and y_start/y_end for sloped ones
+        # For drawing, we use y_start and y_end to define the top surface.
+        # The 'rect' in girder_data is mostly for horizontal span and broad collision.
+        # A simple rect for visual representation:
+        pygame.draw.rect(surface, GIRDER_BROWN, girder_data.rect)
+        # To show actual slope:
+        # pygame.draw.line(surface, WHITE, (girder_data.left, girder_data.y_start), (girder_data.right, girder_data.y_end), 1)
+
+
+    for ladder in sim.g_level_ladders:
+        ladder_rect = pygame.Rect(ladder.rect)
+        pygame.draw.rect(surface, LADDER_CYAN, ladder_rect)
+        num_rungs = max(1, int(ladder_rect.height / 15))
+        for i in range(1, num_rungs + 1):
+            rung_y = ladder_rect.top + (i * ladder_rect.height / (num_rungs +1) )
+            pygame.draw.line(surface, BLACK, (ladder_rect.left + 2, rung_y), (ladder_rect.right - 2, rung_y), 2)
+
+    pygame.draw.rect(surface, DK_RED, sim.g_kong_rect)
+    pygame.draw.rect(surface, OIL_DRUM_BLUE, sim.g_oil_drum_rect)
+
+
+def previous_positions(sim):
+    """What Renderer interpolates from: (level, player x, player y, barrel count, barrel x, barrel y)."""
+    barrels = sim.barrels
+    n = barrels.count
+    return (sim.level, sim.player_rect.x, sim.player_rect.y, n, barrels.x[:n].copy(), barrels.y[:n].copy())
+
+
+class Renderer:
+    """Draws a GameSim onto the display surface (or anything with the attributes
+    it reads, such as a kong_pipeline.FrameState).
+
+    The static level is rendered once per load_level into a cached background.
+    In dirty-rect mode (the default) each playing frame only restores the
+    background under last frame's sprites and the HUD strip, redraws the
+    sprites and pushes just those regions with pygame.display.update(). Frames
+    with an overlay, a level change or a very busy screen fall back to a full
+    redraw + flip, as does everything when dirty_rects=False.
+
+    When the caller steps the sim on a fixed timestep and renders in between,
+    remember_previous() before each step and draw(sim, alpha) with the
+    fraction of a step elapsed since the last one; the player and barrels are
+    then drawn that far between the two states.
+
+    With scale below 1 the scene is drawn into a smaller render target (fonts,
+    sprites and overlays all scaled to match) and present() scales that up to
+    the window, so drawing fills scale**2 as many pixels. At 0.5 the upscale
+    is an exact 2x and dirty rects are scaled up one by one.
+    """
+
+    HUD_RECT = pygame.Rect(0, 0, WIDTH, 40)
+    MAX_DIRTY_RECTS = 400 # Past this a single full update is cheaper
+
+    def __init__(self, screen, fonts, dirty_rects=True, scale=1.0):
+        self.window = screen
+        self.text_cache = TextCache()
+        self.dirty_rects = dirty_rects
+        self._fonts = {1.0: fonts} # scale -> fonts, loaded on first use
+        self._full_background = None # Window-sized background for scaled targets to shrink
+        self.profiler_overlay = None # Optional ProfilerOverlay, drawn on top when visible
+        self._previous = None # (level, player x, player y, barrel count, barrel x, barrel y) before the last step
+        self.set_scale(scale)
+
+    def set_scale(self, scale):
+        """Draw into a render target `scale` times the window's size from the next frame on."""
+        self.scale = scale
+        if scale == 1.0:
+            self.screen = self.window
+        else:
+            width, height = self.window.get_size()
+            self.screen = pygame.Surface((round(width * scale), round(height * scale))).convert()
+        fonts = self._fonts.get(scale)
+        if fonts is None:
+            fonts = self._fonts[scale] = load_fonts(scale)
+        self.fonts = fonts
+        size = self.screen.get_size()
+        self.intro_overlay = make_overlay(160, size)
+        self.end_overlay = make_overlay(190, size)
+        self.background = pygame.Surface(size).convert()
+        self.hud_rect = scale_rect(self.HUD_RECT, scale)
+        # Exact integer upscale: dirty rects can be scaled up on their own
+        factor = self.window.get_width() // size[0]
+        self._factor = factor if scale != 1.0 and size[0] * factor == self.window.get_width() \
+            and size[1] * factor == self.window.get_height() else None
+        self._background_level = None # CompiledLevel the background was drawn from
+        self._last_sprite_rects = []
+        self._needs_full_redraw = True
+        self._pending_update = None # None -> flip the whole display
+
+    def remember_previous(self, sim):
+        """Keep the positions draw() interpolates from; call right before sim.step()."""
+        self._previous = previous_positions(sim)
+
+    def _refresh_background(self, sim):
+        if self._background_level is not sim.level:
+            if self.scale == 1.0:
+                draw_level_background(self.background, sim)
+            else: # Drawn at full size and shrunk, so thin rungs average out instead of vanishing
+                if self._full_background is None:
+                    self._full_background = pygame.Surface(self.window.get_size()).convert()
+                draw_level_background(self._full_background, sim)
+                pygame.transform.smoothscale(self._full_background, self.background.get_size(), self.background)
+            self._background_level = sim.level
+            self._needs_full_redraw = True
+
+    def _lerp_positions(self, sim, alpha):
+        # (player rect, barrel centers or None) drawn `alpha` of the way from the previous step
+        player_rect = sim.player_rect
+        previous = self._previous
+        if alpha >= 1.0 or previous is None or previous[0] is not sim.level or sim.game_state != STATE_PLAYING:
+            return player_rect, None
+        _, px, py, n, bx, by = previous
+        back = 1.0 - alpha
+        dx = player_rect.x - px; dy = player_rect.y - py
+        if abs(dx) < MAX_LERP_PX and abs(dy) < MAX_LERP_PX:
+            player_rect = player_rect.move(round(-dx * back), round(-dy * back))
+        barrels = sim.barrels
+        if not len(barrels) or barrels.count < n:
+            return player_rect, None # Compacted or cleared: slots no longer line up
+        count = barrels.count; half = barrels.size // 2
+        x = barrels.x[:count].copy(); y = barrels.y[:count].copy()
+        x[:n] -= (x[:n] - bx) * back; y[:n] -= (y[:n] - by) * back
+        alive = barrels.alive[:count]
+        return player_rect, (x[alive] + half, y[alive] + half)
+
+    def _draw_sprites(self, sim, alpha=1.0):
+        screen = self.screen
+        game_state = sim.game_state
+        scale = self.scale
+        player_rect, barrel_centers = self._lerp_positions(sim, alpha)
+        goal_rect = sim.g_goal_rect
+        if scale != 1.0:
+            player_rect = scale_rect(player_rect, scale); goal_rect = scale_rect(goal_rect, scale)
+        rects = [
+            pygame.draw.rect(screen, PAULINE_PINK if game_state != STATE_VICTORY else TEXT_GREEN, goal_rect),
+            pygame.draw.rect(screen, PLAYER_BLUE, player_rect),
+        ]
+        barrel_rects = draw_barrels(screen, sim.barrels, doreturn=True, centers=barrel_centers, scale=scale)
+        if barrel_rects: rects.extend(barrel_rects)
+        return rects
+
+    def draw(self, sim, alpha=1.0, previous=None):
+        """previous: previous_positions() to interpolate from instead of the last remember_previous()."""
+        if previous is not None: self._previous = previous
+        self._refresh_background(sim)
+        screen = self.screen
+        full = (not self.dirty_rects or self._needs_full_redraw or sim.game_state not in SCENE_STATES)
+
+        if full:
+            screen.blit(self.background, (0, 0))
+        else:
+            restore = self._last_sprite_rects + [self.hud_rect]
+            screen.blits([(self.background, r, r) for r in restore], doreturn=False)
+
+        sprite_rects = self._draw_sprites(sim, alpha)
+        self._draw_hud(sim)
+        self._draw_overlay(sim)
+        if self.profiler_overlay is not None and self.profiler_overlay.visible:
+            # Restored and pushed like a sprite, so hiding it cleans up after itself
+            sprite_rects.append(self.profiler_overlay.draw(screen, self.scale))
+
+        if full or len(sprite_rects) + len(self._last_sprite_rects) > self.MAX_DIRTY_RECTS:
+            self._pending_update = None
+        else:
+            self._pending_update = self._last_sprite_rects + sprite_rects + [self.hud_rect]
+        self._last_sprite_rects = sprite_rects
+        # An overlay covers the whole screen, so the frame after it must redraw everything
+        self._needs_full_redraw = sim.game_state not in SCENE_STATES
+
+    def present(self):
+        if self.screen is not self.window:
+            self._upscale()
+        if self._pending_update is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._pending_update)
+
+    def _upscale(self):
+        # Copy the render target to the window, rewriting _pending_update in window coordinates
+        factor = self._factor
+        if self._pending_update is None or factor is None:
+            pygame.transform.scale(self.screen, self.window.get_size(), self.window)
+            self._pending_update = None
+            return
+        screen = self.screen; window = self.window
+        bounds = screen.get_rect()
+        update = []
+        for rect in self._pending_update:
+            rect = bounds.clip(rect)
+            if not rect: continue
+            dest = pygame.Rect(rect.x * factor, rect.y * factor, rect.width * factor, rect.height * factor)
+            pygame.transform.scale(screen.subsurface(rect), dest.size, window.subsurface(dest))
+            update.append(dest)
+        self._pending_update = update
+
+    def _blit_centered(self, font, text, color, y):
+        # y in window coordinates
+        text_surf = self.text_cache.render(font, text, color)
+        self.screen.blit(text_surf, (self.screen.get_width() // 2 - text_surf.get_width() // 2, round(y * self.scale)))
+        return text_surf
+
+    def _draw_hud(self, sim):
+        title_font, score_font, message_font, small_message_font = self.fonts
+        render = self.text_cache.render
+        screen = self.screen
+        # Same text -> same cached surface, so these only re-render when the value changes
+        margin = round(10 * self.scale); top = round(5 * self.scale)
+        score_surf = render(score_font, f"SCORE: {int(sim.score)}", TEXT_YELLOW)
+        screen.blit(score_surf, (margin, top))
+        lives_surf = render(score_font, f"LIVES: {sim.player_lives}", TEXT_YELLOW)
+        screen.blit(lives_surf, (screen.get_width() - lives_surf.get_width() - margin, top))
+
+        if sim.game_state != STATE_VICTORY:
+            self._blit_centered(small_message_font, sim.level_name, WHITE, 8)
+
+    def _draw_overlay(self, sim):
+        title_font, score_font, message_font, small_message_font = self.fonts
+        game_state = sim.game_state
+        screen = self.screen
+
+        if game_state == STATE_INTRO:
+            intro_stage = sim.intro_stage
+            screen.blit(self.intro_overlay, (0,0))
+            msg_text = f"LEVEL {sim.current_level_index + 1}" if intro_stage == 0 else intro_texts[intro_stage]
+            msg_color = TEXT_YELLOW if intro_stage == 1 else TEXT_GREEN if intro_stage == 2 else WHITE
+            msg_render = self.text_cache.render(title_font, msg_text, msg_color)
+            screen.blit(msg_render, (screen.get_width() // 2 - msg_render.get_width() // 2,
+                                     screen.get_height() // 2 - msg_render.get_height() // 2 - round(30 * self.scale)))
+
+        elif game_state == STATE_GAME_OVER_LOST or game_state == STATE_VICTORY:
+            screen.blit(self.end_overlay, (0,0))
+            msg_text = "GAME OVER!" if game_state == STATE_GAME_OVER_LOST else "CONGRATULATIONS!"
+            msg_color = TEXT_RED if game_state == STATE_GAME_OVER_LOST else TEXT_GREEN
+            self._blit_centered(message_font, msg_text, msg_color, HEIGHT // 2 - 60)
+
+            if game_state == STATE_VICTORY:
+                self._blit_centered(small_message_font, "You Saved Pauline!", WHITE, HEIGHT // 2 - 10)
+
+            self._blit_centered(small_message_font, f"Final Score: {int(sim.score)}", TEXT_YELLOW, HEIGHT // 2 + 30)
+            self._blit_centered(small_message_font, "Press 'R' to Restart", WHITE, HEIGHT // 2 + 70)
+
+
+class AutoScale:
+    """Steps a Renderer through RENDER_SCALES to keep frames inside a time budget.
+
+    Once every CHECK_FRAMES it looks at the mean work time (everything but
+    waiting) of the profiler's newest frames: over budget drops one step,
+    RAISE_CHECKS checks in a row under half of it go back up one.
+    """
+
+    CHECK_FRAMES = 60
+    RAISE_CHECKS = 5
+
+    def __init__(self, renderer, profiler, budget_ms):
+        self.renderer = renderer
+        self.profiler = profiler
+        self.budget_ms = budget_ms
+        self._frames = 0
+        self._calm = 0 # Checks in a row under half the budget
+
+    def update(self):
+        """Call once a frame, after FrameProfiler.end_frame(). Returns the scale in use."""
+        renderer = self.renderer
+        self._frames += 1
+        if self._frames < self.CHECK_FRAMES:
+            return renderer.scale
+        self._frames = 0
+        times, _ = self.profiler.recent(self.CHECK_FRAMES)
+        if not len(times):
+            return renderer.scale
+        work_ms = float(times[:, WORK_PHASES].sum(axis=1).mean()) * 1000.0
+        step = RENDER_SCALES.index(renderer.scale) if renderer.scale in RENDER_SCALES else 0
+        if work_ms > self.budget_ms and step + 1 < len(RENDER_SCALES):
+            renderer.set_scale(RENDER_SCALES[step + 1]); self._calm = 0
+        elif work_ms < self.budget_ms / 2 and step > 0:
+            self._calm += 1
+            if self._calm == self.RAISE_CHECKS:
+                renderer.set_scale(RENDER_SCALES[step - 1]); self._calm = 0
+        else:
+            self._calm = 0
+        return renderer.scale
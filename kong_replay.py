@@ -0,0 +1,232 @@
+import argparse
+import struct
+import time
+
+from kong_levels import load_level_pack
+from kong_sim import GameSim, INPUT_JUMP, INPUT_RESTART
+
+# Input recordings. A GameSim is fully determined by its seed, start level,
+# level set, stress rate and the INPUT_* bits fed to each step(), so that is
+# all a recording stores, plus a state_hash() every hash_interval frames and
+# the final score / lives to catch the first frame a replay drifts.
+#
+# File layout (little endian):
+#   header   magic, version, seed, start level, stress, hash interval, frame count, final score, final lives
+#   levels   u16 length + utf-8 level pack path ('' = built-in levels)
+#   inputs   u32 run count, then one LEB128 varint per run: (run length - 1) << 6 | input bits
+#   hashes   u32 count, then one u32 state hash per hash_interval frames
+# Held keys change rarely, so a minute of play is typically well under 1 KB.
+
+RECORDING_MAGIC = b'KREC'
+# Bumped whenever GameSim's rules change what a recording's inputs play out to:
+#   2  ladders are climbed until the feet clear the top, then the player lands on the girder
+#   3  landing is swept: anything falling stops on the highest girder its bottom passed this frame
+#   4  a barrel hitting the player ends that frame's barrel update, as dkv0's loop did
+#   5  ladders stop once the player's head reaches the top again, as before version 2
+#   6  ladders are climbed until the feet clear the top again (version 2's rule)
+RECORDING_VERSION = 6
+_HEADER = struct.Struct('<4sHQHdHIdh')
+INPUT_BITS = 6 # INPUT_LEFT .. INPUT_RESTART
+INPUT_MASK = (1 << INPUT_BITS) - 1
+DEFAULT_HASH_INTERVAL = 60 # One state hash per simulated second
+
+
+class RecordingError(ValueError):
+    pass
+
+
+class ReplayDesync(Exception):
+    """A replay stopped matching its recording."""
+
+    def __init__(self, frame, message):
+        super().__init__(f"frame {frame}: {message}")
+        self.frame = frame
+
+
+def _pack_varint(value, out):
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class Recording:
+    """Everything needed to rebuild a game and feed it the same inputs."""
+
+    def __init__(self, seed, start_level=0, stress=0.0, levels_path='', hash_interval=DEFAULT_HASH_INTERVAL):
+        self.seed = seed
+        self.start_level = start_level
+        self.stress = stress
+        self.levels_path = levels_path or ''
+        self.hash_interval = hash_interval
+        self.runs = [] # [input bits, run length]
+        self.frames = 0
+        self.hashes = []
+        self.final_score = 0.0
+        self.final_lives = 0
+
+    def make_sim(self):
+        levels = load_level_pack(self.levels_path) if self.levels_path else None
+        return GameSim(seed=self.seed, endless=self.stress > 0, stress_spawn_per_tick=self.stress,
+                       levels=levels, start_level=self.start_level)
+
+    # --- Recording ---
+    def add_frame(self, inputs, sim):
+        """Log the inputs just passed to sim.step() and the state they produced."""
+        inputs &= INPUT_MASK
+        runs = self.runs
+        if runs and runs[-1][0] == inputs: runs[-1][1] += 1
+        else: runs.append([inputs, 1])
+        self.frames += 1
+        if self.frames % self.hash_interval == 0:
+            self.hashes.append(sim.state_hash())
+        self.final_score = sim.score
+        self.final_lives = sim.player_lives
+
+    def inputs(self):
+        """Per-frame input bits, in order."""
+        for bits, length in self.runs:
+            for _ in range(length):
+                yield bits
+
+    # --- File I/O ---
+    def to_bytes(self):
+        out = bytearray(_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, self.seed, self.start_level, self.stress,
+                                     self.hash_interval, self.frames, self.final_score, self.final_lives))
+        path = self.levels_path.encode('utf-8')
+        out += struct.pack('<H', len(path)) + path
+        out += struct.pack('<I', len(self.runs))
+        for bits, length in self.runs:
+            _pack_varint((length - 1) << INPUT_BITS | bits, out)
+        out += struct.pack('<I', len(self.hashes))
+        out += struct.pack(f'<{len(self.hashes)}I', *self.hashes)
+        return bytes(out)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def from_bytes(cls, data, name='recording'):
+        try:
+            magic, version, seed, start_level, stress, hash_interval, frames, final_score, final_lives = \
+                _HEADER.unpack_from(data, 0)
+            if magic != RECORDING_MAGIC:
+                raise RecordingError(f"{name}: not an input recording")
+            if version != RECORDING_VERSION:
+                raise RecordingError(f"{name}: unsupported recording version {version}")
+            offset = _HEADER.size
+            (length,) = struct.unpack_from('<H', data, offset); offset += 2
+            levels_path = data[offset:offset + length].decode('utf-8'); offset += length
+
+            rec = cls(seed, start_level, stress, levels_path, hash_interval)
+            (n_runs,) = struct.unpack_from('<I', data, offset); offset += 4
+            for _ in range(n_runs):
+                value = shift = 0
+                while True:
+                    byte = data[offset]; offset += 1
+                    value |= (byte & 0x7f) << shift
+                    shift += 7
+                    if byte < 0x80: break
+                rec.runs.append([value & INPUT_MASK, (value >> INPUT_BITS) + 1])
+            (n_hashes,) = struct.unpack_from('<I', data, offset); offset += 4
+            rec.hashes = list(struct.unpack_from(f'<{n_hashes}I', data, offset))
+        except (struct.error, UnicodeDecodeError, IndexError) as e:
+            raise RecordingError(f"{name}: corrupt recording ({e})") from e
+        rec.frames = sum(length for _, length in rec.runs)
+        if rec.frames != frames:
+            raise RecordingError(f"{name}: header says {frames} frames, inputs hold {rec.frames}")
+        rec.final_score = final_score
+        rec.final_lives = final_lives
+        return rec
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read(), path)
+
+
+class Replayer:
+    """Feeds a Recording's inputs to a sim one frame at a time and checks it keeps up.
+
+    Call next_inputs(), step the sim with them, then check(); finish() once
+    done is True compares the final score and lives.
+    """
+
+    def __init__(self, recording, sim=None):
+        self.recording = recording
+        self.sim = sim if sim is not None else recording.make_sim()
+        self.frame = 0
+        self._run = 0 # Index into recording.runs, and how many of its frames are left
+        self._left = recording.runs[0][1] if recording.runs else 0
+
+    @property
+    def done(self):
+        return self.frame >= self.recording.frames
+
+    def next_inputs(self):
+        return self.next_run(1)[0]
+
+    def next_run(self, limit):
+        """Up to `limit` frames of unchanged inputs as (bits, frames), for
+        sim.step(bits, frames). A run stops at the next state hash to check,
+        and a recorded jump or restart is pressed on each of its frames, so
+        those come a frame at a time."""
+        if not self._left:
+            self._run += 1
+            self._left = self.recording.runs[self._run][1]
+        bits = self.recording.runs[self._run][0]
+        interval = self.recording.hash_interval
+        frames = 1 if bits & (INPUT_JUMP | INPUT_RESTART) else min(limit, self._left, interval - self.frame % interval)
+        self._left -= frames
+        self.frame += frames
+        return bits, frames
+
+    def check(self):
+        interval = self.recording.hash_interval
+        if self.frame % interval == 0:
+            expected = self.recording.hashes[self.frame // interval - 1]
+            actual = self.sim.state_hash()
+            if actual != expected:
+                raise ReplayDesync(self.frame, f"state hash {actual:08x}, recorded {expected:08x}")
+
+    def finish(self):
+        rec, sim = self.recording, self.sim
+        if sim.score != rec.final_score or sim.player_lives != rec.final_lives:
+            raise ReplayDesync(self.frame, f"ended with score {sim.score:.2f} / {sim.player_lives} lives, "
+                                           f"recorded {rec.final_score:.2f} / {rec.final_lives}")
+
+
+def replay_headless(recording, ticks=1):
+    """Run a whole recording as fast as possible, up to `ticks` frames of held
+    input per step. Returns the finished GameSim; raises ReplayDesync on the
+    first mismatch."""
+    replayer = Replayer(recording)
+    step = replayer.sim.step
+    while not replayer.done:
+        step(*replayer.next_run(ticks))
+        replayer.check()
+    replayer.finish()
+    return replayer.sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a Kong input recording headless and verify it")
+    parser.add_argument("recording", help="file written by dkv0.py --record")
+    parser.add_argument("--ticks", type=int, default=1, help="frames of held input to take per step (see kong_ticks.py)")
+    args = parser.parse_args()
+    rec = Recording.load(args.recording)
+    print(f"{args.recording}: seed {rec.seed}, level {rec.start_level + 1}, {rec.frames} frames "
+          f"in {len(rec.runs)} input runs, {len(rec.hashes)} state hashes")
+    start = time.perf_counter()
+    try:
+        sim = replay_headless(rec, args.ticks)
+    except ReplayDesync as e:
+        raise SystemExit(f"DESYNC at {e}")
+    elapsed = time.perf_counter() - start
+    print(f"OK: score {int(sim.score)}, {sim.player_lives} lives; "
+          f"{rec.frames / elapsed:,.0f} ticks/s ({rec.frames / 60 / elapsed:,.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import zlib
+from collections import deque
+
+import numpy
+
+from kong_barrels import BarrelStore
+from kong_sim import SimSnapshot, TICK_RATE
+
+# Rewind history for a GameSim: one entry per step, grouped into segments
+# that each start with a keyframe. A keyframe keeps the full BarrelStore rows
+# (zlib'd); every other frame keeps its rows XORed against its segment's
+# keyframe and zlib'd. Barrels only move a few pixels per frame and slots
+# are stable between compactions, so the XOR is mostly zero bytes and squeezes
+# down to a few hundred bytes. Rebuilding any frame is one decompress + XOR,
+# whichever frame of the segment it is.
+#
+# The scalar state is a tuple of ~20 values and is kept as is. The Mersenne
+# Twister state (625 words) gets the same XOR-against-keyframe treatment; it
+# only changes when a barrel spawns and then only in its position word, so
+# frames share one packed copy until it does.
+
+_ROW_DTYPE = BarrelStore.ROW_DTYPE
+
+
+class _Segment:
+    __slots__ = ('key_rows', 'key_raw', 'key_rng', 'frames')
+
+    def __init__(self, rows, rng_state):
+        self.key_rows = len(rows)
+        self.key_raw = numpy.frombuffer(rows.tobytes(), dtype=numpy.uint8)
+        self.key_rng = numpy.array(rng_state[1], dtype=numpy.uint32)
+        self.frames = [] # (scalars, packed rng state, row count, packed rows)
+
+    def pack_rng(self, rng_state):
+        version, words, gauss_next = rng_state
+        return version, zlib.compress((numpy.array(words, dtype=numpy.uint32) ^ self.key_rng).tobytes(), 1), gauss_next
+
+    def unpack_rng(self, packed):
+        version, xored, gauss_next = packed
+        words = numpy.frombuffer(zlib.decompress(xored), dtype=numpy.uint32) ^ self.key_rng
+        return version, tuple(words.tolist()), gauss_next
+
+
+class RewindBuffer:
+    """The last `seconds` of a GameSim, one snapshot per push()."""
+
+    def __init__(self, seconds=60, keyframe_interval=30, level=1):
+        self.keyframe_interval = keyframe_interval
+        self.level = level # zlib level; 1 is plenty for mostly-zero XORs
+        self.max_frames = int(seconds * TICK_RATE)
+        self._segments = deque()
+        self._frames = 0
+        self._last_rng_state = None
+        self._last_rng_packed = None
+
+    def __len__(self):
+        return self._frames
+
+    def clear(self):
+        self._segments.clear()
+        self._frames = 0
+        self._last_rng_state = None
+        self._last_rng_packed = None
+
+    def push(self, sim):
+        """Record sim's current state as the newest frame."""
+        snap = sim.snapshot()
+        rows = snap.barrel_rows
+        rng_state = snap.rng_state
+
+        segment = self._segments[-1] if self._segments else None
+        if (segment is None or len(segment.frames) >= self.keyframe_interval
+                or len(rows) < segment.key_rows): # Compacted or cleared: XOR base no longer lines up
+            segment = _Segment(rows, rng_state)
+            self._segments.append(segment)
+            packed = None # The keyframe's rows are segment.key_raw itself
+            self._last_rng_state = None
+        else:
+            raw = numpy.frombuffer(rows.tobytes(), dtype=numpy.uint8).copy()
+            raw[:len(segment.key_raw)] ^= segment.key_raw # Rows spawned since the keyframe stay as they are
+            packed = zlib.compress(raw, self.level)
+        if rng_state != self._last_rng_state:
+            self._last_rng_state = rng_state
+            self._last_rng_packed = segment.pack_rng(rng_state)
+        segment.frames.append((snap.scalars, self._last_rng_packed, len(rows), packed))
+        self._frames += 1
+
+        while self._frames - len(self._segments[0].frames) >= self.max_frames:
+            self._frames -= len(self._segments.popleft().frames)
+
+    def _decode(self, segment, frame):
+        scalars, rng_packed, n_rows, packed = frame
+        if packed is None:
+            raw = segment.key_raw.copy()
+        else:
+            raw = numpy.frombuffer(zlib.decompress(packed), dtype=numpy.uint8).copy()
+            raw[:len(segment.key_raw)] ^= segment.key_raw
+        return SimSnapshot(scalars, raw.view(_ROW_DTYPE), segment.unpack_rng(rng_packed))
+
+    def peek(self, back=0):
+        """SimSnapshot of the frame `back` frames before the newest, or None."""
+        for segment in reversed(self._segments):
+            if back < len(segment.frames):
+                return self._decode(segment, segment.frames[-1 - back])
+            back -= len(segment.frames)
+        return None
+
+    def drop(self, frames=1):
+        """Forget the newest `frames` frames."""
+        for _ in range(min(frames, self._frames)):
+            segment = self._segments[-1]
+            segment.frames.pop()
+            self._frames -= 1
+            if not segment.frames:
+                self._segments.pop()
+        self._last_rng_state = None # Next push must not share a packed state across segments
+
+    def rewind(self, sim, frames=1):
+        """Put sim back `frames` frames before the newest one (as far as history
+        goes) and forget everything after it. Returns False with nothing to go back to."""
+        frames = min(frames, self._frames - 1)
+        if frames <= 0:
+            return False
+        self.drop(frames)
+        sim.restore(self.peek())
+        return True
+
+    def nbytes(self):
+        """Approximate memory held, for the size check in kong_bench."""
+        total = 0
+        for segment in self._segments:
+            total += segment.key_raw.nbytes + segment.key_rng.nbytes
+            rng_packs = {id(rng): len(rng[1]) for _, rng, _, _ in segment.frames}
+            total += sum(rng_packs.values())
+            total += sum(len(packed or b'') + 200 for _, _, _, packed in segment.frames) # + scalars tuple
+        return total
@@ -0,0 +1,407 @@
+import random
+import struct
+import zlib
+
+import pygame
+
+from kong_barrels import BarrelStore, GirderArrays, NO_GIRDER
+from kong_profile import PHASE_PHYSICS, PHASE_COLLISION
+from kong_spatial import LevelIndex
+from kong_levels import (
+    WIDTH, HEIGHT, GIRDER_VISUAL_HEIGHT, BARREL_ROLL_SPEED_BASE,
+    builtin_levels,
+)
+
+# Headless game core for the Kong tribute. Everything in here runs without a
+# window, mixer or wall clock: time advances in fixed simulated ticks and all
+# randomness comes from an injected RNG, so the same seed + inputs always give
+# the same game. dkv0.py drives a GameSim from the keyboard and draws it.
+
+# --- Game Constants ---
+GRAVITY = 0.7 # Slightly less floaty
+PLAYER_JUMP_STRENGTH = -15 # Matched with gravity
+PLAYER_SPEED = 3.5
+PLAYER_CLIMB_SPEED = 2.5
+INITIAL_LIVES = 3
+BARREL_SIZE = 22
+
+TICK_RATE = 60
+FRAME_MS = 1000.0 / TICK_RATE # Simulated milliseconds per step()
+
+# --- Game States ---
+STATE_INTRO = 0
+STATE_PLAYING = 1
+STATE_GAME_OVER_LOST = 2
+STATE_VICTORY = 3
+STATE_LEVEL_CLEAR = 4 # Goal reached: the cleared level holds for LEVEL_CLEAR_MS, then the next one loads
+
+# Durations for "LEVEL X", "READY!", "GO!" + final brief pause before play starts
+INTRO_STAGE_DURATIONS = [1200, 1000, 800, 200]
+LEVEL_CLEAR_MS = 1200
+
+# --- Input bits (one int per step) ---
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4 # Held: climb up
+INPUT_DOWN = 8 # Held: climb down
+INPUT_JUMP = 16 # Pressed this frame (SPACE/UP/W keydown)
+INPUT_RESTART = 32 # Pressed this frame ('R' on the game over / victory screen)
+
+# Sound cues emitted by step(); the front end maps them to mixer sounds
+SOUND_JUMP = 'jump'
+SOUND_HIT = 'hit'
+SOUND_GAME_OVER = 'game_over'
+SOUND_LEVEL_WIN = 'level_win'
+
+# Why a life was lost, as logged in GameSim.deaths
+DEATH_BARREL = 'barrel'
+DEATH_FALL = 'fall'
+INTRO_STAGE_SOUNDS = ['duh0', 'duh1', 'duh3', None] # "LEVEL X", "READY!", "GO!!", pause
+
+
+class SimSnapshot:
+    """GameSim.snapshot(): scalar state, BarrelStore rows and RNG state."""
+
+    __slots__ = ('scalars', 'barrel_rows', 'rng_state')
+
+    def __init__(self, scalars, barrel_rows, rng_state):
+        self.scalars = scalars
+        self.barrel_rows = barrel_rows
+        self.rng_state = rng_state
+
+
+class GameSim:
+    """One game of Kong: level, player, barrels, score and the state machine.
+
+    step(inputs) advances exactly one 1/60 s tick. Sound cues raised during the
+    step are left in self.events for the caller to play (or ignore).
+    """
+
+    def __init__(self, seed=None, rng=None, width=WIDTH, height=HEIGHT, endless=False, stress_spawn_per_tick=0.0,
+                 levels=None, start_level=0, gravity=GRAVITY):
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.gravity = gravity # Player gravity; barrels fall at 0.6x this
+        # CompiledLevels to play through, e.g. from kong_levels.load_level_pack()
+        self.levels = levels if levels is not None else builtin_levels(width, height)
+        # Endless/stress mode: barrel hits cost no lives and extra barrels are
+        # spawned every tick on top of the level's timer
+        self.endless = endless
+        self.stress_spawn_per_tick = stress_spawn_per_tick
+        self.stress_spawn_accum = 0.0
+        self.width, self.height = width, height
+        self.bounds = pygame.Rect(0, 0, width, height)
+
+        self.time_ms = 0.0
+        self.frame = 0
+        self.events = []
+        self.profiler = None # Optional kong_profile.FrameProfiler, lapped inside step()
+
+        # --- Level ---
+        self.current_level_index = 0
+        self.level_name = ""
+        self.level = None
+        self.g_level_girders = ()
+        self.g_level_ladders = ()
+        self.girder_arrays = GirderArrays([])
+        self.level_index = None
+        self._level_derived = {} # level idx -> (GirderArrays, LevelIndex), built on first entry
+        self.g_kong_rect = pygame.Rect(0,0,1,1)
+        self.g_goal_rect = pygame.Rect(0,0,1,1)
+        self.g_oil_drum_rect = pygame.Rect(0,0,1,1)
+        self.g_current_barrel_spawn_rate = 2500
+        self.g_kong_platform_idx_for_barrel_spawn = 0
+        self.g_current_barrel_roll_speed = BARREL_ROLL_SPEED_BASE
+        self.barrel_timer_ms = 0.0 # Replaces pygame.time.set_timer(BARREL_EVENT)
+
+        # --- Player ---
+        self.player_rect = pygame.Rect(0,0, 28, 28)
+        self.player_y_velocity = 0
+        self.player_on_ground = False
+        self.player_on_ladder = False
+        self.player_climbing = False
+        self.player_lives = INITIAL_LIVES
+        self.score = 0
+        self.deaths = [] # (frame, DEATH_*) per life lost this game
+
+        # --- Barrels ---
+        self.barrels = BarrelStore(BARREL_SIZE)
+
+        # --- State machine ---
+        self.game_state = STATE_INTRO
+        self.is_level_won = False
+        self.level_clear_timer = 0.0
+        self.intro_timer = 0
+        self.intro_stage = 0
+        self.intro_sound_played_this_stage = False
+
+        self.load_level(start_level)
+
+    def reset_player_position_for_level_start_or_death(self):
+        self.player_rect.midbottom = self.level.player_start
+        self.player_y_velocity = 0
+        self.player_on_ground = True
+        self.player_on_ladder = False
+        self.player_climbing = False
+
+    def _enter_level(self, level_idx):
+        # Level geometry only; load_level() also resets player, barrels and intro
+        self.current_level_index = level_idx
+        level = self.level = self.levels[level_idx]
+        self.level_name = level.name
+
+        self.g_level_girders = level.girders
+        self.g_level_ladders = level.ladders
+        derived = self._level_derived.get(level_idx)
+        if derived is None:
+            derived = self._level_derived[level_idx] = (GirderArrays(level.girders), LevelIndex(level))
+        self.girder_arrays, self.level_index = derived
+        self.g_kong_rect = pygame.Rect(level.kong_rect)
+        self.g_goal_rect = pygame.Rect(level.goal_rect)
+        self.g_oil_drum_rect = pygame.Rect(level.oil_drum_rect)
+        self.g_current_barrel_spawn_rate = level.barrel_spawn_rate
+        self.g_kong_platform_idx_for_barrel_spawn = level.kong_platform_idx
+        self.g_current_barrel_roll_speed = level.barrel_roll_speed
+
+    def load_level(self, level_idx):
+        if level_idx >= len(self.levels):
+            self.game_state = STATE_VICTORY
+            return
+
+        self._enter_level(level_idx)
+        self.barrel_timer_ms = 0.0
+
+        self.reset_player_position_for_level_start_or_death() # Player pos depends on loaded girders
+        self.barrels.clear()
+        self.is_level_won = False
+
+        self.game_state = STATE_INTRO
+        self.intro_stage = 0
+        self.intro_timer = self.time_ms
+        self.intro_sound_played_this_stage = False # Reset for the new intro sequence
+
+    def restart(self):
+        self.player_lives = INITIAL_LIVES; self.score = 0; self.deaths = []
+        self.load_level(0) # Resets state to INTRO
+
+    def spawn_barrel(self):
+        if self.g_kong_platform_idx_for_barrel_spawn >= len(self.g_level_girders):
+            return
+        kong_rect = self.g_kong_rect
+        kong_girder = self.g_level_girders[self.g_kong_platform_idx_for_barrel_spawn]
+        spawn_offset_x = kong_rect.width * 0.6 # Spawn slightly away from Kong's edge
+        barrel_start_x = kong_rect.centerx + spawn_offset_x if self.rng.choice([True,False]) else kong_rect.centerx - spawn_offset_x
+
+        actual_start_y_surface = kong_girder.surface_y(barrel_start_x)
+
+        # Roll downhill; on a flat girder roll away from Kong
+        barrel_initial_dir = kong_girder.land_dir or (1 if barrel_start_x > kong_rect.centerx else -1)
+
+        # int() truncates the same way the pygame.Rect constructor does
+        self.barrels.spawn(int(barrel_start_x - BARREL_SIZE//2), int(actual_start_y_surface - BARREL_SIZE),
+                           barrel_initial_dir, self.g_kong_platform_idx_for_barrel_spawn)
+
+    # --- Snapshots ---
+    def snapshot(self):
+        """Everything step() reads or writes, as a SimSnapshot restore() can return to."""
+        return SimSnapshot((tuple(self.player_rect), self.player_y_velocity, self.player_on_ground,
+                            self.player_on_ladder, self.player_climbing, self.player_lives, self.score,
+                            tuple(self.deaths), self.game_state, self.is_level_won, self.intro_timer,
+                            self.intro_stage, self.intro_sound_played_this_stage, self.current_level_index,
+                            self.time_ms, self.frame, self.barrel_timer_ms, self.stress_spawn_accum,
+                            self.level_clear_timer),
+                           self.barrels.to_rows(), self.rng.getstate())
+
+    def restore(self, snapshot):
+        (rect, self.player_y_velocity, self.player_on_ground, self.player_on_ladder, self.player_climbing,
+         self.player_lives, self.score, deaths, self.game_state, self.is_level_won, self.intro_timer,
+         self.intro_stage, self.intro_sound_played_this_stage, level_idx, self.time_ms, self.frame,
+         self.barrel_timer_ms, self.stress_spawn_accum, self.level_clear_timer) = snapshot.scalars
+        self.player_rect.update(rect)
+        self.deaths = list(deaths)
+        if level_idx != self.current_level_index or self.level is None:
+            self._enter_level(level_idx)
+        self.barrels.from_rows(snapshot.barrel_rows)
+        self.rng.setstate(snapshot.rng_state)
+        self.events = []
+
+    def state_hash(self):
+        """CRC32 of everything that decides what happens next; equal across runs iff they match."""
+        header = struct.pack('<4i4d5B', *self.player_rect, self.player_y_velocity, self.score,
+                             self.time_ms, self.barrel_timer_ms, self.player_lives & 0xff, self.game_state,
+                             self.current_level_index, self.intro_stage,
+                             self.player_on_ground | self.player_on_ladder << 1 | self.player_climbing << 2)
+        crc = zlib.crc32(header)
+        barrels = self.barrels
+        alive = barrels.alive[:barrels.count]
+        for values in (barrels.x, barrels.y, barrels.y_vel, barrels.roll_angle, barrels.dir, barrels.girder):
+            crc = zlib.crc32(values[:barrels.count][alive].tobytes(), crc)
+        return crc
+
+    def step(self, inputs=0, ticks=1):
+        """Advance one tick with the given INPUT_* bits. Returns self.events.
+
+        ticks > 1 advances that many ticks in one call, for headless runs and
+        fast-forward, with the inputs held throughout (a jump or restart is
+        only pressed on the first tick). Each tick runs the same code a single
+        step does, so the game ends up exactly where as many single steps would
+        have left it; test_kong_sim.py and kong_ticks.py check that.
+        """
+        self.events = []
+        for _ in range(ticks):
+            self._tick(inputs)
+            inputs &= ~(INPUT_JUMP | INPUT_RESTART)
+        if self.profiler is not None: self.profiler.lap(PHASE_PHYSICS)
+        return self.events
+
+    def _tick(self, inputs):
+        self.frame += 1
+        self.time_ms += FRAME_MS
+
+        self.barrel_timer_ms += FRAME_MS
+        if self.barrel_timer_ms >= self.g_current_barrel_spawn_rate:
+            self.barrel_timer_ms -= self.g_current_barrel_spawn_rate
+            if self.game_state == STATE_PLAYING:
+                self.spawn_barrel()
+        if self.stress_spawn_per_tick and self.game_state == STATE_PLAYING:
+            self.stress_spawn_accum += self.stress_spawn_per_tick
+            while self.stress_spawn_accum >= 1:
+                self.stress_spawn_accum -= 1
+                self.spawn_barrel()
+
+        if self.game_state in (STATE_GAME_OVER_LOST, STATE_VICTORY) and inputs & INPUT_RESTART:
+            self.restart()
+
+        if self.game_state == STATE_INTRO:
+            self._update_intro()
+        elif self.game_state == STATE_LEVEL_CLEAR:
+            if self.time_ms - self.level_clear_timer >= LEVEL_CLEAR_MS:
+                self.load_level(self.current_level_index + 1) # Sets state to INTRO or VICTORY
+        elif self.game_state == STATE_PLAYING:
+            self._update_playing(inputs)
+
+    def _update_intro(self):
+        if not self.intro_sound_played_this_stage:
+            sound = INTRO_STAGE_SOUNDS[self.intro_stage]
+            if sound: self.events.append(sound)
+            self.intro_sound_played_this_stage = True
+
+        if self.time_ms - self.intro_timer > INTRO_STAGE_DURATIONS[self.intro_stage]:
+            self.intro_timer = self.time_ms
+            self.intro_stage += 1
+            self.intro_sound_played_this_stage = False # Reset for next stage sound
+            if self.intro_stage >= len(INTRO_STAGE_DURATIONS):
+                self.game_state = STATE_PLAYING
+                self.intro_stage = 0 # Reset for next time intro is called
+
+    def _lose_life(self, cause=DEATH_BARREL):
+        self.player_lives -= 1; self.events.append(SOUND_HIT)
+        self.deaths.append((self.frame, cause))
+        if self.player_lives <= 0: self.game_state = STATE_GAME_OVER_LOST; self.events.append(SOUND_GAME_OVER)
+        else: self.reset_player_position_for_level_start_or_death()
+
+    def _update_playing(self, inputs):
+        self.move_player(inputs)
+        player_rect = self.player_rect
+        if player_rect.top > self.height + player_rect.height : # Fallen completely off bottom
+            self._lose_life(DEATH_FALL)
+
+        profiler = self.profiler
+        if profiler is not None: profiler.lap(PHASE_PHYSICS)
+        self._update_barrels()
+        if profiler is not None: profiler.lap(PHASE_COLLISION)
+
+        if player_rect.colliderect(self.g_goal_rect) and not self.is_level_won:
+            self.is_level_won = True; self.score += (500 + (self.current_level_index+1)*250) # Bonus increases
+            self.events.append(SOUND_LEVEL_WIN)
+            self.game_state = STATE_LEVEL_CLEAR; self.level_clear_timer = self.time_ms
+
+        if self.game_state == STATE_PLAYING: self.score += (FRAME_MS / 1000.0) * (self.current_level_index + 1) # Score rate increases with level
+
+    def move_player(self, inputs):
+        """One tick of player physics alone: jumping, walking, climbing, gravity
+        and landing. No barrels, deaths or goal; kong_net clients predict with it.
+
+        Landing is swept: the player lands on the highest girder whose surface
+        the feet passed on the way down this tick (GirderArrays.landing1), so
+        no fall is too fast to be caught."""
+        if inputs & INPUT_JUMP and self.player_on_ground and not self.player_on_ladder:
+            self.player_y_velocity = PLAYER_JUMP_STRENGTH
+            self.events.append(SOUND_JUMP)
+            self.player_on_ground = False
+        player_rect = self.player_rect
+        girders = self.g_level_girders
+        index = self.level_index
+
+        if not self.player_climbing:
+            if inputs & INPUT_LEFT: player_rect.x -= PLAYER_SPEED
+            if inputs & INPUT_RIGHT: player_rect.x += PLAYER_SPEED
+        player_rect.clamp_ip(self.bounds) # Keep player on screen (horizontally for now)
+
+        current_ladder_rect = self._ladder_at(player_rect)
+        self.player_on_ladder = current_ladder_rect is not None
+        if self.player_on_ladder:
+            climb = self._climb_intent(inputs, current_ladder_rect)
+            if climb:
+                player_rect.y += climb
+                self.player_y_velocity = 0; self.player_on_ground = False; self.player_climbing = True
+                player_rect.centerx = current_ladder_rect.centerx # Snap to ladder
+            else: # No up/down key pressed while on ladder
+                self.player_climbing = False # Not actively moving on ladder
+
+            # Detach if moved off top/bottom of ladder while climbing
+            if self.player_climbing and (player_rect.bottom <= current_ladder_rect.top or player_rect.top >= current_ladder_rect.bottom - PLAYER_CLIMB_SPEED):
+                self.player_climbing = False
+                # Attempt to land on a girder if at ladder top/bottom
+                for g_idx in index.girders_in_rect(player_rect.left, player_rect.top, player_rect.right, player_rect.bottom):
+                    g_data = girders[g_idx]
+                    gsy = g_data.surface_y(player_rect.centerx)
+                    if player_rect.colliderect(g_data.rect) and abs(player_rect.bottom - gsy) < GIRDER_VISUAL_HEIGHT:
+                        player_rect.bottom = gsy
+                        self.player_on_ground = True; self.player_y_velocity = 0
+                        break
+        else:
+            self.player_climbing = False
+
+        if not self.player_climbing:
+            feet_before = player_rect.bottom
+            self.player_y_velocity += self.gravity
+            player_rect.y += self.player_y_velocity
+
+            player_on_ground_this_frame = False
+            if self.player_y_velocity >= -0.1 :
+                left, right, feet = player_rect.left, player_rect.right, player_rect.bottom
+                tolerance = GIRDER_VISUAL_HEIGHT/2
+                g_idx, surface_y = self.girder_arrays.landing1(index.girders_in_rect(left, feet_before - tolerance, right, feet),
+                                                               left, right, player_rect.centerx, feet_before, feet, tolerance)
+                if g_idx != NO_GIRDER:
+                    player_rect.bottom = surface_y
+                    self.player_y_velocity = 0
+                    player_on_ground_this_frame = True
+            self.player_on_ground = player_on_ground_this_frame
+
+    def _ladder_at(self, player_rect):
+        # The first ladder the player is on (Generous horizontal check), or None
+        ladders = self.g_level_ladders
+        for ladder_idx in self.level_index.ladders_in_rect(player_rect.left, player_rect.top, player_rect.right, player_rect.bottom):
+            ladder = ladders[ladder_idx]
+            if player_rect.colliderect(ladder.rect) and abs(player_rect.centerx - ladder.centerx) < ladder.width * 0.75:
+                return ladder
+        return None
+
+    def _climb_intent(self, inputs, ladder):
+        # -PLAYER_CLIMB_SPEED, +PLAYER_CLIMB_SPEED or 0: UP until the feet clear
+        # the top (then land), DOWN until just past the bottom
+        bottom = self.player_rect.bottom
+        if inputs & INPUT_UP and bottom > ladder.top: return -PLAYER_CLIMB_SPEED
+        if inputs & INPUT_DOWN and bottom < ladder.bottom + PLAYER_CLIMB_SPEED: return PLAYER_CLIMB_SPEED
+        return 0
+
+    def _update_barrels(self):
+        self._barrel_results(*self.barrels.update(self.girder_arrays, self.g_current_barrel_roll_speed, self.gravity,
+                                                  self.height, self.player_rect, self.level_index))
+
+    def _barrel_results(self, culled, player_hit):
+        self.score += 5 * culled
+        if player_hit:
+            if self.endless: self.events.append(SOUND_HIT)
+            else: self._lose_life()
@@ -0,0 +1,88 @@
+import numpy
+
+# Uniform-grid spatial index over a level's girders and ladders, built once per
+# load_level. Queries return candidate indices in level order (so "first
+# girder that matches" keeps meaning the same thing as a full scan); callers
+# still run their exact collision test on the candidates.
+
+
+class LevelIndex:
+    """Which girders / ladders may overlap a rect, without scanning them all."""
+
+    def __init__(self, level, cell_size=32):
+        self.cell_size = cell_size
+        self.cols = max(1, -(-level.width // cell_size))
+        self.rows = max(1, -(-level.height // cell_size))
+        self.n_girders = len(level.girders)
+
+        self._girder_cells = self._bucket([g.rect for g in level.girders])
+        self._ladder_cells = self._bucket([l.rect for l in level.ladders])
+        # Same girder buckets as a (cells x girders) mask for the batched query
+        self._girder_mask = numpy.zeros((self.rows * self.cols, self.n_girders), dtype=bool)
+        for cell, members in enumerate(self._girder_cells):
+            self._girder_mask[cell, list(members)] = True
+        # Cell range -> merged candidates. Entities come in a few fixed sizes,
+        # so this settles at a small number of entries.
+        self._girder_memo = {}
+        self._ladder_memo = {}
+
+    def _cell_range(self, left, top, right, bottom):
+        # Inclusive cell bounds, clamped so off-level rects hit the border cells
+        cs = self.cell_size
+        last_col = self.cols - 1; last_row = self.rows - 1
+        c0 = int(left // cs); c1 = int(right // cs)
+        r0 = int(top // cs); r1 = int(bottom // cs)
+        c0 = 0 if c0 < 0 else last_col if c0 > last_col else c0
+        c1 = 0 if c1 < 0 else last_col if c1 > last_col else c1
+        r0 = 0 if r0 < 0 else last_row if r0 > last_row else r0
+        r1 = 0 if r1 < 0 else last_row if r1 > last_row else r1
+        return c0, r0, c1, r1
+
+    def _bucket(self, rects):
+        cells = [[] for _ in range(self.rows * self.cols)]
+        for i, (left, top, width, height) in enumerate(rects):
+            c0, r0, c1, r1 = self._cell_range(left, top, left + width, top + height)
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    cells[r * self.cols + c].append(i)
+        return [tuple(members) for members in cells]
+
+    def _query(self, cells, memo, left, top, right, bottom):
+        key = self._cell_range(left, top, right, bottom)
+        found = memo.get(key)
+        if found is None:
+            c0, r0, c1, r1 = key
+            members = set()
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    members.update(cells[r * self.cols + c])
+            found = memo[key] = tuple(sorted(members))
+        return found
+
+    def girders_in_rect(self, left, top, right, bottom):
+        """Indices of girders whose span rect may overlap [left, right] x [top, bottom]."""
+        return self._query(self._girder_cells, self._girder_memo, left, top, right, bottom)
+
+    def ladders_in_rect(self, left, top, right, bottom):
+        return self._query(self._ladder_cells, self._ladder_memo, left, top, right, bottom)
+
+    def girder_candidates(self, left, top, width, bottom):
+        """Batched girders_in_rect for many boxes at once.
+
+        left/top/bottom are arrays (a falling box's swept extent runs from top
+        to bottom), all `width` wide; returns an (n, n_girders) bool mask of
+        candidate girders per box.
+        """
+        cs = self.cell_size
+        mask = numpy.zeros((len(left), self.n_girders), dtype=bool)
+        # Probe every cell a box can touch: its corners plus a cell_size stride
+        # across boxes bigger than a cell
+        x_offsets = list(range(0, width, cs)) + [width]
+        tallest = int(numpy.max(bottom - top)) if len(top) else 0
+        cols = [numpy.clip(((left + dx) // cs).astype(numpy.int64), 0, self.cols - 1) for dx in x_offsets]
+        for dy in list(range(0, tallest, cs)) + [None]:
+            y = bottom if dy is None else numpy.minimum(top + dy, bottom)
+            row = numpy.clip((y // cs).astype(numpy.int64), 0, self.rows - 1)
+            for col in cols:
+                mask |= self._girder_mask[row * self.cols + col]
+        return mask
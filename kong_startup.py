@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Startup benchmark. Launches dkv0.py --startup-report under SDL's dummy
+# drivers and breaks time-to-first-frame into phases, cold (empty PCM cache)
+# and warm (cache filled by an earlier launch), then summarizes a
+# `python -X importtime -c "import dkv0"` run.
+#
+#   python kong_startup.py --runs 5
+#   python kong_startup.py --max-import-ms 250   # exit 1 when importing dkv0 takes longer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (phase, mark it ends at); each phase starts where the previous one ended, the first at the spawn
+PHASES = (
+    ('interpreter + imports', 'imported'),
+    ('window', 'window'),           # display init, set_mode, first (blank) flip
+    ('assets', 'assets'),           # waiting on the AssetLoader: mixer, sounds, fonts
+    ('first game frame', 'first_frame'),
+)
+
+
+def _env(cache_dir):
+    env = dict(os.environ, XDG_CACHE_HOME=cache_dir, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    return env
+
+
+def launch(cache_dir):
+    """One dkv0 launch. Returns (seconds per phase, loader step seconds, PCM cache counts)."""
+    spawned = time.time()
+    out = subprocess.run([sys.executable, os.path.join(HERE, "dkv0.py"), "--startup-report", "--seed", "0"],
+                         env=_env(cache_dir), cwd=HERE, capture_output=True, text=True, check=True).stdout
+    report = json.loads(next(line for line in out.splitlines() if line.startswith('{')))
+    marks = report['marks']
+    phases = {}
+    previous = spawned
+    for name, mark in PHASES:
+        phases[name] = marks[mark] - previous; previous = marks[mark]
+    phases['total'] = marks['first_frame'] - spawned
+    return phases, report['loader'], report['pcm_cache']
+
+
+def import_times(module="dkv0"):
+    """[(self us, cumulative us, depth, name)] for importing module, from python -X importtime."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         env=_env(tempfile.gettempdir()), cwd=HERE, capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), (len(name) - len(name.lstrip())) // 2, name.strip()))
+    # Children are listed before their parent; keep just module's subtree, not the interpreter's own startup
+    end = next(i for i, row in enumerate(rows) if row[2] == 0 and row[3] == module)
+    start = end
+    while start > 0 and rows[start - 1][2] > 0: start -= 1
+    return rows[start:end + 1]
+
+
+def _print_runs(label, runs):
+    print(f"{label} ({len(runs)} launches, median ms):")
+    for name in [name for name, _ in PHASES] + ['total']:
+        values = [phases[name] * 1000 for phases, _, _ in runs]
+        print(f"  {name:24s} {statistics.median(values):8.1f}   (min {min(values):.1f}, max {max(values):.1f})")
+    loader_steps = runs[0][1]
+    print("  loader thread: " + "  ".join(f"{step} {statistics.median(r[1][step] for r in runs) * 1000:.1f}"
+                                         for step in loader_steps))
+    hits = sum(r[2]['hits'] for r in runs); misses = sum(r[2]['misses'] for r in runs)
+    print(f"  PCM cache: {hits} hits, {misses} misses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Kong's time to first frame and import cost")
+    parser.add_argument("--runs", type=int, default=5, help="launches per cold / warm set")
+    parser.add_argument("--top", type=int, default=12, help="imports to list")
+    parser.add_argument("--max-import-ms", type=float, help="fail when `import dkv0` takes longer than this")
+    parser.add_argument("--json", metavar="FILE", help="write the results to FILE")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as warm_dir:
+        cold = []
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as cold_dir:
+                cold.append(launch(cold_dir))
+        launch(warm_dir) # Fill the cache
+        warm = [launch(warm_dir) for _ in range(args.runs)]
+    _print_runs("cold PCM cache", cold)
+    _print_runs("warm PCM cache", warm)
+
+    rows = import_times()
+    total_us = sum(self_us for self_us, _, _, _ in rows)
+    print(f"import dkv0: {total_us / 1000:.1f} ms over {len(rows)} modules")
+    print("  top level (cumulative ms):")
+    for _, cumulative_us, depth, name in sorted((r for r in rows if r[2] == 1), key=lambda r: -r[1])[:args.top]:
+        print(f"    {cumulative_us / 1000:8.1f}  {name}")
+    print("  heaviest modules (self ms):")
+    for self_us, _, _, name in sorted(rows, key=lambda r: -r[0])[:args.top]:
+        print(f"    {self_us / 1000:8.1f}  {name}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'cold': [phases for phases, _, _ in cold], 'warm': [phases for phases, _, _ in warm],
+                       'import_ms': total_us / 1000,
+                       'imports': [{'name': n, 'self_ms': s / 1000, 'cumulative_ms': c / 1000} for s, c, _, n in rows]},
+                      f, indent=2)
+        print(f"wrote {args.json}")
+    if args.max_import_ms is not None and total_us / 1000 > args.max_import_ms:
+        print(f"import dkv0 over budget: {total_us / 1000:.1f} ms > {args.max_import_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
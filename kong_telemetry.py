@@ -0,0 +1,458 @@
+import argparse
+import json
+import os
+import platform
+import threading
+import time
+import uuid
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from kong_sim import DEATH_BARREL, DEATH_FALL, STATE_INTRO, STATE_PLAYING, STATE_LEVEL_CLEAR, STATE_GAME_OVER_LOST
+
+# Session telemetry for the cabinet fleet: counters and HDR-style histograms
+# kept in plain Python lists, so recording is a few integer ops per frame and
+# nothing is allocated, locked or written on the game's thread. A
+# TelemetryWriter thread snapshots them every few seconds and writes:
+#
+#   jsonl  one JSON object per flush, appended; the file rotates to FILE.1 ..
+#          FILE.N past max_bytes. Histograms carry their nonzero buckets, so
+#          sessions from different machines can be merged exactly.
+#   prom   the Prometheus text format, rewritten in place (write + rename)
+#          each flush, for node_exporter's textfile collector to scrape.
+#
+# What is recorded:
+#   frame_time  main-loop frame interval (us), everything included
+#   sim_time    one GameSim.step() (us)
+#   barrels     live barrels after each step
+#   level_time  simulated ms from GO!! to the goal, per level
+#   counters    frames, steps, deaths by cause, games lost, levels started /
+#               completed per level (completion rate = completed / started)
+#
+# Rewinding (dkv0 calls rewound() after each restore) records nothing. Deaths,
+# level starts, clears and game overs are counted only when they happen past
+# the furthest frame played so far, so play after a rewind counts nothing
+# until it gets beyond where the game had already been.
+#
+#   python kong_telemetry.py --bench            # recording cost per frame, in and out of a game loop
+#   python kong_telemetry.py --check            # counters across rewinds, exit 1 on a mismatch
+#   python dkv0.py --telemetry kong.jsonl       # record a session
+
+HISTOGRAM_BITS = 7 # 128 sub-buckets per power of two: values kept to within 1/64 (1.6%)
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+# --- Histograms ---
+class HdrHistogram:
+    """Counts of non-negative integers in log-linear buckets, HDR-histogram style.
+
+    Values below 2**bits get a bucket each; above that every power of two is
+    split into 2**(bits-1) buckets, so the relative error stays under
+    2**(1-bits) from 1 up to `highest`. Larger values land in the top bucket.
+    record() is one bit_length() and a list increment.
+    """
+
+    def __init__(self, highest, bits=HISTOGRAM_BITS):
+        self.bits = bits
+        self.highest = highest
+        self._linear = 1 << bits
+        self._half = 1 << (bits - 1)
+        self.counts = [0] * (self._index(highest) + 1)
+        self._top = len(self.counts) - 1
+        self.total = 0
+        self.count = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        if value < self._linear:
+            return value
+        shift = value.bit_length() - self.bits
+        return self._linear + (shift - 1) * self._half + (value >> shift) - self._half
+
+    def lower_bound(self, index):
+        """Smallest value that lands in bucket `index`."""
+        if index < self._linear:
+            return index
+        shift, offset = divmod(index - self._linear, self._half)
+        return (self._half + offset) << (shift + 1)
+
+    def record(self, value):
+        value = int(value)
+        if value < 0: value = 0
+        if value < self._linear:
+            self.counts[value] += 1
+        else:
+            shift = value.bit_length() - self.bits
+            index = self._linear + (shift - 1) * self._half + (value >> shift) - self._half
+            self.counts[index if index < self._top else self._top] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max: self.max = value
+        if self.min is None or value < self.min: self.min = value
+
+    def snapshot(self):
+        """A copy that record() on another thread can't change underneath (a list copy is one bytecode)."""
+        copy = HdrHistogram.__new__(HdrHistogram)
+        copy.__dict__.update(self.__dict__)
+        copy.counts = self.counts[:]
+        return copy
+
+    def quantile(self, q):
+        """Lower bound of the bucket holding the q-th quantile (0 when empty)."""
+        if not self.count:
+            return 0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.lower_bound(index), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {'count': self.count, 'sum': self.total, 'min': self.min or 0, 'max': self.max,
+                'mean': self.total / self.count if self.count else 0.0,
+                'quantiles': {str(q): self.quantile(q) for q in QUANTILES},
+                'bits': self.bits,
+                'buckets': [[self.lower_bound(i), n] for i, n in enumerate(self.counts) if n]}
+
+
+# --- Session ---
+class SessionTelemetry:
+    """Everything one play session records. frame() is for the main loop and
+    step() and rewound() for whoever steps the sim (a kong_pipeline.SimThread
+    with --pipeline); each only touches its own fields."""
+
+    def __init__(self, session=None, host=None):
+        self.session = session or uuid.uuid4().hex[:12]
+        self.host = host or platform.node() or "unknown"
+        self.started = time.time()
+        self.frame_time = HdrHistogram(1_000_000) # us, up to 1 s
+        self.sim_time = HdrHistogram(100_000) # us, up to 100 ms
+        self.barrels = HdrHistogram(4096)
+        self.level_time = {} # level number -> HdrHistogram of ms
+        self.frames = 0
+        self.steps = 0
+        self.deaths = {DEATH_BARREL: 0, DEATH_FALL: 0}
+        self.games_lost = 0
+        self.levels_started = {} # level number -> count
+        self.levels_completed = {}
+        self._state = None
+        self._level_start_ms = 0.0
+        self._frame_seen = 0 # Furthest sim.frame stepped to; only what happens past it is counted
+
+    def frame(self, seconds):
+        self.frames += 1
+        self.frame_time.record(seconds * 1e6)
+
+    def step(self, sim, seconds):
+        """After each sim.step(): its duration, live barrels and any deaths or level changes."""
+        self.steps += 1
+        self.sim_time.record(seconds * 1e6)
+        self.barrels.record(len(sim.barrels))
+        seen = self._frame_seen
+        new = sim.frame > seen
+        if new:
+            self._frame_seen = sim.frame
+            for frame, cause in reversed(sim.deaths): # (frame, cause), oldest first
+                if frame <= seen: break
+                self.deaths[cause] = self.deaths.get(cause, 0) + 1
+        state = sim.game_state
+        if state != self._state:
+            level = sim.current_level_index + 1
+            if state == STATE_PLAYING and self._state == STATE_INTRO:
+                if new: self.levels_started[level] = self.levels_started.get(level, 0) + 1
+                self._level_start_ms = sim.time_ms
+            elif state == STATE_LEVEL_CLEAR and new:
+                self.levels_completed[level] = self.levels_completed.get(level, 0) + 1
+                histogram = self.level_time.get(level)
+                if histogram is None:
+                    histogram = self.level_time[level] = HdrHistogram(3_600_000) # ms, up to an hour
+                histogram.record(sim.time_ms - self._level_start_ms)
+            elif state == STATE_GAME_OVER_LOST and new:
+                self.games_lost += 1
+            self._state = state
+
+    def rewound(self, sim):
+        """After sim.restore() put it back in time: takes up its state, so the jump isn't seen as a level change."""
+        self._state = sim.game_state
+
+    def snapshot(self):
+        """A consistent-enough copy of everything, as a dict; safe to call from another thread."""
+        started = dict(self.levels_started); completed = dict(self.levels_completed)
+        return {
+            'ts': time.time(), 'session': self.session, 'host': self.host,
+            'uptime_s': time.time() - self.started,
+            'counters': {'frames': self.frames, 'steps': self.steps, 'games_lost': self.games_lost,
+                         'deaths': dict(self.deaths),
+                         'levels_started': {str(k): v for k, v in started.items()},
+                         'levels_completed': {str(k): v for k, v in completed.items()}},
+            'completion_rate': {str(k): completed.get(k, 0) / n for k, n in started.items() if n},
+            'histograms': {'frame_time_us': self.frame_time.snapshot().to_dict(),
+                           'sim_time_us': self.sim_time.snapshot().to_dict(),
+                           'barrels': self.barrels.snapshot().to_dict(),
+                           **{f'level_time_ms.{level}': h.snapshot().to_dict()
+                              for level, h in list(self.level_time.items())}},
+        }
+
+
+# --- Export ---
+def to_jsonl(snapshot):
+    return json.dumps(snapshot, separators=(',', ':')) + '\n'
+
+
+def to_prometheus(snapshot):
+    """The Prometheus text exposition format; histograms as summaries (quantiles, _sum, _count) in seconds."""
+    labels = f'session="{snapshot["session"]}",host="{snapshot["host"]}"'
+    lines = []
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for extra, value in samples:
+            lines.append(f"{name}{{{labels}{extra}}} {value}")
+
+    counters = snapshot['counters']
+    metric("kong_frames_total", "counter", "Main-loop frames presented.", [("", counters['frames'])])
+    metric("kong_sim_steps_total", "counter", "GameSim steps.", [("", counters['steps'])])
+    metric("kong_deaths_total", "counter", "Lives lost, by cause.",
+           [(f',cause="{cause}"', n) for cause, n in counters['deaths'].items()])
+    metric("kong_games_lost_total", "counter", "Games ended by running out of lives.", [("", counters['games_lost'])])
+    metric("kong_levels_started_total", "counter", "Levels played past the intro.",
+           [(f',level="{k}"', n) for k, n in counters['levels_started'].items()])
+    metric("kong_levels_completed_total", "counter", "Levels cleared.",
+           [(f',level="{k}"', n) for k, n in counters['levels_completed'].items()])
+    metric("kong_level_completion_ratio", "gauge", "Levels cleared / started.",
+           [(f',level="{k}"', f"{rate:.6g}") for k, rate in snapshot['completion_rate'].items()])
+
+    histograms = snapshot['histograms']
+    def summary(name, help_text, histogram, scale, extra=""):
+        metric(name, "summary", help_text,
+               [(f'{extra},quantile="{q}"', f"{value * scale:.9g}") for q, value in histogram['quantiles'].items()])
+        lines.append(f"{name}_sum{{{labels}{extra}}} {histogram['sum'] * scale:.9g}")
+        lines.append(f"{name}_count{{{labels}{extra}}} {histogram['count']}")
+    summary("kong_frame_time_seconds", "Main-loop frame interval.", histograms['frame_time_us'], 1e-6)
+    summary("kong_sim_step_seconds", "Time in one GameSim.step().", histograms['sim_time_us'], 1e-6)
+    summary("kong_live_barrels", "Live barrels after each step.", histograms['barrels'], 1)
+    level_times = [(name.split('.', 1)[1], h) for name, h in histograms.items() if name.startswith('level_time_ms.')]
+    if level_times:
+        lines.append("# HELP kong_level_time_seconds Simulated time from GO!! to the goal.")
+        lines.append("# TYPE kong_level_time_seconds summary")
+        for level, h in level_times:
+            extra = f',level="{level}"'
+            for q, value in h['quantiles'].items():
+                lines.append(f'kong_level_time_seconds{{{labels}{extra},quantile="{q}"}} {value / 1000.0:.9g}')
+            lines.append(f"kong_level_time_seconds_sum{{{labels}{extra}}} {h['sum'] / 1000.0:.9g}")
+            lines.append(f"kong_level_time_seconds_count{{{labels}{extra}}} {h['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+class TelemetryWriter:
+    """Flushes a SessionTelemetry to `path` every `interval` seconds from a worker thread.
+
+    jsonl appends a line per flush and rotates past max_bytes (path -> path.1
+    -> ... -> path.<backups>); prom rewrites the file whole each time.
+    close() writes one last flush.
+    """
+
+    def __init__(self, telemetry, path, fmt='jsonl', interval=10.0, max_bytes=4 * 2**20, backups=3):
+        if fmt not in ('jsonl', 'prom'):
+            raise ValueError(f"unknown telemetry format {fmt!r} (jsonl or prom)")
+        self.telemetry = telemetry
+        self.path = path
+        self.fmt = fmt
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flushes = 0
+        self.flush_s = 0.0 # Longest flush, on the worker
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        start = time.perf_counter()
+        snapshot = self.telemetry.snapshot()
+        try:
+            if self.fmt == 'jsonl':
+                self._rotate()
+                with open(self.path, 'a') as f:
+                    f.write(to_jsonl(snapshot))
+            else:
+                temp = self.path + '.tmp'
+                with open(temp, 'w') as f:
+                    f.write(to_prometheus(snapshot))
+                os.replace(temp, self.path)
+        except OSError as e: # A full or read-only disk mustn't take the game down
+            self.error = e
+            return
+        self.flushes += 1
+        self.flush_s = max(self.flush_s, time.perf_counter() - start)
+
+    def _rotate(self):
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except FileNotFoundError:
+            return
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def close(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.flush()
+
+    def stats(self):
+        error = f", last error: {self.error}" if self.error else ""
+        return f"telemetry: {self.flushes} flushes to {self.path} ({self.fmt}), slowest {self.flush_s * 1000:.1f} ms{error}"
+
+
+# --- Check ---
+CHECK_REPLAY_GAP = 30 # Frames either side of the first clear the check replays differently
+
+
+def check(seed=0, rewind_speed=2):
+    """Plays level 1 standing still until a barrel takes a life, then clears it
+    with the autoplay bot. Rewinds (as dkv0 does, `rewind_speed` frames a step)
+    over the death and the clear, then back to the intro, replaying the same
+    inputs after each: none of that is new, so nothing more is counted. Then
+    clears the level again later than the first time, and finally stands still
+    from the intro until the game is lost: only the deaths, clear and game over
+    past the furthest frame played count. Raises AssertionError on a mismatch."""
+    from kong_nav import AutoplayBot
+    from kong_rewind import RewindBuffer
+    from kong_sim import GameSim
+
+    sim = GameSim(seed=seed)
+    bot = AutoplayBot(restart=False)
+    rewind = RewindBuffer()
+    telemetry = SessionTelemetry(session="check")
+    inputs = {} # sim.frame -> bits, so play after a rewind repeats it exactly
+    def recorded():
+        return inputs.setdefault(sim.frame, bot(sim) if sim.deaths else 0)
+    def play(policy, until):
+        while sim.game_state != until:
+            if sim.frame > 3600 or sim.game_state not in (STATE_INTRO, STATE_PLAYING):
+                raise AssertionError(f"level 1 didn't reach state {until} (state {sim.game_state} at frame {sim.frame})")
+            sim.step(policy())
+            telemetry.step(sim, 0.0)
+            rewind.push(sim)
+    def rewind_to(frame):
+        while sim.frame > frame and rewind.rewind(sim, rewind_speed):
+            telemetry.rewound(sim)
+    def expect(after, deaths, completed, games_lost=0):
+        got = (telemetry.deaths[DEATH_BARREL], telemetry.levels_started, telemetry.levels_completed,
+               telemetry.level_time[1].count, telemetry.games_lost)
+        want = (deaths, {1: 1}, {1: completed}, completed, games_lost)
+        if got != want:
+            raise AssertionError(f"after {after}: (barrel deaths, started, completed, level times, games lost) "
+                                 f"{got}, expected {want}")
+
+    play(recorded, STATE_LEVEL_CLEAR)
+    expect("the first clear", 1, 1)
+    death_at = sim.deaths[0][0]; cleared_at = sim.frame
+    rewind_to(death_at - 1)
+    expect("rewinding over the death and the clear", 1, 1)
+    play(recorded, STATE_LEVEL_CLEAR)
+    expect("replaying the death and the clear", 1, 1)
+    rewind_to(0)
+    if sim.game_state != STATE_INTRO:
+        raise AssertionError(f"rewinding to the start left state {sim.game_state}, not the intro")
+    play(recorded, STATE_LEVEL_CLEAR)
+    expect("replaying the level from its intro", 1, 1)
+
+    rewind_to(cleared_at - CHECK_REPLAY_GAP)
+    play(lambda: 0 if sim.frame <= cleared_at + CHECK_REPLAY_GAP else bot(sim), STATE_LEVEL_CLEAR)
+    expect("clearing the level again, later", 1, 2)
+    furthest = sim.frame
+    rewind_to(0)
+    play(lambda: 0, STATE_GAME_OVER_LOST)
+    expect("standing still from the intro to game over", 1 + sum(frame > furthest for frame, _ in sim.deaths), 2, 1)
+
+
+# --- Benchmark ---
+def main():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import tempfile
+    from kong_bench import wander_inputs
+    from kong_sim import GameSim
+
+    parser = argparse.ArgumentParser(description="Measure the cost of recording session telemetry")
+    parser.add_argument("--bench", action="store_true", help="time frame()+step() alone and inside a headless game")
+    parser.add_argument("--check", action="store_true", help="check the counters across rewinds, exit 1 on a mismatch")
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--stress", type=float, default=0.3, help="extra barrels per frame, for a busy game")
+    parser.add_argument("--format", choices=('jsonl', 'prom'), default='jsonl')
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between flushes in the game run")
+    args = parser.parse_args()
+    if args.check:
+        try:
+            check()
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            raise SystemExit(1)
+        print("telemetry: counters match across rewinds")
+        return
+    if not args.bench:
+        parser.print_help()
+        return
+
+    # Recording alone
+    telemetry = SessionTelemetry(session="bench")
+    sim = GameSim(seed=0, endless=True, stress_spawn_per_tick=args.stress)
+    start = time.perf_counter()
+    for i in range(args.frames):
+        telemetry.frame(0.0166 + (i % 7) * 1e-4)
+        telemetry.step(sim, 0.0004 + (i % 11) * 1e-5)
+    per_frame = (time.perf_counter() - start) / args.frames
+    print(f"frame() + step(): {per_frame * 1e6:.2f} us per frame "
+          f"({per_frame / (1 / 60) * 100:.3f}% of a 60 fps frame)")
+
+    # A headless game, with and without, flushing far more often than a session would
+    inputs = list(wander_inputs(args.frames))
+    def run(record):
+        sim = GameSim(seed=0, endless=True, stress_spawn_per_tick=args.stress)
+        telemetry = SessionTelemetry(session="bench") if record else None
+        writer = None
+        if record:
+            path = os.path.join(tempfile.gettempdir(), f"kong_telemetry_bench.{args.format}")
+            writer = TelemetryWriter(telemetry, path, args.format, interval=args.interval, max_bytes=256 * 1024).start()
+        begin = last = time.perf_counter()
+        for bits in inputs:
+            step_start = time.perf_counter()
+            sim.step(bits)
+            now = time.perf_counter()
+            if telemetry is not None:
+                telemetry.step(sim, now - step_start)
+                telemetry.frame(now - last)
+            last = now
+        elapsed = time.perf_counter() - begin
+        if writer is not None:
+            writer.close()
+            print(f"  {writer.stats()}")
+            for suffix in ('', '.1', '.2', '.3'):
+                if os.path.exists(writer.path + suffix): os.remove(writer.path + suffix)
+        return elapsed / len(inputs)
+    for _ in range(2): # Alternate, so neither run gets the warm caches
+        base = run(False); recorded = run(True)
+        print(f"headless stress {args.stress:g}: {base * 1e6:.1f} us/tick without, {recorded * 1e6:.1f} with "
+              f"({(recorded - base) * 1e6:+.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
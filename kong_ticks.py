@@ -0,0 +1,153 @@
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from kong_levels import builtin_levels, load_level_pack
+from kong_sim import (
+    GameSim, STATE_PLAYING,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_DOWN, INPUT_JUMP,
+)
+
+# Step-size consistency check for GameSim.step(inputs, ticks). The same game
+# is played twice from the moment its intro ends: once a tick per step and
+# once `ticks` ticks per step, with scripted inputs that only change every
+# CHUNK ticks, so both runs are fed the same thing. At every chunk boundary
+# the two have to be identical: same state hash (player, barrels, score and
+# clocks), same sound cues and the same deaths. A mismatch raises
+# AssertionError (exit status 1 from the command line); kong_perf runs the
+# quick_check() subset before every benchmark.
+#
+#   python kong_ticks.py --ticks 2 4 8 --seeds 16 --frames 3600
+#   python kong_ticks.py --stress 0.5               # endless crowd, past BarrelStore's scalar limit
+#   python kong_ticks.py --bench --ticks 1 4 8      # headless ticks/s per step size
+
+CHUNK = 8 # Ticks per scripted input, and the largest step checked
+HELD_INPUTS = (0, INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_DOWN, INPUT_RIGHT | INPUT_UP, INPUT_LEFT | INPUT_UP,
+               INPUT_RIGHT | INPUT_DOWN)
+QUICK_SEEDS, QUICK_FRAMES, QUICK_TICKS = 4, 1600, (2, 4, 8) # quick_check(): a couple of seconds
+
+
+def chunk_inputs(frames, seed):
+    """One INPUT_* word per CHUNK ticks: held directions that change every few
+    chunks, plus a jump at the start of some chunks."""
+    rng = random.Random(seed)
+    held = 0
+    inputs = []
+    for chunk in range(frames // CHUNK):
+        if chunk % 6 == 0:
+            held = rng.choice(HELD_INPUTS)
+        inputs.append(held | (INPUT_JUMP if rng.random() < 0.1 else 0))
+    return inputs
+
+
+def started_sim(seed, levels, level, stress=0.0):
+    sim = GameSim(seed=seed, levels=levels, start_level=level, endless=stress > 0, stress_spawn_per_tick=stress)
+    while sim.game_state != STATE_PLAYING:
+        sim.step(0)
+    return sim
+
+
+def step_chunk(sim, bits, ticks):
+    """CHUNK ticks of `bits` (jumping on the first only), `ticks` per step; returns the sound cues."""
+    events = []
+    for offset in range(0, CHUNK, ticks):
+        events += sim.step(bits if offset == 0 else bits & ~INPUT_JUMP, min(ticks, CHUNK - offset))
+    return events
+
+
+def play(sim, inputs, ticks):
+    """Yields (state hash, sound cues, deaths) at each chunk boundary."""
+    for bits in inputs:
+        events = step_chunk(sim, bits, ticks)
+        yield sim.state_hash(), events, list(sim.deaths)
+        if sim.game_state != STATE_PLAYING:
+            break
+
+
+def first_difference(seed, levels, level, inputs, ticks, stress):
+    """Chunk at which stepping `ticks` at a time first differs from single ticks, or None."""
+    reference = list(play(started_sim(seed, levels, level, stress), inputs, 1))
+    coarse = list(play(started_sim(seed, levels, level, stress), inputs, ticks))
+    for chunk, (want, got) in enumerate(zip(reference, coarse)):
+        if want != got:
+            return chunk
+    if len(reference) != len(coarse):
+        return min(len(reference), len(coarse))
+    return None
+
+
+def check(levels, level_indices, seeds, frames, tick_sizes, stress=0.0, verbose=False):
+    """Prints a line per step size; raises AssertionError naming the first game that differs."""
+    failures = []
+    for ticks in tick_sizes:
+        runs = matched = 0
+        for level in level_indices:
+            for seed in range(seeds):
+                chunk = first_difference(seed, levels, level, chunk_inputs(frames, seed), ticks, stress)
+                runs += 1
+                if chunk is None:
+                    matched += 1
+                    continue
+                failures.append(f"ticks {ticks}, level {level + 1}, seed {seed}: "
+                                f"differs by tick {(chunk + 1) * CHUNK} of play")
+                if verbose: print("  " + failures[-1])
+        print(f"ticks {ticks}: {matched}/{runs} games identical to single ticks over {frames} ticks")
+    if failures:
+        raise AssertionError(f"{len(failures)} game(s) differ from single ticks, first {failures[0]}")
+
+
+def quick_check(levels=None):
+    """A few games per built-in level at every step size checked by default."""
+    levels = levels if levels is not None else builtin_levels()
+    check(levels, range(len(levels)), QUICK_SEEDS, QUICK_FRAMES, QUICK_TICKS)
+
+
+def bench(levels, level, frames, tick_sizes, stress):
+    """Headless ticks/s per step size, held on one level in endless mode (a win reloads it)."""
+    for ticks in tick_sizes:
+        sim = GameSim(seed=0, levels=levels, start_level=level, endless=True, stress_spawn_per_tick=stress)
+        inputs = chunk_inputs(frames, 0)
+        start = time.perf_counter()
+        for bits in inputs:
+            step_chunk(sim, bits, ticks)
+            if sim.is_level_won:
+                sim.load_level(level)
+        elapsed = time.perf_counter() - start
+        print(f"ticks {ticks}: {frames / elapsed:12,.0f} ticks/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check GameSim outcomes match across step sizes")
+    parser.add_argument("--ticks", type=int, nargs="+", default=[2, 4, 8], help=f"step sizes to check, 1 to {CHUNK}")
+    parser.add_argument("--seeds", type=int, default=12, help="games per level and step size")
+    parser.add_argument("--frames", type=int, default=3600, help="ticks of play per game")
+    parser.add_argument("--levels", metavar="PACK", help="level pack to check instead of the built-in levels")
+    parser.add_argument("--spawn-rate", type=float, help="override every level's ms between barrels, e.g. 300 for a crowd")
+    parser.add_argument("--stress", type=float, default=0.0,
+                        help="extra barrels per tick, in endless mode (hits cost no lives)")
+    parser.add_argument("--bench", action="store_true", help="time headless play per step size instead")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every game that differs")
+    args = parser.parse_args()
+    for ticks in args.ticks:
+        if not 1 <= ticks <= CHUNK:
+            parser.error(f"--ticks {ticks} is not between 1 and {CHUNK}")
+
+    levels = load_level_pack(args.levels) if args.levels else builtin_levels()
+    if args.spawn_rate:
+        levels = tuple(level.replace(barrel_spawn_rate=args.spawn_rate) for level in levels)
+    frames = args.frames // CHUNK * CHUNK
+    if args.bench:
+        bench(levels, 0, frames, args.ticks, args.stress)
+        return
+    try:
+        check(levels, range(len(levels)), args.seeds, frames, args.ticks, args.stress, args.verbose)
+    except AssertionError as e:
+        print(f"FAIL: {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
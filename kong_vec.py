@@ -0,0 +1,542 @@
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy
+
+from kong_barrels import BARREL_LAND_TOLERANCE, NO_GIRDER, snap
+from kong_levels import GIRDER_VISUAL_HEIGHT, builtin_levels, load_level_pack
+from kong_sim import (
+    GameSim, GRAVITY, PLAYER_JUMP_STRENGTH, PLAYER_SPEED, PLAYER_CLIMB_SPEED, INITIAL_LIVES, BARREL_SIZE,
+    FRAME_MS, TICK_RATE, STATE_PLAYING,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_DOWN, INPUT_JUMP,
+)
+
+# Batched environments: N independent games of one level each, stepped
+# together. Where GameSim keeps one game in Python attributes, VecKongEnv keeps
+# every game's player in (N,) arrays and its barrels in (N, MAX_BARRELS)
+# padded slots, and runs GameSim's rules (move_player, BarrelStore.update,
+# goal and scoring) as array ops over all of them at once. Level geometry
+# is stacked into (levels, max girders) / (levels, max ladders) tables and
+# gathered per game when it resets.
+#
+# An episode is one level from the end of its intro: it ends when the goal is
+# reached, the last life is lost or max_steps pass, and the game is then reset
+# to that level's start the way GameSim.load_level() leaves it once its intro
+# has run. Each game has its own random.Random, drawn from the same way
+# GameSim.spawn_barrel() does, so a game seeded s plays exactly like
+# GameSim(seed=s) fed the same inputs after its intro (see --check).
+#
+#   python kong_vec.py --check 32            # parity with GameSim
+#   python kong_vec.py --bench 1 256 4096    # steps/s per batch size
+
+MAX_BARRELS = 32 # Barrel slots per game; a spawn with all slots live is dropped
+NEAREST_BARRELS = 4 # Barrels described in each observation
+DEATH_REWARD = -100.0 # Added to the score gained on a step that loses a life
+PLAYER_SIZE = 28 # GameSim.player_rect
+# Observation columns, all scaled to roughly [-1, 1]
+OBS_PLAYER = ('x', 'y', 'y_velocity', 'on_ground', 'on_ladder', 'climbing', 'lives', 'goal_dx', 'goal_dy')
+OBS_BARREL = ('dx', 'dy', 'dir') # Per nearest barrel, zeros when there are fewer
+OBS_SIZE = len(OBS_PLAYER) + NEAREST_BARRELS * len(OBS_BARREL)
+
+
+def _level_start(levels, idx, gravity):
+    # GameSim straight after load_level(idx) and its intro: the reset state
+    sim = GameSim(seed=0, levels=levels, start_level=idx, gravity=gravity)
+    while sim.game_state != STATE_PLAYING:
+        sim.step(0)
+    return sim
+
+
+class VecKongEnv:
+    """n games of Kong advanced together by step(actions).
+
+    actions are INPUT_* bit masks, one per game. step() returns (observations,
+    rewards, dones): a float32 (n, OBS_SIZE) array, the score gained per game
+    (plus DEATH_REWARD per life lost) and which games ended and were reset.
+    The returned arrays are reused by the next step().
+    """
+
+    def __init__(self, n, seed=0, levels=None, level=0, max_steps=60 * TICK_RATE, gravity=GRAVITY):
+        self.n = n
+        self.levels = levels if levels is not None else builtin_levels()
+        self.gravity = gravity
+        self.max_steps = max_steps
+        self.rngs = [random.Random(seed + i) for i in range(n)]
+        self.start_level = numpy.full(n, level, dtype=numpy.int64)
+        self._stack_levels()
+
+        # --- Per game ---
+        self.level = numpy.zeros(n, dtype=numpy.int64)
+        self.width = numpy.zeros(n); self.height = numpy.zeros(n) # Playfield, GameSim's bounds
+        self.x = numpy.zeros(n); self.y = numpy.zeros(n) # player_rect.topleft
+        self.y_velocity = numpy.zeros(n)
+        self.on_ground = numpy.zeros(n, dtype=bool)
+        self.on_ladder = numpy.zeros(n, dtype=bool)
+        self.climbing = numpy.zeros(n, dtype=bool)
+        self.lives = numpy.zeros(n, dtype=numpy.int64)
+        self.score = numpy.zeros(n)
+        self.barrel_timer = numpy.zeros(n)
+        self.steps = numpy.zeros(n, dtype=numpy.int64)
+        self.episodes = numpy.zeros(n, dtype=numpy.int64) # Finished so far
+        self.dropped_spawns = 0
+        for name, table in self._geometry.items():
+            setattr(self, name, numpy.zeros((n, table.shape[1]), dtype=table.dtype))
+
+        # --- Barrels: (n, MAX_BARRELS) slots ---
+        shape = (n, MAX_BARRELS)
+        self.bx = numpy.zeros(shape); self.by = numpy.zeros(shape)
+        self.b_dir = numpy.zeros(shape, dtype=numpy.int64)
+        self.b_velocity = numpy.zeros(shape)
+        self.b_girder = numpy.full(shape, NO_GIRDER, dtype=numpy.int64)
+        self.b_angle = numpy.zeros(shape)
+        self.b_alive = numpy.zeros(shape, dtype=bool)
+        self.b_seq = numpy.zeros(shape, dtype=numpy.int64) # Spawn order: the first barrel hit is the oldest
+        self._spawned = 0
+
+        self._games = numpy.arange(n)
+        self.observations = numpy.zeros((n, OBS_SIZE), dtype=numpy.float32)
+        self.rewards = numpy.zeros(n)
+        self.dones = numpy.zeros(n, dtype=bool)
+        self.reset()
+
+    def _stack_levels(self):
+        levels = self.levels
+        n_levels = len(levels)
+        n_girders = max(len(level.girders) for level in levels)
+        n_ladders = max(1, max(len(level.ladders) for level in levels))
+
+        def table(width, rows_of, fill, dtype=numpy.float64):
+            out = numpy.full((n_levels, width), fill, dtype=dtype)
+            for i, level in enumerate(levels):
+                rows = rows_of(level)
+                if rows: out[i, :len(rows)] = rows
+            return out
+        # Padding girders / ladders sit far off-screen with no width, so no test ever passes on them.
+        # Each game gets its level's rows copied into same-named (n, ...) attributes on reset
+        far = -1e9
+        geometry = self._geometry = {}
+        geometry['g_left'] = table(n_girders, lambda l: [g.left for g in l.girders], far)
+        geometry['g_right'] = table(n_girders, lambda l: [g.right for g in l.girders], far)
+        geometry['g_top'] = table(n_girders, lambda l: [g.top for g in l.girders], far)
+        geometry['g_bottom'] = table(n_girders, lambda l: [g.bottom for g in l.girders], far)
+        geometry['g_slope'] = table(n_girders, lambda l: [g.slope for g in l.girders], 0.0)
+        geometry['g_intercept'] = table(n_girders, lambda l: [g.intercept for g in l.girders], far)
+        geometry['g_land_dir'] = table(n_girders, lambda l: [g.land_dir for g in l.girders], 0, numpy.int64)
+        geometry['l_left'] = table(n_ladders, lambda l: [d.left for d in l.ladders], far)
+        geometry['l_right'] = table(n_ladders, lambda l: [d.right for d in l.ladders], far)
+        geometry['l_top'] = table(n_ladders, lambda l: [d.top for d in l.ladders], far)
+        geometry['l_bottom'] = table(n_ladders, lambda l: [d.bottom for d in l.ladders], far)
+        geometry['l_centerx'] = table(n_ladders, lambda l: [d.centerx for d in l.ladders], far)
+        geometry['l_width'] = table(n_ladders, lambda l: [d.width for d in l.ladders], 0.0)
+
+        # Per level scalars, from a GameSim that has just finished the level's intro
+        starts = [_level_start(levels, i, self.gravity) for i in range(n_levels)]
+        self.start_x = numpy.array([sim.player_rect.x for sim in starts], dtype=numpy.float64)
+        self.start_y = numpy.array([sim.player_rect.y for sim in starts], dtype=numpy.float64)
+        self.start_barrel_timer = numpy.array([sim.barrel_timer_ms for sim in starts])
+        self.field_width = numpy.array([sim.width for sim in starts], dtype=numpy.float64)
+        self.field_height = numpy.array([sim.height for sim in starts], dtype=numpy.float64)
+        self.goal = numpy.array([level.goal_rect for level in levels], dtype=numpy.float64) # left, top, w, h
+        self.spawn_rate = numpy.array([level.barrel_spawn_rate for level in levels], dtype=numpy.float64)
+        self.roll_speed = numpy.array([level.barrel_roll_speed for level in levels], dtype=numpy.float64)
+        self.kong_girder = numpy.array([level.kong_platform_idx for level in levels], dtype=numpy.int64)
+        self.kong_centerx = numpy.array([k[0] + k[2] // 2 for k in (level.kong_rect for level in levels)],
+                                        dtype=numpy.float64)
+        self.kong_width = numpy.array([level.kong_rect[2] for level in levels], dtype=numpy.float64)
+
+    # --- Reset ---
+    def reset(self, games=None):
+        """Put games (default: all) back at their start level's start, as after
+        GameSim.load_level() and the intro. Returns the observations."""
+        if games is None:
+            games = numpy.arange(self.n)
+        level = self.level[games] = self.start_level[games]
+        for name, table in self._geometry.items():
+            getattr(self, name)[games] = table[level]
+        self.width[games] = self.field_width[level]; self.height[games] = self.field_height[level]
+        self.x[games] = self.start_x[level]; self.y[games] = self.start_y[level]
+        self.y_velocity[games] = 0
+        self.on_ground[games] = True; self.on_ladder[games] = False; self.climbing[games] = False
+        self.lives[games] = INITIAL_LIVES
+        self.score[games] = 0
+        self.barrel_timer[games] = self.start_barrel_timer[level]
+        self.steps[games] = 0
+        self.b_alive[games] = False
+        self._observe()
+        return self.observations
+
+    # --- Step ---
+    def step(self, actions):
+        actions = numpy.asarray(actions, dtype=numpy.int64)
+        score_before = self.score.copy()
+        lives_before = self.lives.copy()
+        self.steps += 1
+
+        self.barrel_timer += FRAME_MS
+        rate = self.spawn_rate[self.level]
+        due = self.barrel_timer >= rate
+        if due.any():
+            self.barrel_timer[due] -= rate[due]
+            self._spawn(numpy.flatnonzero(due))
+
+        self._move_players(actions)
+        fell = self.y > self.height + PLAYER_SIZE # GameSim: top > height + player height
+        if fell.any(): self._lose_life(fell)
+        hit = self._update_barrels()
+        if hit.any(): self._lose_life(hit)
+
+        goal = self.goal[self.level]
+        won = ((self.x < goal[:, 0] + goal[:, 2]) & (self.x + PLAYER_SIZE > goal[:, 0])
+               & (self.y < goal[:, 1] + goal[:, 3]) & (self.y + PLAYER_SIZE > goal[:, 1]))
+        level_number = self.level + 1
+        self.score += numpy.where(won, 500 + level_number * 250, 0)
+        playing = ~won & (self.lives > 0)
+        self.score += numpy.where(playing, (FRAME_MS / 1000.0) * level_number, 0.0)
+
+        numpy.subtract(self.score, score_before, out=self.rewards)
+        self.rewards += (lives_before - self.lives) * DEATH_REWARD
+        numpy.logical_or(~playing, self.steps >= self.max_steps, out=self.dones)
+        if self.dones.any():
+            done = numpy.flatnonzero(self.dones)
+            self.episodes[done] += 1
+            self.reset(done)
+        else:
+            self._observe()
+        return self.observations, self.rewards, self.dones
+
+    def _lose_life(self, games):
+        # GameSim._lose_life(): lives down; with some left, back to the level start
+        self.lives[games] -= 1
+        respawn = games & (self.lives > 0)
+        level = self.level[respawn]
+        self.x[respawn] = self.start_x[level]; self.y[respawn] = self.start_y[level]
+        self.y_velocity[respawn] = 0
+        self.on_ground[respawn] = True; self.on_ladder[respawn] = False; self.climbing[respawn] = False
+
+    def _spawn(self, games):
+        # GameSim.spawn_barrel() for each of games
+        level = self.level[games]
+        right = numpy.array([self.rngs[i].choice([True, False]) for i in games.tolist()])
+        offset = self.kong_width[level] * 0.6
+        start_x = self.kong_centerx[level] + numpy.where(right, offset, -offset)
+        girder = self.kong_girder[level]
+        surface = (numpy.maximum(self.g_left[games, girder], numpy.minimum(start_x, self.g_right[games, girder]))
+                   * self.g_slope[games, girder] + self.g_intercept[games, girder])
+        land_dir = self.g_land_dir[games, girder]
+        direction = numpy.where(land_dir != 0, land_dir, numpy.where(start_x > self.kong_centerx[level], 1, -1))
+        free = ~self.b_alive[games]
+        has_slot = free.any(axis=1)
+        self.dropped_spawns += int((~has_slot).sum())
+        games, slot = games[has_slot], free.argmax(axis=1)[has_slot]
+        self.bx[games, slot] = numpy.trunc(start_x[has_slot] - BARREL_SIZE // 2)
+        self.by[games, slot] = numpy.trunc(surface[has_slot] - BARREL_SIZE)
+        self.b_dir[games, slot] = direction[has_slot]
+        self.b_velocity[games, slot] = 0
+        self.b_girder[games, slot] = girder[has_slot]
+        self.b_angle[games, slot] = 0
+        self.b_alive[games, slot] = True
+        self.b_seq[games, slot] = numpy.arange(self._spawned, self._spawned + len(games))
+        self._spawned += len(games)
+
+    def _surface(self, x, games=None):
+        # (games, girders) surface y of every girder of each game's level under x (default: all games)
+        if games is None:
+            return numpy.maximum(self.g_left, numpy.minimum(x[:, None], self.g_right)) * self.g_slope + self.g_intercept
+        return (numpy.maximum(self.g_left[games], numpy.minimum(x[:, None], self.g_right[games]))
+                * self.g_slope[games] + self.g_intercept[games])
+
+    def _move_players(self, actions):
+        # GameSim.move_player() for every game at once
+        x, y, vy = self.x, self.y, self.y_velocity
+        jump = (actions & INPUT_JUMP != 0) & self.on_ground & ~self.on_ladder
+        vy[jump] = PLAYER_JUMP_STRENGTH
+        self.on_ground[jump] = False
+
+        walking = ~self.climbing
+        x[:] = numpy.where(walking & (actions & INPUT_LEFT != 0), snap(x - PLAYER_SPEED), x)
+        x[:] = numpy.where(walking & (actions & INPUT_RIGHT != 0), snap(x + PLAYER_SPEED), x)
+        numpy.clip(x, 0, self.width - PLAYER_SIZE, out=x) # clamp_ip(bounds)
+        numpy.clip(y, 0, self.height - PLAYER_SIZE, out=y)
+
+        # First ladder (in level order) the player overlaps and is centred enough on
+        centerx = x + PLAYER_SIZE // 2
+        bottom = y + PLAYER_SIZE
+        l_top = self.l_top; l_bottom = self.l_bottom; l_centerx = self.l_centerx
+        touching = ((x[:, None] < self.l_right) & (x[:, None] + PLAYER_SIZE > self.l_left)
+                    & (y[:, None] < l_bottom) & (bottom[:, None] > l_top)
+                    & (numpy.abs(centerx[:, None] - l_centerx) < self.l_width * 0.75))
+        on_ladder = touching.any(axis=1)
+        ladder = (self._games, touching.argmax(axis=1))
+        top_y = l_top[ladder]; bottom_y = l_bottom[ladder]; ladder_x = l_centerx[ladder]
+        up = on_ladder & (actions & INPUT_UP != 0) & (bottom > top_y)
+        down = on_ladder & ~up & (actions & INPUT_DOWN != 0) & (bottom < bottom_y + PLAYER_CLIMB_SPEED)
+        y[:] = numpy.where(up, snap(y - PLAYER_CLIMB_SPEED), numpy.where(down, snap(y + PLAYER_CLIMB_SPEED), y))
+        climbing = up | down
+        vy[climbing] = 0
+        self.on_ground[climbing] = False
+        x[:] = numpy.where(climbing, ladder_x - PLAYER_SIZE // 2, x)
+        self.on_ladder[:] = on_ladder
+
+        # Off the top or bottom of the ladder: stop climbing, landing on a girder right there
+        detach = climbing & ((y + PLAYER_SIZE <= top_y) | (y >= bottom_y - PLAYER_CLIMB_SPEED))
+        if detach.any():
+            games = numpy.flatnonzero(detach)
+            gx, gy = x[games], y[games]
+            surface = self._surface(gx + PLAYER_SIZE // 2, games)
+            meets = ((gx[:, None] < self.g_right[games]) & (gx[:, None] + PLAYER_SIZE > self.g_left[games])
+                     & (gy[:, None] < self.g_bottom[games]) & (gy[:, None] + PLAYER_SIZE > self.g_top[games])
+                     & (numpy.abs(gy[:, None] + PLAYER_SIZE - surface) < GIRDER_VISUAL_HEIGHT))
+            lands = meets.any(axis=1)
+            first = meets.argmax(axis=1)
+            landed = games[lands]
+            y[landed] = snap(surface[lands, first[lands]]) - PLAYER_SIZE
+            self.on_ground[landed] = True; vy[landed] = 0
+            climbing[games] = False
+        self.climbing[:] = climbing
+
+        # Gravity, then land on the highest girder whose surface the feet passed on the way (GirderArrays.landing1)
+        free = ~climbing
+        feet_before = (y + PLAYER_SIZE - GIRDER_VISUAL_HEIGHT / 2)[:, None]
+        vy[free] += self.gravity
+        y[:] = numpy.where(free, snap(y + vy), y)
+        bottom = (y + PLAYER_SIZE)[:, None]
+        surface = self._surface(x + PLAYER_SIZE // 2)
+        lands = ((x[:, None] + PLAYER_SIZE > self.g_left) & (x[:, None] < self.g_right)
+                 & (surface >= feet_before) & (surface <= bottom) & (vy >= -0.1)[:, None] & free[:, None])
+        landed = lands.any(axis=1)
+        y[:] = numpy.where(landed, snap(surface[self._games, numpy.where(lands, surface, numpy.inf).argmin(axis=1)]) - PLAYER_SIZE, y)
+        vy[landed] = 0
+        self.on_ground[:] = numpy.where(free, landed, self.on_ground)
+
+    def _update_barrels(self):
+        """BarrelStore.update() for every game's slots. Returns which games' players were hit."""
+        size = BARREL_SIZE; half = size // 2
+        alive = self.b_alive
+        bx, by, b_dir, b_vel, b_girder, b_angle = self.bx, self.by, self.b_dir, self.b_velocity, self.b_girder, self.b_angle
+        before = [arr.copy() for arr in (bx, by, b_dir, b_vel, b_girder, b_angle)]
+        on_girder = b_girder != NO_GIRDER
+        rolling = numpy.nonzero(alive & on_girder) # Split before updating, as BarrelStore does
+        falling = numpy.nonzero(alive & ~on_girder)
+
+        if len(rolling[0]):
+            games = rolling[0]
+            level = self.level[games]
+            g = b_girder[rolling]
+            d = b_dir[rolling]
+            new_x = snap(bx[rolling] + self.roll_speed[level] * d)
+            bx[rolling] = new_x
+            b_angle[rolling] = (b_angle[rolling] + 6 * d) % 360
+            centerx = new_x + half
+            left = self.g_left[games, g]; right = self.g_right[games, g]
+            surface = numpy.maximum(left, numpy.minimum(centerx, right)) * self.g_slope[games, g] + self.g_intercept[games, g]
+            by[rolling] = snap(surface) - size
+            off_edge = ~((left < centerx) & (centerx < right))
+            b_vel[rolling] = numpy.where(off_edge, 0.5, 0.0)
+            b_girder[rolling] = numpy.where(off_edge, NO_GIRDER, g)
+
+        if len(falling[0]):
+            games = falling[0]
+            v = b_vel[falling] + self.gravity * 0.6
+            b_vel[falling] = v
+            bottom_before = (by[falling] + size - BARREL_LAND_TOLERANCE)[:, None]
+            fy = snap(by[falling] + v)
+            by[falling] = fy
+            b_angle[falling] = (b_angle[falling] + 3 * b_dir[falling]) % 360
+            fx = bx[falling]
+            surface = self._surface(fx + half, games)
+            fx = fx[:, None]; fy2 = fy[:, None]; bottom = fy2 + size
+            lands = ((fx < self.g_right[games]) & (fx + size > self.g_left[games])
+                     & (surface >= bottom_before) & (surface <= bottom) & (v >= 0)[:, None])
+            landed = lands.any(axis=1)
+            if landed.any():
+                first = numpy.where(lands, surface, numpy.inf).argmin(axis=1)[landed]
+                rows = numpy.flatnonzero(landed)
+                slots = (falling[0][rows], falling[1][rows])
+                by[slots] = snap(surface[rows, first]) - size
+                b_vel[slots] = 0
+                b_girder[slots] = first
+                land_dir = self.g_land_dir[games[rows], first]
+                b_dir[slots] = numpy.where(land_dir != 0, land_dir, b_dir[slots])
+
+        gone = alive & (by > self.height[:, None])
+
+        # Player collision: the oldest overlapping barrel is removed, and the
+        # younger ones stay where they were this frame (BarrelStore.update)
+        hit = numpy.zeros(self.n, dtype=bool)
+        live = numpy.nonzero(alive & ~gone)
+        games = live[0]
+        px = self.x[games]; py = self.y[games]
+        lx = bx[live]; ly = by[live]
+        hits = numpy.flatnonzero((lx < px + PLAYER_SIZE) & (lx + size > px) & (ly < py + PLAYER_SIZE) & (ly + size > py))
+        if len(hits):
+            hits = hits[numpy.lexsort((self.b_seq[live][hits], games[hits]))]
+            hit_games, first = numpy.unique(games[hits], return_index=True)
+            hit_slots = live[1][hits[first]]
+            stop_seq = numpy.full(self.n, numpy.iinfo(numpy.int64).max)
+            stop_seq[hit_games] = self.b_seq[hit_games, hit_slots]
+            younger = alive & (self.b_seq > stop_seq[:, None])
+            for arr, saved in zip((bx, by, b_dir, b_vel, b_girder, b_angle), before):
+                arr[younger] = saved[younger]
+            gone &= ~younger
+            alive[hit_games, hit_slots] = False
+            hit[hit_games] = True
+
+        # Culling: 5 points per barrel off the bottom
+        if gone.any():
+            alive &= ~gone
+            self.score += 5 * gone.sum(axis=1)
+        return hit
+
+    # --- Observations ---
+    def _observe(self):
+        obs = self.observations
+        x, y = self.x, self.y
+        goal = self.goal[self.level]
+        width, height = self.width, self.height
+        obs[:, 0] = x / width; obs[:, 1] = y / height
+        obs[:, 2] = self.y_velocity / -PLAYER_JUMP_STRENGTH
+        obs[:, 3] = self.on_ground; obs[:, 4] = self.on_ladder; obs[:, 5] = self.climbing
+        obs[:, 6] = self.lives / INITIAL_LIVES
+        obs[:, 7] = (goal[:, 0] + goal[:, 2] / 2 - x - PLAYER_SIZE / 2) / width
+        obs[:, 8] = (goal[:, 1] + goal[:, 3] - y - PLAYER_SIZE) / height
+        # Nearest live barrels first, by distance between centres; only live slots are touched
+        base = len(OBS_PLAYER)
+        obs[:, base:] = 0
+        live = numpy.nonzero(self.b_alive)
+        games = live[0]
+        if not len(games):
+            return
+        dx = self.bx[live] + BARREL_SIZE / 2 - (x[games] + PLAYER_SIZE / 2)
+        dy = self.by[live] + BARREL_SIZE / 2 - (y[games] + PLAYER_SIZE / 2)
+        order = numpy.lexsort((dx * dx + dy * dy, games))
+        games = games[order]
+        rank = numpy.arange(len(games)) - numpy.searchsorted(games, games) # Position within its game
+        keep = rank < NEAREST_BARRELS
+        games = games[keep]; order = order[keep]
+        column = base + rank[keep] * len(OBS_BARREL)
+        obs[games, column] = dx[order] / width[games]
+        obs[games, column + 1] = dy[order] / height[games]
+        obs[games, column + 2] = self.b_dir[live][order]
+
+
+# --- Parity check and benchmark ---
+def random_actions(rng, n, held=None):
+    """Wander-style random INPUT_* bits for n games: held directions that change
+    now and then, plus the odd jump. Pass the returned held back in next call."""
+    choices = numpy.array([INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_RIGHT | INPUT_UP, INPUT_LEFT | INPUT_DOWN])
+    if held is None:
+        held = choices[rng.integers(len(choices), size=n)]
+    change = rng.random(n) < 1 / 90
+    held = numpy.where(change, choices[rng.integers(len(choices), size=n)], held)
+    return held | numpy.where(rng.random(n) < 0.03, INPUT_JUMP, 0), held
+
+
+def _action_table(n, frames, seed):
+    # random_actions() for `frames` frames, drawn ahead so only stepping gets timed
+    rng = numpy.random.default_rng(seed)
+    held = None
+    table = []
+    for _ in range(frames):
+        actions, held = random_actions(rng, n, held)
+        table.append(actions)
+    return table
+
+
+def check_parity(n, frames, seed=0, levels=None, level=0):
+    """Step n GameSims and a VecKongEnv(n) with the same inputs through each
+    game's first episode; returns a list of mismatch descriptions."""
+    env = VecKongEnv(n, seed, levels, level)
+    sims = [_level_start_sim(seed + i, env.levels, level) for i in range(n)]
+    rng = numpy.random.default_rng(seed)
+    held = None
+    active = numpy.ones(n, dtype=bool)
+    problems = []
+    for frame in range(1, frames + 1):
+        actions, held = random_actions(rng, n, held)
+        _, _, dones = env.step(actions)
+        for i in numpy.flatnonzero(active):
+            sim = sims[i]
+            sim.step(int(actions[i]))
+            if dones[i]: # The env has already reset this game
+                active[i] = False
+                if sim.game_state == STATE_PLAYING and env.steps[i] != 0 and frame < env.max_steps:
+                    problems.append(f"game {i} frame {frame}: env ended the episode, GameSim didn't")
+                continue
+            mine = (env.x[i], env.y[i], env.lives[i], round(env.score[i], 6))
+            theirs = (sim.player_rect.x, sim.player_rect.y, sim.player_lives, round(sim.score, 6))
+            barrels_mine = sorted(zip(env.bx[i][env.b_alive[i]].tolist(), env.by[i][env.b_alive[i]].tolist()))
+            live = sim.barrels.alive[:sim.barrels.count]
+            barrels_theirs = sorted(zip(sim.barrels.x[:sim.barrels.count][live].tolist(),
+                                        sim.barrels.y[:sim.barrels.count][live].tolist()))
+            if mine != theirs or barrels_mine != barrels_theirs:
+                problems.append(f"game {i} frame {frame}: player/lives/score {mine} vs GameSim {theirs}, "
+                                f"{len(barrels_mine)} vs {len(barrels_theirs)} barrels")
+                active[i] = False
+        if not active.any():
+            break
+    return problems
+
+
+def _level_start_sim(seed, levels, level):
+    sim = GameSim(seed=seed, levels=levels, start_level=level)
+    while sim.game_state != STATE_PLAYING:
+        sim.step(0)
+    return sim
+
+
+def bench(n, frames, seed=0, levels=None, level=0):
+    """Env steps per second (games x frames / s) for a VecKongEnv(n)."""
+    env = VecKongEnv(n, seed, levels, level)
+    actions = _action_table(n, 256, seed)
+    start = time.perf_counter()
+    for frame in range(frames):
+        env.step(actions[frame % 256])
+    elapsed = time.perf_counter() - start
+    return n * frames / elapsed, int(env.episodes.sum()), env.dropped_spawns
+
+
+def bench_loop(frames, seed=0, levels=None, level=0):
+    """The same with one GameSim stepped in a Python loop, for comparison."""
+    sim = _level_start_sim(seed, levels, level)
+    actions = [int(a[0]) for a in _action_table(1, 256, seed)]
+    start = time.perf_counter()
+    for frame in range(frames):
+        sim.step(actions[frame % 256])
+        if sim.game_state != STATE_PLAYING:
+            sim.restart()
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched Kong environments: parity check and throughput")
+    parser.add_argument("--check", type=int, metavar="N", help="compare N games against N GameSims")
+    parser.add_argument("--bench", type=int, nargs="*", metavar="N", help="steps/s for these batch sizes")
+    parser.add_argument("--frames", type=int, default=3600)
+    parser.add_argument("--level", type=int, default=1, help="level to play (1-based)")
+    parser.add_argument("--levels", metavar="PACK", help="level pack to load instead of the built-in levels")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    levels = load_level_pack(args.levels) if args.levels else None
+
+    if args.check:
+        problems = check_parity(args.check, args.frames, args.seed, levels, args.level - 1)
+        for line in problems[:20]: print(line)
+        print(f"parity: {args.check} games, {args.frames} frames: "
+              + (f"{len(problems)} mismatching" if problems else "all match GameSim"))
+        if problems: raise SystemExit(1)
+    if args.bench:
+        loop = bench_loop(args.frames, args.seed, levels, args.level - 1)
+        print(f"GameSim loop: {loop:12,.0f} steps/s")
+        for n in args.bench:
+            frames = max(50, args.frames * 64 // max(n, 64))
+            rate, episodes, dropped = bench(n, frames, args.seed, levels, args.level - 1)
+            print(f"VecKongEnv({n:5d}): {rate:12,.0f} steps/s ({rate / loop:6.1f}x), {episodes} episodes, "
+                  f"{dropped} spawns dropped")
+
+
+if __name__ == "__main__":
+    main()
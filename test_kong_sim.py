@@ -0,0 +1,83 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+import pytest
+
+import kong_ticks
+from kong_barrels import BarrelStore, NO_GIRDER, SCALAR_LIMIT, snap1
+from kong_levels import builtin_levels
+from kong_sim import GameSim, BARREL_SIZE, GRAVITY
+
+# Level 1 of the built-in pack: girder 1 is the sloped one above the floor
+FLOOR, LOWEST_SLOPE = 0, 1
+DROP_X = 300 # Clear of every ladder below the top girders
+
+
+@pytest.mark.parametrize("ticks", kong_ticks.QUICK_TICKS)
+@pytest.mark.parametrize("seed", range(2))
+def test_step_sizes_play_the_same_game(seed, ticks):
+    levels = builtin_levels()
+    inputs = kong_ticks.chunk_inputs(1200, seed)
+    assert kong_ticks.first_difference(seed, levels, 0, inputs, ticks, 0.0) is None
+
+
+@pytest.mark.parametrize("velocity", [5, 40, 140])
+def test_falling_player_lands_on_the_girder_it_passes(velocity):
+    sim = GameSim(seed=0)
+    girder = sim.g_level_girders[LOWEST_SLOPE]
+    surface = girder.surface_y(DROP_X)
+    sim.player_rect.midbottom = (DROP_X, surface - 4)
+    sim.player_y_velocity = velocity
+    sim.move_player(0)
+    assert sim.player_on_ground
+    assert abs(sim.player_rect.bottom - surface) <= 0.5 # Rect rounds
+
+
+def test_player_walking_into_a_girder_below_its_surface_steps_up():
+    sim = GameSim(seed=0)
+    girder = sim.g_level_girders[LOWEST_SLOPE]
+    # Just off the girder's left end, feet a few px under its surface line
+    sim.player_rect.midbottom = (girder.left - sim.player_rect.width // 2, girder.surface_y(girder.left) + 5)
+    sim.player_y_velocity = 1
+    sim.move_player(kong_ticks.INPUT_RIGHT)
+    assert sim.player_on_ground
+    assert abs(sim.player_rect.bottom - girder.surface_y(sim.player_rect.centerx)) <= 0.5
+
+
+@pytest.mark.parametrize("velocity", [2, 30, 140])
+def test_falling_barrel_lands_on_the_girder_it_passes(velocity):
+    sim = GameSim(seed=0)
+    girder = sim.g_level_girders[LOWEST_SLOPE]
+    surface = girder.surface_y(DROP_X + BARREL_SIZE // 2)
+    barrels = BarrelStore(BARREL_SIZE)
+    barrels.spawn(DROP_X, surface - BARREL_SIZE - 2, 1, NO_GIRDER)
+    barrels.y_vel[0] = velocity
+    culled, hit = barrels.update(sim.girder_arrays, 1.0, GRAVITY, sim.height, None, sim.level_index)
+    assert (culled, hit) == (0, False)
+    assert barrels.girder[0] == LOWEST_SLOPE
+    assert barrels.y[0] == snap1(surface) - BARREL_SIZE
+
+
+def test_barrels_after_the_one_that_hits_stay_put_on_both_paths():
+    sim = GameSim(seed=0)
+    girder = sim.g_level_girders[LOWEST_SLOPE]
+    stores = BarrelStore(BARREL_SIZE), BarrelStore(BARREL_SIZE)
+    for store in stores:
+        for i in range(SCALAR_LIMIT + 8):
+            x = girder.left + 10 + 15 * i
+            store.spawn(x, snap1(girder.surface_y(x + BARREL_SIZE // 2)) - BARREL_SIZE, 1, LOWEST_SLOPE)
+    vector, scalar = stores
+    hit_slot = SCALAR_LIMIT // 2
+    player = pygame.Rect(vector.x[hit_slot] + 13, vector.y[hit_slot] - 20, 1, 28) # Clear of its neighbours
+    x_before = vector.x.copy()
+    assert vector.update(sim.girder_arrays, 1.0, GRAVITY, sim.height, player, sim.level_index) == (0, True)
+    assert scalar._update_scalar(sim.girder_arrays, 1.0, GRAVITY, sim.height, player, sim.level_index) == (0, True)
+    assert not vector.alive[hit_slot]
+    assert (vector.x[:hit_slot] == x_before[:hit_slot] + 1).all()
+    assert (vector.x[hit_slot + 1:] == x_before[hit_slot + 1:]).all()
+    for name in BarrelStore._fields:
+        assert (getattr(vector, name) == getattr(scalar, name)).all(), name